@@ -0,0 +1,61 @@
+"""
+Measure URL construction throughput of the three build_url functions, with
+the date parsing fast path and with dateutil only.
+
+Usage:
+    poetry run python benchmarks/bench_build_url.py [number]
+"""
+import sys
+import timeit
+
+from seriesbr.utils import dates
+from seriesbr.bcb import series as bcb
+from seriesbr.ipea import series as ipea
+from seriesbr.ibge import series as ibge
+
+START_DATES = ["2010", "2015-03", "07-2016", "2018-11-07", "012017"]
+END_DATES = ["2019", "2019-11", "11-2019", "2019-11-07", "072019"]
+
+IPEA_METADATA = {
+    "SERMAXDATA": "2019-12-01T00:00:00-03:00",
+    "SERMINDATA": "1974-01-01T00:00:00-03:00",
+    "PERNOME": "Mensal",
+}
+
+IBGE_METADATA = {"nivelTerritorial": {"Administrativo": ["N1", "N3", "N6"]}}
+
+
+def build_urls():
+    for start, end in zip(START_DATES, END_DATES):
+        bcb.build_url(433, start, end)
+        ipea.build_url("BM12_TJOVER12", start, end, None, IPEA_METADATA)  # type: ignore
+        ibge.build_url(1419, IBGE_METADATA, "mensal", 63, start, end)
+
+
+def main(number: int = 2000):
+    urls = number * len(START_DATES) * 3
+
+    memoized = dates.parse_start_date, dates.parse_end_date
+    unmemoized = dates.parse_start_date.__wrapped__, dates.parse_end_date.__wrapped__
+    match_date = dates.match_date
+
+    modes = [
+        ("fast path + memoization", memoized, match_date),
+        ("fast path", unmemoized, match_date),
+        ("dateutil only", unmemoized, lambda date: None),
+    ]
+
+    for label, (parse_start_date, parse_end_date), match in modes:
+        dates.parse_start_date = parse_start_date
+        dates.parse_end_date = parse_end_date
+        dates.match_date = match
+
+        elapsed = min(timeit.repeat(build_urls, number=number, repeat=3))
+        print(f"{label:<30}{urls / elapsed:>12,.0f} URLs/s")
+
+    dates.parse_start_date, dates.parse_end_date = memoized
+    dates.match_date = match_date
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,87 @@
+"""
+Measure rows/s of writing chunks to Parquet and Arrow files with
+seriesbr.export, compared to concatenating them into one DataFrame first.
+
+Chunks are built from synthetic IBGE municipal payloads, as iter_series
+would yield them, without network access.
+
+Usage:
+    poetry run python benchmarks/bench_export.py [chunks] [rows_per_chunk]
+"""
+import os
+import sys
+import time
+import tempfile
+
+import pandas as pd
+
+from seriesbr.export import write_chunks
+from seriesbr.ibge import series as ibge
+
+HEADER = {
+    "V": "Valor",
+    "D1C": "Município (Código)",
+    "D2C": "Mês (Código)",
+    "D3C": "Variável (Código)",
+    "D3N": "Variável",
+    "D4N": "Geral, grupo, subgrupo, item e subitem",
+}
+
+
+def ibge_chunk(year: int, rows: int) -> pd.DataFrame:
+    data = [
+        {
+            "V": f"{i % 1000 / 100:.2f}",
+            "D1C": str(3300000 + i % 5570),
+            "D2C": f"{year}{1 + i % 12:02d}",
+            "D3C": "63",
+            "D3N": "IPCA - Variação mensal",
+            "D4N": "Índice geral",
+        }
+        for i in range(rows)
+    ]
+    return ibge.build_df([HEADER, *data], "mensal")
+
+
+def chunks(number: int, rows: int):
+    for year in range(2000, 2000 + number):
+        yield ibge_chunk(year, rows)
+
+
+def concatenated(path: str, number: int, rows: int) -> int:
+    df = pd.concat(list(chunks(number, rows)))
+    df.to_parquet(path)
+    return len(df)
+
+
+def measure(label: str, write, number: int, rows: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export")
+
+        start = time.perf_counter()
+        written = write(path, number, rows)
+        elapsed = time.perf_counter() - start
+
+        print(f"{label:<24}{written / elapsed:>14,.0f} rows/s")
+
+
+def main(number: int = 20, rows: int = 50_000):
+    print(f"{number} chunks of {rows:,} rows\n")
+
+    measure("concat + to_parquet", concatenated, number, rows)
+    measure(
+        "chunked parquet",
+        lambda path, n, r: write_chunks(chunks(n, r), path, format="parquet"),
+        number,
+        rows,
+    )
+    measure(
+        "chunked arrow",
+        lambda path, n, r: write_chunks(chunks(n, r), path, format="arrow"),
+        number,
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
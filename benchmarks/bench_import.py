@@ -0,0 +1,49 @@
+"""
+Measure how long it takes to import seriesbr modules in a fresh interpreter,
+and check that heavy dependencies are only loaded on first use.
+
+Usage:
+    poetry run python benchmarks/bench_import.py [repeat]
+"""
+import sys
+import statistics
+import subprocess
+
+MODULES = ["seriesbr.bcb", "seriesbr.ipea", "seriesbr.ibge", "seriesbr.utils.session"]
+
+HEAVY_DEPENDENCIES = ["pandas", "numpy", "requests", "urllib3", "dateutil", "httpx"]
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def measure(module: str, repeat: int):
+    timings = []
+    loaded = ""
+
+    for _ in range(repeat):
+        script = SCRIPT.format(module=module, heavy=HEAVY_DEPENDENCIES)
+        output = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True
+        ).stdout.split()
+        timings.append(float(output[0]))
+        loaded = output[1] if len(output) > 1 else ""
+
+    return statistics.median(timings), loaded
+
+
+def main(repeat: int = 10):
+    print(f"{'module':<28}{'median':>10}  heavy dependencies loaded")
+    for module in MODULES:
+        elapsed, loaded = measure(module, repeat)
+        print(f"{module:<28}{elapsed * 1000:>8.1f}ms  {loaded or '-'}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
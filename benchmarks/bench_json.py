@@ -0,0 +1,105 @@
+"""
+Compare JSON decoders on payloads shaped like each source's responses.
+
+Recorded payloads can be given as arguments, e.g. responses saved with
+``curl -o bcb.json "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados?formato=json"``.
+Otherwise, synthetic payloads with the same structure are used.
+
+Usage:
+    poetry run python benchmarks/bench_json.py [payload.json ...]
+"""
+import sys
+import json
+import timeit
+import importlib
+
+from seriesbr.utils import json_decoder
+
+
+def bcb_payload(n: int = 200_000) -> bytes:
+    data = [
+        {"data": f"{1 + i % 28:02d}/{1 + i % 12:02d}/{1990 + i // 336}", "valor": f"{i * 0.01:.2f}"}
+        for i in range(n)
+    ]
+    return json.dumps(data).encode()
+
+
+def ipea_payload(n: int = 100_000) -> bytes:
+    data = {
+        "@odata.context": "http://ipeadata2-homologa.ipea.gov.br/api/v1/$metadata#ValoresSerie",
+        "value": [
+            {"VALDATA": f"{1900 + i // 12}-{1 + i % 12:02d}-01T00:00:00-03:00", "VALVALOR": i * 0.5}
+            for i in range(n)
+        ],
+    }
+    return json.dumps(data).encode()
+
+
+def ibge_payload(n: int = 100_000) -> bytes:
+    header = {
+        "NC": "Nível Territorial (Código)",
+        "NN": "Nível Territorial",
+        "MC": "Unidade de Medida (Código)",
+        "MN": "Unidade de Medida",
+        "V": "Valor",
+        "D1C": "Município (Código)",
+        "D1N": "Município",
+        "D2C": "Mês (Código)",
+        "D2N": "Mês",
+        "D3C": "Variável (Código)",
+        "D3N": "Variável",
+    }
+    rows = [
+        {
+            "NC": "6",
+            "NN": "Município",
+            "MC": "2",
+            "MN": "%",
+            "V": f"{i % 1000 / 100:.2f}",
+            "D1C": str(3300000 + i % 5000),
+            "D1N": "São Paulo - SP",
+            "D2C": f"{2000 + i // 60000}{1 + i % 12:02d}",
+            "D2N": "janeiro 2019",
+            "D3C": "63",
+            "D3N": "IPCA - Variação mensal",
+        }
+        for i in range(n)
+    ]
+    return json.dumps([header, *rows], ensure_ascii=False).encode()
+
+
+def available_decoders():
+    decoders = {"json": json.loads}
+    for name in json_decoder.DECODERS:
+        try:
+            decoders[name] = importlib.import_module(name).loads
+        except ImportError:
+            pass
+    return decoders
+
+
+def main(paths):
+    if paths:
+        payloads = {path: open(path, "rb").read() for path in paths}
+    else:
+        payloads = {"bcb": bcb_payload(), "ipea": ipea_payload(), "ibge": ibge_payload()}
+
+    decoders = available_decoders()
+
+    print(f"{'payload':<20}{'MB':>8}" + "".join(f"{name:>12}" for name in decoders))
+
+    for name, payload in payloads.items():
+        timings = [
+            min(timeit.repeat(lambda: loads(payload), number=1, repeat=5))
+            for loads in decoders.values()
+        ]
+        row = f"{name:<20}{len(payload) / 1e6:>8.1f}"
+        row += "".join(f"{timing * 1000:>10.1f}ms" for timing in timings)
+        print(row)
+
+    name, _ = json_decoder.get_decoder()
+    print(f"\nseriesbr uses: {name}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,3 @@
+from .bulk import get_many
+
+__all__ = ['get_many']
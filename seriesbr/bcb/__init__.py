@@ -1,4 +1,11 @@
-from .series import get_series
-from .metadata import get_metadata
+from .series import get_series, aget_series, iter_series
+from .metadata import get_metadata, get_metadata_many, aget_metadata
 
-__all__ = ['get_series', 'get_metadata']
+__all__ = [
+    'get_series',
+    'get_metadata',
+    'get_metadata_many',
+    'aget_series',
+    'aget_metadata',
+    'iter_series',
+]
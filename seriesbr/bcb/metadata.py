@@ -1,5 +1,13 @@
-from seriesbr.utils import session
-from typing import Tuple
+from __future__ import annotations
+
+from seriesbr.utils import session, async_session
+from seriesbr.utils.lazy import lazy_import
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from concurrent import futures
+else:
+    futures = lazy_import("concurrent.futures")
 
 
 def get_metadata(code: int) -> dict:
@@ -27,11 +35,64 @@ def get_metadata(code: int) -> dict:
     vcge                     Política Econômica [http://vocab.e.gov.br/2011...
     """
     url, params = build_url(code)
-    response = session.get(url, params=params)
-    json = response.json()
+    json = session.get_json(url, params=params)
+    return json["result"]["results"][0]
+
+
+async def aget_metadata(code: int) -> dict:
+    """
+    Asynchronous version of :py:func:`get_metadata`.
+    """
+    url, params = build_url(code)
+    json = await async_session.get_json(url, params=params)
     return json["result"]["results"][0]
 
 
 def build_url(code: int) -> Tuple[str, dict]:
     params = {"fq": f"codigo_sgs:{code}"}
     return "https://dadosabertos.bcb.gov.br/api/3/action/package_search", params
+
+
+def get_metadata_many(
+    codes: List[int], batch_size: int = 50, max_workers: int = 4
+) -> Dict[str, dict]:
+    """
+    Get metadata of many BCB time series, fetching several codes per request.
+
+    Parameters
+    ----------
+    codes : list of int
+        Series codes.
+
+    batch_size : int, optional
+        Number of codes fetched per request.
+
+    max_workers : int, optional
+        Number of batches fetched concurrently.
+
+    Returns
+    -------
+    dict
+        Metadata by series code, as a string. Series not found are left out.
+    """
+    codes = list(dict.fromkeys(codes))
+    batches = [codes[i : i + batch_size] for i in range(0, len(codes), batch_size)]
+
+    def fetch(batch: List[int]) -> List[dict]:
+        url, params = build_batch_url(batch)
+        return session.get_json(url, params=params)["result"]["results"]
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(fetch, batches))
+
+    return {
+        str(record["codigo_sgs"]): record for result in results for record in result
+    }
+
+
+def build_batch_url(codes: List[int]) -> Tuple[str, dict]:
+    params = {
+        "fq": "codigo_sgs:(" + " OR ".join(map(str, codes)) + ")",
+        "rows": len(codes),
+    }
+    return "https://dadosabertos.bcb.gov.br/api/3/action/package_search", params
@@ -1,18 +1,33 @@
-import pandas as pd
+from __future__ import annotations
 
-from seriesbr.utils import session, dates
+from seriesbr.utils import session, async_session, dates, instrumentation, chunks, arrow
+from seriesbr.utils.lazy import lazy_import
 from datetime import datetime
-from typing import Tuple, TypedDict, Literal
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple, TypedDict, Literal, Union
+
+if TYPE_CHECKING:
+    import pyarrow
+    import requests
+    import pandas as pd
+    from seriesbr.store import SeriesStore
+    from seriesbr.range_cache import RangeCache
+    from seriesbr.frame_cache import FrameCache
+else:
+    requests = lazy_import("requests")
+    pd = lazy_import("pandas")
 
 DATE_FORMAT = "%d/%m/%Y"
 
 
+@instrumentation.instrument
 def get_series(
     code: int,
     start: str = None,
     end: str = None,
     last_n: int = None,
-) -> pd.DataFrame:
+    store: Union[SeriesStore, RangeCache, FrameCache] = None,
+    output: str = "pandas",
+) -> Union[pd.DataFrame, pyarrow.Table]:
     """
     Get multiple BCB time series.
 
@@ -31,13 +46,50 @@ def get_series(
     last_n : int, optional
         Number of last observations.
 
+    store : SeriesStore, RangeCache or FrameCache, optional
+        Read the series through a :py:class:`seriesbr.store.SeriesStore`,
+        which downloads only observations newer than the stored ones, a
+        :py:class:`seriesbr.range_cache.RangeCache`, which downloads only the
+        dates not cached yet, or a :py:class:`seriesbr.frame_cache.FrameCache`,
+        which returns cached frames at once and refreshes them in the
+        background.
+
+    output : str, optional
+        "pandas" for a DataFrame or "arrow" for a ``pyarrow.Table``, decoded
+        without going through pandas.
+
     Returns
     -------
-    pandas.DataFrame
+    pandas.DataFrame or pyarrow.Table
+    """
+    arrow.check_output(output)
+
+    if store is not None:
+        if output == "arrow":
+            raise ValueError("A saída em Arrow não pode ser usada com 'store'.")
+        return store.get_series("bcb", code, start=start, end=end, last_n=last_n)
+
+    url, params = build_url(code, start, end, last_n)
+    json = session.get_json(url, params=params)
+
+    if output == "arrow":
+        return build_table(json, code)
+
+    return build_df(json, code)
+
+
+@instrumentation.instrument
+async def aget_series(
+    code: int,
+    start: str = None,
+    end: str = None,
+    last_n: int = None,
+) -> pd.DataFrame:
+    """
+    Asynchronous version of :py:func:`get_series`.
     """
     url, params = build_url(code, start, end, last_n)
-    response = session.get(url, params=params)
-    json = response.json()
+    json = await async_session.get_json(url, params=params)
     return build_df(json, code)
 
 
@@ -55,6 +107,60 @@ class BcbUrlParams(BcbDefaultUrlParams, BcbOptionalUrlParams):
     pass
 
 
+def iter_series(
+    code: int,
+    start: str = None,
+    end: str = None,
+    chunk_years: int = 10,
+    prefetch: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """
+    Get a BCB time series in chunks of ``chunk_years`` years, yielding each
+    one as soon as it is downloaded.
+
+    Parameters
+    ----------
+    code : int
+        Series code.
+
+    start : str, optional
+        Initial date. Defaults to 1970.
+
+    end : str, optional
+        Final date. Defaults to today.
+
+    chunk_years : int, optional
+        Number of years per chunk.
+
+    prefetch : int, optional
+        Number of chunks downloaded ahead of the one being consumed.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Chunks in chronological order. Periods without observations are
+        skipped.
+    """
+    start_date = dates.parse_start_date(start) if start else dates.UNIX_EPOCH
+    end_date = dates.parse_end_date(end) if end else datetime.today()
+
+    def fetch(window: chunks.Window) -> Optional[pd.DataFrame]:
+        url, params = build_url(code, *chunks.format_window(window))
+
+        try:
+            json = session.get_json(url, params=params)
+        except requests.exceptions.HTTPError as error:
+            # BCB answers with 404 when there are no observations in the period
+            if error.response.status_code == 404:
+                return None
+            raise
+
+        return build_df(json, code) if json else None
+
+    windows = chunks.date_windows(start_date, end_date, chunk_years)
+    return chunks.iter_windows(fetch, windows, prefetch=prefetch)
+
+
 def build_url(
     code: int, start: str = None, end: str = None, last_n: int = None
 ) -> Tuple[str, BcbUrlParams]:
@@ -78,6 +184,7 @@ def build_url(
     return url, params
 
 
+@instrumentation.instrument_build
 def build_df(json: dict, code: int) -> pd.DataFrame:
     df = pd.DataFrame(json)
 
@@ -88,3 +195,13 @@ def build_df(json: dict, code: int) -> pd.DataFrame:
     df = df.set_index("Date")
 
     return df
+
+
+@instrumentation.instrument_build
+def build_table(json: dict, code: int) -> pyarrow.Table:
+    pa = arrow.import_pyarrow()
+
+    date_column = arrow.parse_dates(arrow.column(json, "data"), "%d/%m/%Y")
+    value_column = pa.array(arrow.column(json, "valor"), type=pa.string())
+
+    return pa.table({"Date": date_column, str(code): value_column.cast(pa.float64())})
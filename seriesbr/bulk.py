@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from collections import Counter
+from seriesbr.sources import SOURCES, check_source
+from seriesbr.utils.lazy import lazy_import
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from concurrent import futures
+else:
+    np = lazy_import("numpy")
+    pd = lazy_import("pandas")
+    futures = lazy_import("concurrent.futures")
+
+SeriesSpec = Union[Tuple[str, Any], Tuple[str, Any, Dict[str, Any]]]
+
+
+def get_many(specs: List[SeriesSpec], max_workers: int = 8) -> pd.DataFrame:
+    """
+    Get series from any source concurrently, aligned on a common date index.
+
+    Parameters
+    ----------
+    specs : list of tuples
+        Tuples of ``(source, code)`` or ``(source, code, options)``, where
+        source is "bcb", "ipea" or "ibge", and options are keyword arguments
+        to the source's ``get_series``. The ``name`` option sets the column
+        name, which defaults to the series code and must be unique.
+
+    max_workers : int, optional
+        Number of series fetched concurrently.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A DataFrame with one column per series, indexed by the union of all
+        dates.
+    """
+    parsed_specs = [parse_spec(spec) for spec in specs]
+
+    # Fail before downloading anything when the names already clash
+    check_unique([name for _, _, name, _ in parsed_specs])
+
+    def fetch(spec: Tuple[str, Any, str, Dict[str, Any]]) -> pd.DataFrame:
+        source, code, _, options = spec
+        return SOURCES[source](code, **options)
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(fetch, parsed_specs))
+
+    columns = [
+        column
+        for (source, _, name, _), df in zip(parsed_specs, frames)
+        for column in to_columns(df, source, name).items()
+    ]
+
+    # Series with many columns may still clash with other names
+    check_unique([name for name, _ in columns])
+
+    return align(dict(columns))
+
+
+def parse_spec(spec: SeriesSpec) -> Tuple[str, Any, str, Dict[str, Any]]:
+    source, code, *rest = spec
+    options = dict(rest[0]) if rest else {}
+
+    check_source(source)
+
+    name = str(options.pop("name", code))
+
+    return source, code, name, options
+
+
+def check_unique(names: List[str]) -> None:
+    duplicates = sorted(name for name, count in Counter(names).items() if count > 1)
+    if duplicates:
+        raise ValueError(
+            f"Há mais de uma coluna chamada {', '.join(duplicates)}. "
+            "Use a opção 'name' para dar nomes diferentes às séries."
+        )
+
+
+def to_columns(df: pd.DataFrame, source: str, name: str) -> Dict[str, pd.Series]:
+    if source == "ibge":
+        df = df[["Valor"]]
+
+    df = df.select_dtypes("number")
+
+    if not df.index.is_unique:
+        raise ValueError(
+            f"A série '{name}' tem mais de uma observação por data. "
+            "Adicione filtros para que ela tenha uma única observação por data."
+        )
+
+    if len(df.columns) == 1:
+        return {name: df.iloc[:, 0]}
+
+    return {f"{name}_{column}": df[column] for column in df.columns}
+
+
+def align(columns: Dict[str, pd.Series]) -> pd.DataFrame:
+    """Reindex all columns to the union of their dates at once."""
+    if not columns:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="Date"))
+
+    values = np.concatenate([column.index.values for column in columns.values()])
+    index = pd.DatetimeIndex(np.unique(values), name="Date")
+
+    return pd.DataFrame(
+        {name: column.reindex(index) for name, column in columns.items()},
+        index=index,
+    )
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+import threading
+
+from seriesbr import bcb, ipea, ibge
+from seriesbr.sources import check_source
+from seriesbr.utils.arrow import import_pyarrow
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow
+
+SOURCES: Dict[str, Callable[..., Iterator[pd.DataFrame]]] = {
+    "bcb": bcb.iter_series,
+    "ipea": ipea.iter_series,
+    "ibge": ibge.iter_series,
+}
+
+FORMATS = ["parquet", "arrow"]
+
+
+def export(
+    source: str, code: Any, path: str, format: str = "parquet", **options
+) -> int:
+    """
+    Download a series chunk by chunk straight into a Parquet or Arrow file.
+
+    Each chunk returned by the source's ``iter_series`` is written as soon as
+    it is downloaded, as a Parquet row group or an Arrow record batch, instead
+    of concatenating the whole series first. Chunks are still parsed into
+    DataFrames and converted to Arrow one at a time.
+
+    Parameters
+    ----------
+    source : str
+        "bcb", "ipea" or "ibge".
+
+    code : int or str
+        Series code, or table code for IBGE.
+
+    path : str
+        File to write.
+
+    format : str, optional
+        "parquet" or "arrow" (Arrow IPC file format).
+
+    **options
+        Other arguments to the source's ``iter_series``, e.g. ``start``,
+        ``chunk_years`` or ``locations``.
+
+    Returns
+    -------
+    int
+        Number of rows written.
+
+    Examples
+    --------
+    >>> export("ibge", 1419, "ipca.parquet", locations={"municipalities": True})
+    """
+    check_source(source, SOURCES)
+
+    return write_chunks(SOURCES[source](code, **options), path, format=format)
+
+
+def write_chunks(
+    chunks: Iterable[pd.DataFrame], path: str, format: str = "parquet"
+) -> int:
+    """
+    Write DataFrame chunks to a Parquet or Arrow file, one row group or record
+    batch per chunk. Every chunk must have the columns of the first one.
+    """
+    if format not in FORMATS:
+        raise ValueError(
+            f"Formato '{format}' desconhecido. Use um entre: {', '.join(FORMATS)}."
+        )
+
+    pa = import_pyarrow()
+
+    # Written atomically, so an interrupted export does not leave a partial file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    writer = None
+    schema = None
+    rows = 0
+
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=True)
+
+            if writer is None:
+                schema = widen_dictionaries(pa, table.schema)
+                table = table.cast(schema)
+                writer = open_writer(pa, tmp_path, schema, format)
+
+            writer.write_table(table)
+            rows += table.num_rows
+
+        if writer is None:
+            writer = open_writer(pa, tmp_path, pa.schema([]), format)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    writer.close()
+    os.replace(tmp_path, path)
+
+    return rows
+
+
+def widen_dictionaries(pa: Any, schema: pyarrow.Schema) -> pyarrow.Schema:
+    """
+    Use 32-bit indices for categorical columns, whose indices pyarrow sizes
+    after the number of categories of the first chunk.
+    """
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            dictionary = pa.dictionary(pa.int32(), field.type.value_type)
+            schema = schema.set(i, field.with_type(dictionary))
+    return schema
+
+
+def open_writer(pa: Any, path: str, schema: pyarrow.Schema, format: str):
+    if format == "arrow":
+        return pa.ipc.new_file(path, schema)
+    return pa.parquet.ParquetWriter(path, schema)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import time
+import threading
+
+from collections import OrderedDict
+from seriesbr.sources import SOURCES, check_source
+from seriesbr.utils.lazy import lazy_import
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Tuple, TypedDict
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from concurrent import futures
+else:
+    futures = lazy_import("concurrent.futures")
+
+FrameCacheStats = TypedDict(
+    "FrameCacheStats",
+    {
+        "entries": int,
+        "hits": int,
+        "stale_hits": int,
+        "misses": int,
+        "refreshes": int,
+        "refresh_errors": int,
+    },
+)
+
+
+class FrameCache:
+    """
+    In-memory cache of series frames that never makes callers wait for a
+    refresh of a frame they already got once.
+
+    Frames younger than ``ttl`` seconds are returned as they are. Older ones
+    are still returned immediately, while a background thread downloads
+    them again, as long as they are younger than ``max_stale`` seconds.
+    Older frames, and frames not cached, are downloaded before returning.
+    Only one refresh of a frame runs at a time, and after a failed refresh
+    the next one waits ``retry_interval`` seconds, doubling after each
+    consecutive failure, so a failing source is not hit on every call.
+
+    Returned frames are shared between callers, so they should not be
+    modified.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        Seconds a frame is fresh.
+
+    max_stale : float, optional
+        Seconds after which a frame is too old to be returned.
+
+    max_entries : int, optional
+        Number of frames kept. Least recently used ones are dropped first.
+
+    max_workers : int, optional
+        Number of frames refreshed concurrently.
+
+    retry_interval : float, optional
+        Seconds to wait before refreshing a frame again after a failure.
+
+    Examples
+    --------
+    >>> cache = FrameCache(ttl=300, max_stale=86400)
+    >>> bcb.get_series(433, start="2019", store=cache)
+    >>> cache.stats()["misses"]
+    1
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_stale: float = 3600,
+        max_entries: int = 1024,
+        max_workers: int = 2,
+        retry_interval: float = 30,
+    ):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.max_workers = max_workers
+        self.retry_interval = retry_interval
+        self.entries: OrderedDict[Tuple, Tuple[pd.DataFrame, float]]
+        self.entries = OrderedDict()
+        self.refreshing: Set[Tuple] = set()
+        # Consecutive failed refreshes and when to try again, by key
+        self.backoff: Dict[Tuple, Tuple[int, float]] = {}
+        self.executor: Optional[futures.ThreadPoolExecutor] = None
+        self.counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+        self.lock = threading.Lock()
+
+    def key(self, source: str, code: Any, arguments: Dict[str, Any]) -> Tuple:
+        return source, str(code), json.dumps(arguments, sort_keys=True, default=str)
+
+    def get_series(
+        self,
+        source: str,
+        code: Any,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        last_n: Optional[int] = None,
+        **options,
+    ) -> pd.DataFrame:
+        """Get a series from the cache, downloading it only if missing or too old."""
+        check_source(source)
+
+        arguments = {"start": start, "end": end, "last_n": last_n, **options}
+        key = self.key(source, code, arguments)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            age = time.monotonic() - entry[1] if entry else float("inf")
+
+            if entry and age <= self.max_stale:
+                self.entries.move_to_end(key)
+
+                if age <= self.ttl:
+                    self.counters["hits"] += 1
+                    return entry[0]
+
+                self.counters["stale_hits"] += 1
+                if self.should_refresh(key):
+                    self.refreshing.add(key)
+                    self.get_executor().submit(
+                        self.refresh, key, source, code, arguments
+                    )
+                return entry[0]
+
+            self.counters["misses"] += 1
+
+        return self.fetch(key, source, code, arguments)
+
+    def should_refresh(self, key: Tuple) -> bool:
+        _, retry_at = self.backoff.get(key, (0, 0.0))
+        return key not in self.refreshing and time.monotonic() >= retry_at
+
+    def fetch(
+        self, key: Tuple, source: str, code: Any, arguments: Dict[str, Any]
+    ) -> pd.DataFrame:
+        df = SOURCES[source](code, **arguments)
+
+        with self.lock:
+            self.entries[key] = (df, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                evicted, _ = self.entries.popitem(last=False)
+                self.backoff.pop(evicted, None)
+
+        return df
+
+    def refresh(
+        self, key: Tuple, source: str, code: Any, arguments: Dict[str, Any]
+    ) -> None:
+        try:
+            self.fetch(key, source, code, arguments)
+            with self.lock:
+                self.counters["refreshes"] += 1
+                self.backoff.pop(key, None)
+        except Exception:
+            # The stale frame keeps being served until max_stale
+            with self.lock:
+                self.counters["refresh_errors"] += 1
+                failures = self.backoff.get(key, (0, 0.0))[0] + 1
+                delay = min(self.retry_interval * 2 ** (failures - 1), self.max_stale)
+                self.backoff[key] = (failures, time.monotonic() + delay)
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def get_executor(self) -> futures.ThreadPoolExecutor:
+        if self.executor is None:
+            self.executor = futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="seriesbr-refresh"
+            )
+        return self.executor
+
+    def stats(self) -> FrameCacheStats:
+        with self.lock:
+            return {"entries": len(self.entries), **self.counters}  # type: ignore
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.backoff.clear()
@@ -1,5 +1,13 @@
-from seriesbr.utils import session
-from typing import Tuple
+from __future__ import annotations
+
+from seriesbr.utils import session, async_session
+from seriesbr.utils.lazy import lazy_import
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from concurrent import futures
+else:
+    futures = lazy_import("concurrent.futures")
 
 
 def get_metadata(table: int) -> dict:
@@ -21,10 +29,36 @@ def get_metadata(table: int) -> dict:
     classificacoes    [{'id': 315, 'nome': 'Geral, grupo, subgrupo, ...
     """
     url, _ = build_url(table)
-    response = session.get(url)
-    json = response.json()
+    json = session.get_json(url)
+    return json
+
+
+async def aget_metadata(table: int) -> dict:
+    """
+    Asynchronous version of :py:func:`get_metadata`.
+    """
+    url, _ = build_url(table)
+    json = await async_session.get_json(url)
     return json
 
 
+def get_metadata_many(tables: List[int], max_workers: int = 4) -> Dict[int, dict]:
+    """
+    Get metadata of many IBGE tables concurrently.
+
+    The API has no endpoint for several tables at once, so one request is
+    made per table.
+
+    Returns
+    -------
+    dict
+        Metadata by table code.
+    """
+    tables = list(dict.fromkeys(tables))
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(tables, executor.map(get_metadata, tables)))
+
+
 def build_url(table: int) -> Tuple[str, None]:
     return f"https://servicodados.ibge.gov.br/api/v3/agregados/{table}/metadados", None
@@ -1,10 +1,30 @@
-import requests
-import pandas as pd
+from __future__ import annotations
 
-from seriesbr.utils import session, dates
-from .metadata import get_metadata
+from seriesbr.utils import session, async_session, dates, instrumentation, chunks, arrow
+from seriesbr.utils.lazy import lazy_import
+from .metadata import get_metadata, aget_metadata
 from datetime import datetime
-from typing import List, Union, Literal, TypedDict, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Iterator,
+    List,
+    Union,
+    Literal,
+    TypedDict,
+    Optional,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    import pyarrow
+    import requests
+    import pandas as pd
+    from seriesbr.store import SeriesStore
+    from seriesbr.range_cache import RangeCache
+    from seriesbr.frame_cache import FrameCache
+else:
+    requests = lazy_import("requests")
+    pd = lazy_import("pandas")
 
 BASEURL = "https://servicodados.ibge.gov.br/api/v3/agregados/"
 
@@ -33,6 +53,7 @@ LocationsInput = TypedDict(
 )
 
 
+@instrumentation.instrument
 def get_series(
     table: int,
     variables: VariableInput = None,
@@ -41,7 +62,9 @@ def get_series(
     last_n: int = None,
     locations: LocationsInput = None,
     classifications: ClassificationInput = None,
-) -> pd.DataFrame:
+    store: Union[SeriesStore, RangeCache, FrameCache] = None,
+    output: str = "pandas",
+) -> Union[pd.DataFrame, pyarrow.Table]:
     """
     Get an IBGE table
 
@@ -74,9 +97,21 @@ def get_series(
 
     classifications : dict, int, str or list, optional
 
+    store : SeriesStore, RangeCache or FrameCache, optional
+        Read the series through a :py:class:`seriesbr.store.SeriesStore`,
+        which downloads only observations newer than the stored ones, a
+        :py:class:`seriesbr.range_cache.RangeCache`, which downloads only the
+        dates not cached yet, or a :py:class:`seriesbr.frame_cache.FrameCache`,
+        which returns cached frames at once and refreshes them in the
+        background.
+
+    output : str, optional
+        "pandas" for a DataFrame or "arrow" for a ``pyarrow.Table``, decoded
+        without going through pandas.
+
     Returns
     -------
-    pandas.DataFrame
+    pandas.DataFrame or pyarrow.Table
         A DataFrame with series values and metadata.
 
     Examples
@@ -89,6 +124,25 @@ def get_series(
     2019-11-01            Brasil  IPCA - Variação acumulada em 12 meses   Índice geral                              3.27
     2019-11-01            Brasil                     IPCA - Peso mensal   Índice geral                            100.00
     """
+    arrow.check_output(output)
+
+    if store is not None:
+        if output == "arrow":
+            raise ValueError("A saída em Arrow não pode ser usada com 'store'.")
+
+        table_options = {
+            name: value
+            for name, value in [
+                ("variables", variables),
+                ("locations", locations),
+                ("classifications", classifications),
+            ]
+            if value
+        }
+        return store.get_series(
+            "ibge", table, start=start, end=end, last_n=last_n, **table_options
+        )
+
     metadata = get_metadata(table)
     frequency: IbgeFrequency = metadata["periodicidade"]["frequencia"]
 
@@ -105,19 +159,144 @@ def get_series(
     )
 
     try:
-        response = session.get(url, params=params)
-        json = response.json()
+        json = session.get_json(url, params=params)
+    except requests.exceptions.HTTPError as error:
+        explain_http_error(error.response.status_code)
+        raise error
+
+    if output == "arrow":
+        return build_table(json, frequency)
+
+    return build_df(json, frequency)
+
+
+@instrumentation.instrument
+async def aget_series(
+    table: int,
+    variables: VariableInput = None,
+    start: str = None,
+    end: str = None,
+    last_n: int = None,
+    locations: LocationsInput = None,
+    classifications: ClassificationInput = None,
+) -> pd.DataFrame:
+    """
+    Asynchronous version of :py:func:`get_series`.
+    """
+    metadata = await aget_metadata(table)
+    frequency: IbgeFrequency = metadata["periodicidade"]["frequencia"]
+
+    url, params = build_url(
+        table,
+        metadata,
+        frequency,
+        variables=variables,
+        start=start,
+        end=end,
+        last_n=last_n,
+        locations=locations,
+        classifications=classifications,
+    )
+
+    httpx = async_session.import_httpx()
+
+    try:
+        json = await async_session.get_json(url, params=params)
         df = build_df(json, frequency)
         return df
-    except requests.exceptions.HTTPError as error:
-        if error.response.status_code == 500:
-            print(
-                "A consulta pode ter retornado mais que 100.000 linhas. "
-                "Tente adicionar mais filtros."
-            )
+    except httpx.HTTPStatusError as error:
+        explain_http_error(error.response.status_code)
         raise error
 
 
+def iter_series(
+    table: int,
+    variables: VariableInput = None,
+    start: str = None,
+    end: str = None,
+    locations: LocationsInput = None,
+    classifications: ClassificationInput = None,
+    chunk_years: int = 10,
+    prefetch: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """
+    Get an IBGE table in chunks of ``chunk_years`` years, yielding each one
+    as soon as it is downloaded.
+
+    Smaller chunks also help with queries that would exceed the limit of
+    100.000 rows per request.
+
+    Parameters
+    ----------
+    table : int
+        Table code.
+
+    variables : int or list of int, optional
+        Variable's code.
+
+    start : int or str, optional
+        Initial date. Defaults to the first period of the table.
+
+    end : int or str, optional
+        Final date. Defaults to today.
+
+    locations : dict, optional
+
+    classifications : dict, int, str or list, optional
+
+    chunk_years : int, optional
+        Number of years per chunk.
+
+    prefetch : int, optional
+        Number of chunks downloaded ahead of the one being consumed.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Chunks in chronological order. Periods without observations are
+        skipped.
+    """
+    metadata = get_metadata(table)
+    frequency: IbgeFrequency = metadata["periodicidade"]["frequencia"]
+
+    first_year = int(str(metadata["periodicidade"]["inicio"])[:4])
+    start_date = dates.parse_start_date(start) if start else datetime(first_year, 1, 1)
+    end_date = dates.parse_end_date(end) if end else datetime.today()
+
+    def fetch(window: chunks.Window) -> Optional[pd.DataFrame]:
+        window_start, window_end = chunks.format_window(window)
+        url, params = build_url(
+            table,
+            metadata,
+            frequency,
+            variables=variables,
+            start=window_start,
+            end=window_end,
+            locations=locations,
+            classifications=classifications,
+        )
+
+        try:
+            json = session.get_json(url, params=params)
+        except requests.exceptions.HTTPError as error:
+            explain_http_error(error.response.status_code)
+            raise error
+
+        # The first row holds the column labels
+        return build_df(json, frequency) if len(json) > 1 else None
+
+    windows = chunks.date_windows(start_date, end_date, chunk_years)
+    return chunks.iter_windows(fetch, windows, prefetch=prefetch)
+
+
+def explain_http_error(status_code: int) -> None:
+    if status_code == 500:
+        print(
+            "A consulta pode ter retornado mais que 100.000 linhas. "
+            "Tente adicionar mais filtros."
+        )
+
+
 def get_date_format(freq: IbgeFrequency) -> str:
     formats = {"mensal": "%Y%m", "anual": "%Y", "trimestral": "%Y0%q"}
     return formats[freq]
@@ -157,6 +336,7 @@ selected_ibge_columns = [
 ]
 
 
+@instrumentation.instrument_build
 def build_df(json: dict, freq: IbgeFrequency) -> pd.DataFrame:
     columns, data = json[0], json[1:]
 
@@ -193,6 +373,39 @@ def build_df(json: dict, freq: IbgeFrequency) -> pd.DataFrame:
     return df
 
 
+@instrumentation.instrument_build
+def build_table(json: list, freq: IbgeFrequency) -> pyarrow.Table:
+    pa = arrow.import_pyarrow()
+    labels, rows = json[0], json[1:]
+
+    periods = arrow.column(rows, ibge_columns["period_code"])
+
+    if freq == "trimestral":
+        # Quarters are like 201901, for the first quarter of 2019
+        quarters = [
+            datetime(int(period[:4]), 3 * int(period[4:]) - 2, 1) for period in periods
+        ]
+        date_column = pa.array(quarters, type=pa.timestamp("s")).cast(pa.date32())
+    else:
+        date_column = arrow.parse_dates(periods, get_date_format(freq))
+
+    columns = {
+        "Date": date_column,
+        "Valor": arrow.to_float(arrow.column(rows, ibge_columns["value"])),
+    }
+
+    # Same as build_df, which fails selecting columns absent from every row
+    present = set().union(*rows)
+    missing = [code for code in selected_ibge_columns if code not in present]
+    if missing:
+        raise KeyError(f"{missing} not in index")
+
+    for code in selected_ibge_columns:
+        columns[labels.get(code, code)] = arrow.to_categories(arrow.column(rows, code))
+
+    return pa.table(columns)
+
+
 IbgeUrlParams = TypedDict(
     "IbgeUrlParams",
     {"classificacao": str, "localidades": str, "view": str},
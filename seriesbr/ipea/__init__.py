@@ -1,4 +1,15 @@
-from .series import get_series
-from .metadata import get_metadata
+from .series import get_series, aget_series, iter_series
+from .metadata import get_metadata, get_metadata_many, aget_metadata
+from .catalog import search, lookup, update_catalog
 
-__all__ = ['get_series', 'get_metadata']
+__all__ = [
+    'get_series',
+    'get_metadata',
+    'get_metadata_many',
+    'aget_series',
+    'aget_metadata',
+    'iter_series',
+    'search',
+    'lookup',
+    'update_catalog',
+]
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import os
+import re
+import gzip
+import json
+import bisect
+import unicodedata
+
+from seriesbr.utils import session
+from seriesbr.utils.lazy import lazy_import
+from seriesbr.utils.paths import get_cache_dir
+from .metadata import metadata_columns, build_metadata_df
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = lazy_import("pandas")
+
+CATALOG_VERSION = 1
+
+CATALOG_FILENAME = "ipea-catalog.json.gz"
+
+indexed_columns = ["SERNOME", "SERCOMENTARIO"]
+
+# Loaded catalogs, keyed by path and invalidated by modification time
+_loaded: Dict[str, Tuple[float, dict, pd.DataFrame]] = {}
+
+
+def get_catalog_path(path: Optional[str] = None) -> str:
+    return path or os.path.join(get_cache_dir(), CATALOG_FILENAME)
+
+
+def update_catalog(path: Optional[str] = None) -> str:
+    """
+    Download metadata of all IPEA series and store it locally.
+
+    Parameters
+    ----------
+    path : str, optional
+        Where to store the catalog. Defaults to the seriesbr cache directory.
+
+    Returns
+    -------
+    str
+        The catalog path.
+    """
+    path = get_catalog_path(path)
+
+    url, params = build_url()
+    records = session.get_json(url, params=params)["value"]
+
+    catalog = build_catalog(records)
+
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(catalog, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+    _loaded.pop(path, None)
+
+    return path
+
+
+def build_url() -> Tuple[str, dict]:
+    params = {"$select": ",".join(metadata_columns)}
+    return "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados", params
+
+
+def build_catalog(records: List[dict]) -> dict:
+    """
+    Build a column-oriented catalog with a token index over series names and
+    comments.
+
+    The index maps each token to the sorted positions of the rows where it
+    appears.
+    """
+    columns: Dict[str, list] = {
+        column: [record.get(column) for record in records]
+        for column in metadata_columns
+    }
+
+    index: Dict[str, List[int]] = {}
+    for column in indexed_columns:
+        for position, text in enumerate(columns[column]):
+            for token in tokenize(text):
+                postings = index.setdefault(token, [])
+                if not postings or postings[-1] != position:
+                    postings.append(position)
+
+    index = {token: sorted(set(postings)) for token, postings in index.items()}
+
+    return {"version": CATALOG_VERSION, "columns": columns, "index": index}
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lowercase tokens without accents and HTML tags.
+
+    Examples
+    --------
+    >>> catalog.tokenize("Taxa de juros - <b>Over</b> / Selic")
+    ['taxa', 'de', 'juros', 'over', 'selic']
+    """
+    if not text:
+        return []
+
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+
+    return re.findall(r"\w+", text)
+
+
+def load_catalog(path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load the local IPEA catalog, downloading it first if it does not exist.
+
+    Parameters
+    ----------
+    path : str, optional
+        Catalog path. Defaults to the seriesbr cache directory.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Metadata of all IPEA series, indexed by series code.
+    """
+    _, df = _load(path)
+    return df
+
+
+def _load(path: Optional[str] = None) -> Tuple[dict, pd.DataFrame]:
+    path = get_catalog_path(path)
+
+    if not os.path.exists(path):
+        update_catalog(path)
+
+    mtime = os.path.getmtime(path)
+    cached = _loaded.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        catalog = json.load(f)
+
+    if catalog.get("version") != CATALOG_VERSION:
+        update_catalog(path)
+        return _load(path)
+
+    columns = catalog["columns"]
+    records = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    df = build_metadata_df(records)
+
+    index = catalog["index"]
+    catalog["tokens"] = sorted(index)
+
+    _loaded[path] = (mtime, catalog, df)
+
+    return catalog, df
+
+
+def search(query: str, path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Search IPEA series by name and comment in the local catalog.
+
+    Every word in the query must match the beginning of a word in the series
+    name or comment, ignoring case and accents.
+
+    Parameters
+    ----------
+    query : str
+        Search terms.
+
+    path : str, optional
+        Catalog path. Defaults to the seriesbr cache directory.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Metadata of matching series, indexed by series code.
+
+    Examples
+    --------
+    >>> ipea.search("juros selic")[["SERNOME", "PERNOME"]].head(2)
+                                              SERNOME  PERNOME
+    SERCODIGO
+    BM12_TJOVER12        Taxa de juros - Over / Selic   Mensal
+    BM366_TJOVER366      Taxa de juros - Over / Selic   Diária
+    """
+    catalog, df = _load(path)
+
+    index: Dict[str, List[int]] = catalog["index"]
+    tokens: List[str] = catalog["tokens"]
+
+    matches: Optional[set] = None
+
+    for term in tokenize(query):
+        positions = set()
+
+        i = bisect.bisect_left(tokens, term)
+        while i < len(tokens) and tokens[i].startswith(term):
+            positions.update(index[tokens[i]])
+            i += 1
+
+        matches = positions if matches is None else matches & positions
+
+        if not matches:
+            break
+
+    if matches is None:
+        return df.iloc[:0]
+
+    return df.iloc[sorted(matches)]
+
+
+def lookup(codes: Union[str, List[str]], path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Get metadata of many IPEA series from the local catalog.
+
+    Parameters
+    ----------
+    codes : str or list of str
+        Series codes.
+
+    path : str, optional
+        Catalog path. Defaults to the seriesbr cache directory.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Metadata of the requested series found in the catalog, indexed by
+        series code.
+    """
+    if isinstance(codes, str):
+        codes = [codes]
+
+    df = load_catalog(path)
+    return df.loc[[code for code in codes if code in df.index]]
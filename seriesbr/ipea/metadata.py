@@ -1,5 +1,15 @@
-from seriesbr.utils import session
-from typing import Tuple, TypedDict
+from __future__ import annotations
+
+from seriesbr.utils import session, async_session
+from seriesbr.utils.lazy import lazy_import
+from typing import TYPE_CHECKING, List, Tuple, TypedDict
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from concurrent import futures
+else:
+    pd = lazy_import("pandas")
+    futures = lazy_import("concurrent.futures")
 
 
 class IpeaMetadata(TypedDict):
@@ -13,6 +23,13 @@ class IpeaMetadata(TypedDict):
     PERNOME: str
 
 
+metadata_columns = list(IpeaMetadata.__annotations__)
+
+metadata_date_columns = ["SERATUALIZACAO", "SERMAXDATA", "SERMINDATA"]
+
+metadata_categorical_columns = ["BASNOME", "PERNOME"]
+
+
 def get_metadata(code: str) -> IpeaMetadata:
     """
     Get IPEA time series metadata.
@@ -36,10 +53,100 @@ def get_metadata(code: str) -> IpeaMetadata:
     BASNOME                                            Macroeconômico
     """
     url, params = build_url(code)
-    response = session.get(url, params=params)
-    json = response.json()
+    json = session.get_json(url, params=params)
+    return json["value"][0]
+
+
+async def aget_metadata(code: str) -> IpeaMetadata:
+    """
+    Asynchronous version of :py:func:`get_metadata`.
+    """
+    url, params = build_url(code)
+    json = await async_session.get_json(url, params=params)
     return json["value"][0]
 
 
 def build_url(code: str) -> Tuple[str, None]:
     return f"http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados('{code}')", None
+
+
+def get_metadata_many(
+    codes: List[str], batch_size: int = 50, max_workers: int = 4
+) -> pd.DataFrame:
+    """
+    Get metadata of many IPEA time series, fetching several codes per request.
+
+    Parameters
+    ----------
+    codes : list of str
+        Series codes.
+
+    batch_size : int, optional
+        Number of codes fetched per request.
+
+    max_workers : int, optional
+        Number of batches fetched concurrently.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Metadata indexed by series code, in the same order as ``codes``.
+        Series not found are left out.
+
+    """
+    codes = list(dict.fromkeys(codes))
+    batches = [codes[i : i + batch_size] for i in range(0, len(codes), batch_size)]
+
+    def fetch(batch: List[str]) -> List[IpeaMetadata]:
+        url, params = build_batch_url(batch)
+        return session.get_json(url, params=params)["value"]
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(fetch, batches))
+
+    records = [record for result in results for record in result]
+
+    df = build_metadata_df(records)
+    return df.loc[[code for code in codes if code in df.index]]
+
+
+def quote(value) -> str:
+    """
+    Quote a value as an OData string literal, doubling single quotes.
+
+    Examples
+    --------
+    >>> metadata.quote("D'ÁGUA")
+    "'D''ÁGUA'"
+    """
+    escaped_value = str(value).replace("'", "''")
+    return f"'{escaped_value}'"
+
+
+def build_batch_url(codes: List[str]) -> Tuple[str, dict]:
+    conditions = [f"SERCODIGO eq {quote(code)}" for code in codes]
+    params = {
+        "$select": ",".join(metadata_columns),
+        "$filter": " or ".join(conditions),
+    }
+    return "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados", params
+
+
+def build_metadata_df(records: List[IpeaMetadata]) -> pd.DataFrame:
+    """
+    Build a typed DataFrame, indexed by series code, out of metadata records.
+
+    Dates are parsed as UTC timestamps and low cardinality columns (base and
+    periodicity names) are stored as categoricals.
+    """
+    df = pd.DataFrame(records, columns=metadata_columns)
+
+    for column in metadata_date_columns:
+        df[column] = pd.to_datetime(df[column], utc=True, errors="coerce")
+
+    for column in metadata_categorical_columns:
+        df[column] = df[column].astype("category")
+
+    df = df.set_index("SERCODIGO")
+
+    return df
@@ -1,18 +1,38 @@
-import pandas as pd
+from __future__ import annotations
 
 from datetime import datetime
-from .metadata import get_metadata, IpeaMetadata
-from seriesbr.utils import session, dates
-from dateutil.relativedelta import relativedelta
-from typing import Tuple, TypedDict, Optional
-
-
+from .metadata import get_metadata, aget_metadata, quote, IpeaMetadata
+from seriesbr.utils import session, async_session, dates, instrumentation, chunks, arrow
+from seriesbr.utils.lazy import lazy_import
+from typing import TYPE_CHECKING, Iterator, List, Tuple, TypedDict, Optional, Union
+
+if TYPE_CHECKING:
+    import pyarrow
+    import pandas as pd
+    from seriesbr.store import SeriesStore
+    from seriesbr.range_cache import RangeCache
+    from seriesbr.frame_cache import FrameCache
+    from dateutil import relativedelta
+else:
+    pd = lazy_import("pandas")
+    relativedelta = lazy_import("dateutil.relativedelta")
+
+TerritoryLevelInput = Union[str, List[str]]
+TerritoryInput = Union[str, int, List[str], List[int]]
+
+
+@instrumentation.instrument
 def get_series(
     code: str,
     start: str = None,
     end: str = None,
     last_n: int = None,
-) -> pd.DataFrame:
+    levels: TerritoryLevelInput = None,
+    territories: TerritoryInput = None,
+    wide: bool = False,
+    store: Union[SeriesStore, RangeCache, FrameCache] = None,
+    output: str = "pandas",
+) -> Union[pd.DataFrame, pyarrow.Table]:
     """
     Get multiple IPEA time series.
 
@@ -28,22 +48,186 @@ def get_series(
     end : str, optional
         Final date.
 
+    last_n : int, optional
+        Number of last observations.
+
+    levels : str or list of str, optional
+        Territorial levels (``NIVNOME``), e.g. "Estados" or "Municípios".
+
+    territories : str, int or list, optional
+        Territory codes (``TERCODIGO``), e.g. 33 for Rio de Janeiro.
+
+    wide : bool, optional
+        Return one column per territory instead of one row per observation.
+        Requires filtering by ``levels`` or ``territories``. With more than
+        one level, columns are indexed by level and territory.
+
+    store : SeriesStore, RangeCache or FrameCache, optional
+        Read the series through a :py:class:`seriesbr.store.SeriesStore`,
+        which downloads only observations newer than the stored ones, a
+        :py:class:`seriesbr.range_cache.RangeCache`, which downloads only the
+        dates not cached yet, or a :py:class:`seriesbr.frame_cache.FrameCache`,
+        which returns cached frames at once and refreshes them in the
+        background.
+
+    output : str, optional
+        "pandas" for a DataFrame or "arrow" for a ``pyarrow.Table``, decoded
+        without going through pandas. Arrow tables are always long.
+
     Returns
     -------
-    pandas.DataFrame
+    pandas.DataFrame or pyarrow.Table
     """
+    arrow.check_output(output)
+
+    if wide and not (levels or territories):
+        raise ValueError(
+            "Filtre a série por 'levels' ou 'territories' para obtê-la em formato largo."
+        )
+
+    if output == "arrow" and (wide or store is not None):
+        raise ValueError(
+            "A saída em Arrow não pode ser usada com 'wide' ou com 'store'."
+        )
+
+    if store is not None:
+        territory_options = {
+            name: value
+            for name, value in [
+                ("levels", levels),
+                ("territories", territories),
+                ("wide", wide),
+            ]
+            if value
+        }
+        return store.get_series(
+            "ipea", code, start=start, end=end, last_n=last_n, **territory_options
+        )
 
     metadata = get_metadata(code)
-    url, params = build_url(code, start, end, last_n, metadata)
+    url, params = build_url(
+        code, start, end, last_n, metadata, levels=levels, territories=territories
+    )
+
+    json = session.get_json(url, params=params)
+
+    if output == "arrow":
+        return build_table(json, code)
+
+    df = build_df(json, code, wide=wide)
+    return df
+
+
+@instrumentation.instrument
+async def aget_series(
+    code: str,
+    start: str = None,
+    end: str = None,
+    last_n: int = None,
+    levels: TerritoryLevelInput = None,
+    territories: TerritoryInput = None,
+    wide: bool = False,
+) -> pd.DataFrame:
+    """
+    Asynchronous version of :py:func:`get_series`.
+    """
+    if wide and not (levels or territories):
+        raise ValueError(
+            "Filtre a série por 'levels' ou 'territories' para obtê-la em formato largo."
+        )
+
+    metadata = await aget_metadata(code)
+    url, params = build_url(
+        code, start, end, last_n, metadata, levels=levels, territories=territories
+    )
 
-    response = session.get(url, params=params)
-    json = response.json()
+    json = await async_session.get_json(url, params=params)
 
-    df = build_df(json, code)
+    df = build_df(json, code, wide=wide)
     return df
 
 
-def build_df(json: dict, code: str) -> pd.DataFrame:
+def iter_series(
+    code: str,
+    start: str = None,
+    end: str = None,
+    levels: TerritoryLevelInput = None,
+    territories: TerritoryInput = None,
+    chunk_years: int = 10,
+    prefetch: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """
+    Get an IPEA time series in chunks of ``chunk_years`` years, yielding
+    each one as soon as it is downloaded.
+
+    Parameters
+    ----------
+    code : str
+        Series identifier.
+
+    start : str, optional
+        Initial date. Defaults to the first date of the series.
+
+    end : str, optional
+        Final date. Defaults to the last date of the series.
+
+    levels : str or list of str, optional
+        Territorial levels (``NIVNOME``), e.g. "Estados" or "Municípios".
+
+    territories : str, int or list, optional
+        Territory codes (``TERCODIGO``), e.g. 33 for Rio de Janeiro.
+
+    chunk_years : int, optional
+        Number of years per chunk.
+
+    prefetch : int, optional
+        Number of chunks downloaded ahead of the one being consumed.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Chunks in chronological order. Periods without observations are
+        skipped.
+    """
+    metadata = get_metadata(code)
+
+    def series_date(date: Optional[str], default: datetime) -> datetime:
+        return datetime.fromisoformat(date).replace(tzinfo=None) if date else default
+
+    start_date = (
+        dates.parse_start_date(start)
+        if start
+        else series_date(metadata["SERMINDATA"], dates.UNIX_EPOCH)
+    )
+    end_date = (
+        dates.parse_end_date(end)
+        if end
+        else series_date(metadata["SERMAXDATA"], datetime.utcnow())
+    )
+
+    def fetch(window: chunks.Window) -> Optional[pd.DataFrame]:
+        window_start, window_end = chunks.format_window(window)
+        url, params = build_url(
+            code,
+            window_start,
+            window_end,
+            None,
+            metadata,
+            levels=levels,
+            territories=territories,
+        )
+        json = session.get_json(url, params=params)
+        return build_df(json, code) if json["value"] else None
+
+    windows = chunks.date_windows(start_date, end_date, chunk_years)
+    return chunks.iter_windows(fetch, windows, prefetch=prefetch)
+
+
+territory_columns = ["NIVNOME", "TERCODIGO"]
+
+
+@instrumentation.instrument_build
+def build_df(json: dict, code: str, wide: bool = False) -> pd.DataFrame:
     json = json["value"]
     df = pd.DataFrame(json)
 
@@ -55,14 +239,49 @@ def build_df(json: dict, code: str) -> pd.DataFrame:
     df["VALVALOR"] = pd.to_numeric(df["VALVALOR"], errors="coerce")
     df = df.rename(columns={"VALVALOR": code})
 
+    for column in territory_columns:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+
+    if wide:
+        # Territory codes repeat across levels, e.g. a state and a region
+        multiple_levels = "NIVNOME" in df and df["NIVNOME"].nunique() > 1
+        columns = ["NIVNOME", "TERCODIGO"] if multiple_levels else "TERCODIGO"
+        df = df.pivot(columns=columns, values=code).sort_index(axis="columns")
+
     return df
 
 
+@instrumentation.instrument_build
+def build_table(json: dict, code: str) -> pyarrow.Table:
+    pa = arrow.import_pyarrow()
+    rows = json["value"]
+
+    # Dates are like 2019-01-01T00:00:00-03:00, keep only the date
+    date_strings = [date and date[:10] for date in arrow.column(rows, "VALDATA")]
+
+    columns = {
+        "Date": arrow.parse_dates(date_strings, "%Y-%m-%d"),
+        code: pa.array(arrow.column(rows, "VALVALOR"), type=pa.float64()),
+    }
+
+    for column in territory_columns:
+        if rows and column in rows[0]:
+            values = arrow.column(rows, column)
+            columns[column] = arrow.to_categories(
+                [None if value is None else str(value) for value in values]
+            )
+
+    return pa.table(columns)
+
+
 IpeaUrlParams = TypedDict(
     "IpeaUrlParams",
     {
         "$select": str,
         "$filter": str,
+        "$orderby": str,
+        "$top": int,
     },
     total=False,
 )
@@ -74,10 +293,16 @@ def build_url(
     end: Optional[str],
     last_n: Optional[int],
     metadata: IpeaMetadata,
+    levels: TerritoryLevelInput = None,
+    territories: TerritoryInput = None,
 ) -> Tuple[str, IpeaUrlParams]:
     params: IpeaUrlParams
     params = {"$select": "VALDATA,VALVALOR"}
 
+    territory_filter = ipea_filter_by_territory(levels, territories)
+    if territory_filter:
+        params["$select"] += "," + ",".join(territory_columns)
+
     url = (
         f"http://ipeadata2-homologa.ipea.gov.br/api/v1/ValoresSerie(SERCODIGO='{code}')"
     )
@@ -97,23 +322,23 @@ def build_url(
     if last_n:
         periodicity = metadata["PERNOME"]
         if periodicity == "Anual":
-            offset_date = max_date - relativedelta(years=last_n)
+            offset_date = max_date - relativedelta.relativedelta(years=last_n)
         elif periodicity == "Quadrienal":
-            offset_date = max_date - relativedelta(years=4 * last_n)
+            offset_date = max_date - relativedelta.relativedelta(years=4 * last_n)
         elif periodicity == "Quinquenal":
-            offset_date = max_date - relativedelta(years=5 * last_n)
+            offset_date = max_date - relativedelta.relativedelta(years=5 * last_n)
         elif periodicity == "Decenal":
-            offset_date = max_date - relativedelta(years=10 * last_n)
+            offset_date = max_date - relativedelta.relativedelta(years=10 * last_n)
         elif periodicity == "Trimestral":
-            offset_date = max_date - relativedelta(months=3 * last_n)
+            offset_date = max_date - relativedelta.relativedelta(months=3 * last_n)
         elif periodicity == "Mensal":
-            offset_date = max_date - relativedelta(months=last_n)
+            offset_date = max_date - relativedelta.relativedelta(months=last_n)
         elif periodicity == "Irregular":
             offset_date = max_date
         else:
             offset_date = max_date
 
-        params["$filter"] = f"VALDATA gt {offset_date.isoformat()}"
+        date_filter = f"VALDATA gt {offset_date.isoformat()}"
     else:
         if start:
             start = (
@@ -126,9 +351,24 @@ def build_url(
             end = dates.parse_end_date(end).replace(tzinfo=max_date.tzinfo).isoformat()
 
         date_filter = ipea_filter_by_date(start, end)
-        if date_filter:
-            params["$filter"] = date_filter
 
+    filters = [f for f in [date_filter, territory_filter] if f]
+    if filters:
+        params["$filter"] = " and ".join(filters)
+
+    return url, params
+
+
+def build_latest_url(code: str) -> Tuple[str, IpeaUrlParams]:
+    """Build the URL of the last observation of a series, without metadata."""
+    url = (
+        f"http://ipeadata2-homologa.ipea.gov.br/api/v1/ValoresSerie(SERCODIGO='{code}')"
+    )
+    params: IpeaUrlParams = {
+        "$select": "VALDATA,VALVALOR",
+        "$orderby": "VALDATA desc",
+        "$top": 1,
+    }
     return url, params
 
 
@@ -169,3 +409,50 @@ def ipea_filter_by_date(start: str = None, end: str = None) -> str:
         return filter_by_end_date(end)
 
     return ""
+
+
+def ipea_filter_by_territory(
+    levels: TerritoryLevelInput = None, territories: TerritoryInput = None
+) -> str:
+    """
+    Filter an IPEA time series by territorial level and territory code.
+
+    Parameters
+    ----------
+    levels : str or list of str
+        Territorial levels names.
+
+    territories : str, int or list
+        Territory codes.
+
+    Returns
+    -------
+    str
+        A string to filter by territories.
+
+    Examples
+    --------
+    >>> url.ipea_filter_by_territory("Estados", [33, 35])
+    "NIVNOME eq 'Estados' and (TERCODIGO eq '33' or TERCODIGO eq '35')"
+    """
+
+    def filter_by_values(column, values):
+        if not isinstance(values, list):
+            values = [values]
+
+        conditions = [f"{column} eq {quote(value)}" for value in values]
+
+        if len(conditions) == 1:
+            return conditions[0]
+
+        return "(" + " or ".join(conditions) + ")"
+
+    filters = []
+
+    if levels:
+        filters.append(filter_by_values("NIVNOME", levels))
+
+    if territories:
+        filters.append(filter_by_values("TERCODIGO", territories))
+
+    return " and ".join(filters)
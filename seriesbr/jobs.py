@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+import threading
+
+from datetime import datetime
+from seriesbr.sources import SOURCES, check_source
+from seriesbr.utils import chunks, dates
+from seriesbr.utils.lazy import lazy_import
+from seriesbr.utils.paths import get_cache_dir
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, TypedDict, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import requests
+    from concurrent import futures
+else:
+    pd = lazy_import("pandas")
+    requests = lazy_import("requests")
+    futures = lazy_import("concurrent.futures")
+
+JobSpec = Union[Tuple[str, Any], Tuple[str, Any, Dict[str, Any]]]
+
+PENDING, DONE, FAILED = "pending", "done", "failed"
+
+TaskEntry = TypedDict(
+    "TaskEntry",
+    {
+        "spec": int,
+        "source": str,
+        "code": Any,
+        "options": Dict[str, Any],
+        "status": str,
+        "rows": Optional[int],
+        "error": Optional[str],
+    },
+)
+
+JobStats = TypedDict(
+    "JobStats",
+    {"tasks": int, "done": int, "failed": int, "pending": int},
+)
+
+
+class Job:
+    """
+    Bulk download of series which can be resumed after an interruption.
+
+    The requests needed to get every series are planned once and saved to
+    a manifest in ``directory``, together with the status of each one.
+    Each downloaded frame is saved as soon as it arrives, and its status
+    appended to a journal, which is folded into the manifest at the end of
+    each run. Running the job again, after a crash or from a new process,
+    only downloads what is missing.
+
+    Parameters
+    ----------
+    specs : list of tuples, optional
+        Tuples of ``(source, code)`` or ``(source, code, options)``, where
+        options are keyword arguments to the source's ``get_series``. May be
+        omitted to resume a job already planned in ``directory``.
+
+    directory : str, optional
+        Where to save the manifest and downloaded frames. Defaults to a
+        directory in the seriesbr cache named after the specs.
+
+    chunk_years : int, optional
+        Split series with a ``start`` date into requests of this many years.
+        By default, each series is a single request. Ignored when resuming a
+        job from its directory alone.
+
+    max_workers : int, optional
+        Number of requests made concurrently.
+
+    Examples
+    --------
+    >>> job = Job([("ibge", 1419, {"locations": {"city": n}}) for n in codes])
+    >>> job.run()
+    {'tasks': 500, 'done': 500, 'failed': 0, 'pending': 0}
+    >>> frames = job.results()
+    """
+
+    def __init__(
+        self,
+        specs: Optional[List[JobSpec]] = None,
+        directory: Optional[str] = None,
+        chunk_years: Optional[int] = None,
+        max_workers: int = 4,
+    ):
+        if specs is None and directory is None:
+            raise ValueError("Informe as séries do job ou o diretório de um job.")
+
+        parsed_specs = None if specs is None else [parse_spec(spec) for spec in specs]
+
+        if directory is None:
+            serialized_job = json.dumps(
+                [parsed_specs, chunk_years], sort_keys=True, default=str
+            )
+            name = hashlib.sha1(serialized_job.encode()).hexdigest()[:12]
+            directory = get_cache_dir("jobs", name)
+
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.journal_path = os.path.join(directory, "journal.jsonl")
+        self.chunk_years = chunk_years
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "chunks"), exist_ok=True)
+
+        self.specs: List[Tuple]
+        self.tasks: Dict[str, TaskEntry]
+        manifest = self.load_manifest()
+
+        if manifest is None:
+            if parsed_specs is None:
+                raise ValueError(f"Nenhum job encontrado em '{directory}'.")
+            self.specs = parsed_specs
+            self.tasks = plan(parsed_specs, chunk_years)
+            self.save_manifest()
+        else:
+            self.specs = [tuple(spec) for spec in manifest["specs"]]
+            self.chunk_years = manifest.get("chunk_years")
+            self.tasks = manifest["tasks"]
+            self.replay_journal()
+            if parsed_specs is not None and not same_specs(parsed_specs, self.specs):
+                raise ValueError(
+                    f"O diretório '{directory}' já contém um job com outras séries."
+                )
+            if parsed_specs is not None and chunk_years != self.chunk_years:
+                raise ValueError(
+                    f"O diretório '{directory}' já contém um job dividido em "
+                    f"blocos de outro número de anos ({self.chunk_years})."
+                )
+
+    def load_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_manifest(self) -> None:
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            manifest = {
+                "specs": self.specs,
+                "chunk_years": self.chunk_years,
+                "tasks": self.tasks,
+            }
+            json.dump(manifest, f, default=str)
+        os.replace(tmp_path, self.manifest_path)
+
+    def replay_journal(self) -> None:
+        """Apply statuses recorded since the manifest was last saved."""
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # The last line may be cut short by a crash
+                continue
+            key = record.pop("key")
+            if key in self.tasks:
+                self.tasks[key].update(record)
+
+    def record(
+        self, key: str, status: str, rows: Optional[int], error: Optional[str]
+    ) -> None:
+        """Update the status of a request, appending it to the journal."""
+        with self.lock:
+            task = self.tasks[key]
+            task["status"], task["rows"], task["error"] = status, rows, error
+
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                record = {"key": key, "status": status, "rows": rows, "error": error}
+                f.write(json.dumps(record) + "\n")
+
+    def checkpoint(self) -> None:
+        """Save every status to the manifest and empty the journal."""
+        with self.lock:
+            self.save_manifest()
+            try:
+                os.remove(self.journal_path)
+            except FileNotFoundError:
+                pass
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, "chunks", f"{key}.pkl")
+
+    def is_done(self, key: str) -> bool:
+        task = self.tasks[key]
+        return task["status"] == DONE and (
+            task["rows"] == 0 or os.path.exists(self.path(key))
+        )
+
+    def run(self, max_workers: Optional[int] = None) -> JobStats:
+        """
+        Download the frames not downloaded yet, retrying failed ones.
+
+        A failed request does not stop the others: it is recorded in the
+        manifest with its error and retried by the next run. If the run is
+        interrupted, requests already started are still saved.
+
+        Returns
+        -------
+        dict
+            Number of requests planned, done, failed and pending.
+        """
+        remaining = [key for key in self.tasks if not self.is_done(key)]
+
+        try:
+            with futures.ThreadPoolExecutor(
+                max_workers=max_workers or self.max_workers,
+                thread_name_prefix="seriesbr-job",
+            ) as executor:
+                submitted = [executor.submit(self.run_task, key) for key in remaining]
+                try:
+                    for future in futures.as_completed(submitted):
+                        future.result()
+                finally:
+                    for future in submitted:
+                        future.cancel()
+        finally:
+            self.checkpoint()
+
+        return self.stats()
+
+    def run_task(self, key: str) -> None:
+        task = self.tasks[key]
+
+        try:
+            df = fetch(task["source"], task["code"], task["options"])
+        except Exception as error:
+            self.record(key, FAILED, task["rows"], repr(error))
+            return
+
+        if len(df):
+            tmp_path = f"{self.path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, self.path(key))
+
+        self.record(key, DONE, len(df), None)
+
+    def stats(self) -> JobStats:
+        done = sum(self.is_done(key) for key in self.tasks)
+        failed = sum(task["status"] == FAILED for task in self.tasks.values())
+        return {
+            "tasks": len(self.tasks),
+            "done": done,
+            "failed": failed,
+            "pending": len(self.tasks) - done - failed,
+        }
+
+    def errors(self) -> Dict[str, Optional[str]]:
+        """Errors of the failed requests, by request key."""
+        return {
+            key: task["error"]
+            for key, task in self.tasks.items()
+            if task["status"] == FAILED
+        }
+
+    def read(self, index: int) -> pd.DataFrame:
+        """Read the frames downloaded for the ``index``-th spec, in date order."""
+        keys = [key for key, task in self.tasks.items() if task["spec"] == index]
+
+        if not all(self.is_done(key) for key in keys):
+            raise ValueError(
+                f"A série {self.specs[index][1]} ainda não foi baixada por completo. "
+                "Execute o job novamente."
+            )
+
+        frames = [
+            pd.read_pickle(self.path(key)) for key in keys if self.tasks[key]["rows"]
+        ]
+
+        if not frames:
+            return pd.DataFrame()
+
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+    def results(self) -> List[pd.DataFrame]:
+        """Read the frames downloaded for every spec, in the order of the specs."""
+        return [self.read(index) for index in range(len(self.specs))]
+
+
+def parse_spec(spec: JobSpec) -> Tuple[str, Any, Dict[str, Any]]:
+    source, code, options = spec[0], spec[1], dict(*spec[2:])  # type: ignore
+
+    check_source(source)
+
+    return source, code, options
+
+
+def same_specs(specs: List[Tuple], other_specs: List[Tuple]) -> bool:
+    def serialize(specs: List[Tuple]) -> str:
+        return json.dumps([list(spec) for spec in specs], sort_keys=True, default=str)
+
+    return serialize(specs) == serialize(other_specs)
+
+
+def plan(
+    specs: List[Tuple[str, Any, Dict[str, Any]]], chunk_years: Optional[int] = None
+) -> Dict[str, TaskEntry]:
+    """
+    Plan the requests of a job, by key.
+
+    Dates are resolved when planning: a series without an ``end`` date is
+    downloaded up to the day the job was planned, however late it resumes.
+    Only series asking for their ``last_n`` observations are not.
+    """
+    tasks: Dict[str, TaskEntry] = {}
+
+    for index, (source, code, options) in enumerate(specs):
+        for task_options in split_options(options, chunk_years):
+            key = task_key(index, source, code, task_options)
+            tasks[key] = {
+                "spec": index,
+                "source": source,
+                "code": code,
+                "options": task_options,
+                "status": PENDING,
+                "rows": None,
+                "error": None,
+            }
+
+    return tasks
+
+
+def split_options(
+    options: Dict[str, Any], chunk_years: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    if options.get("last_n"):
+        return [options]
+
+    if not chunk_years or not options.get("start"):
+        end = options.get("end") or datetime.today().strftime("%Y-%m-%d")
+        return [{**options, "end": end}]
+
+    start = dates.parse_start_date(options["start"])
+    end = dates.parse_end_date(options["end"]) if options.get("end") else None
+    windows = chunks.date_windows(start, end or datetime.today(), chunk_years)
+
+    return [
+        {**options, "start": window_start, "end": window_end}
+        for window_start, window_end in map(chunks.format_window, windows)
+    ]
+
+
+def task_key(index: int, source: str, code: Any, options: Dict[str, Any]) -> str:
+    serialized_options = json.dumps(options, sort_keys=True, default=str)
+    digest = hashlib.sha1(serialized_options.encode()).hexdigest()[:12]
+    return f"{index}-{source}-{code}-{digest}"
+
+
+def fetch(source: str, code: Any, options: Dict[str, Any]) -> pd.DataFrame:
+    try:
+        return SOURCES[source](code, **options)
+    except requests.exceptions.HTTPError as error:
+        # BCB answers with 404 when there are no observations in the period
+        if source == "bcb" and error.response.status_code == 404:
+            return pd.DataFrame()
+        raise
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import time
+import threading
+
+from datetime import datetime
+from seriesbr.sources import SOURCES, check_source
+from seriesbr.utils import dates
+from seriesbr.utils.lazy import lazy_import
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = lazy_import("pandas")
+
+Interval = Tuple["pd.Timestamp", "pd.Timestamp"]
+CacheKey = Tuple[str, str, str]
+
+# First date requested by sources which have one when no start is given.
+# IPEA requests have no lower bound.
+DEFAULT_START_DATES = {"bcb": dates.UNIX_EPOCH, "ibge": dates.UNIX_EPOCH}
+
+
+class RangeCache:
+    """
+    In-memory cache of series that knows which date ranges it holds.
+
+    Entries are keyed by the series (source, code and other options) instead
+    of the request URL, so a request overlapping cached ranges is served from
+    memory for the covered dates and only downloads the missing ones.
+
+    Ranges reaching today are only considered covered up to their last
+    observation, so observations published later are still downloaded.
+    Past ranges are not downloaded again, so revisions and late
+    publications are missed unless ``ttl`` is set, after which everything
+    cached for a series is downloaded again.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        Seconds after the first download of a series after which its cached
+        ranges expire. By default, they never expire.
+
+    Examples
+    --------
+    >>> cache = RangeCache()
+    >>> bcb.get_series(433, start="2000", end="2020", store=cache)
+    >>> bcb.get_series(433, start="2015", end="2022", store=cache)  # only 2021-2022
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        # Cached frame, covered intervals and when they expire, by series
+        self.entries: Dict[CacheKey, Tuple[pd.DataFrame, List[Interval], float]] = {}
+        self.lock = threading.Lock()
+
+    def key(self, source: str, code: Any, options: Dict[str, Any]) -> CacheKey:
+        return source, str(code), json.dumps(options, sort_keys=True, default=str)
+
+    def get_series(
+        self,
+        source: str,
+        code: Any,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        last_n: Optional[int] = None,
+        **options,
+    ) -> pd.DataFrame:
+        """
+        Get a series, downloading only the dates not cached yet.
+
+        Parameters
+        ----------
+        source : str
+            "bcb", "ipea" or "ibge".
+
+        code : int or str
+            Series code, or table code for IBGE.
+
+        start : str, optional
+            Initial date.
+
+        end : str, optional
+            Final date.
+
+        last_n : int, optional
+            Number of last observations. These are not cached, since they
+            are not a fixed date range.
+
+        **options
+            Other arguments to the source's ``get_series``.
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        check_source(source)
+
+        get_series = SOURCES[source]
+
+        if last_n:
+            return get_series(code, last_n=last_n, **options)
+
+        today = pd.Timestamp(datetime.today()).normalize()
+        if start:
+            start_date = pd.Timestamp(dates.parse_start_date(start))
+        else:
+            start_date = pd.Timestamp(DEFAULT_START_DATES.get(source, pd.Timestamp.min))
+        end_date = pd.Timestamp(dates.parse_end_date(end)) if end else today
+
+        key = self.key(source, code, options)
+
+        with self.lock:
+            df, covered = self.lookup(key)
+
+        for gap_start, gap_end in missing_intervals(covered, start_date, end_date):
+            delta = get_series(
+                code,
+                start=None if gap_start == pd.Timestamp.min else format_date(gap_start),
+                end=format_date(gap_end),
+                **options,
+            )
+            delta = delta[(delta.index >= gap_start) & (delta.index <= gap_end)]
+
+            with self.lock:
+                df, covered = self.lookup(key)
+                df = delta if df is None else merge(df, delta, gap_start, gap_end)
+
+                if gap_end < today:
+                    covered = add_interval(covered, gap_start, gap_end)
+                elif not delta.empty:
+                    covered = add_interval(covered, gap_start, delta.index.max())
+
+                self.entries[key] = (df, covered, self.expires_at(key))
+
+        if df is None:
+            return pd.DataFrame()
+
+        return df[(df.index >= start_date) & (df.index <= end_date)]
+
+    def lookup(self, key: CacheKey) -> Tuple[Optional[pd.DataFrame], List[Interval]]:
+        """Cached frame and intervals of a series, dropping them if expired."""
+        if key not in self.entries:
+            return None, []
+
+        df, covered, expires_at = self.entries[key]
+
+        if time.monotonic() >= expires_at:
+            del self.entries[key]
+            return None, []
+
+        return df, covered
+
+    def expires_at(self, key: CacheKey) -> float:
+        if key in self.entries:
+            return self.entries[key][2]
+
+        if self.ttl is None:
+            return float("inf")
+
+        return time.monotonic() + self.ttl
+
+    def intervals(self, source: str, code: Any, **options) -> List[Interval]:
+        """Date ranges cached for a series."""
+        with self.lock:
+            _, covered = self.lookup(self.key(source, code, options))
+        return list(covered)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+def format_date(date: pd.Timestamp) -> str:
+    return date.strftime("%Y-%m-%d")
+
+
+def missing_intervals(
+    covered: List[Interval], start: pd.Timestamp, end: pd.Timestamp
+) -> List[Interval]:
+    """
+    Subtract sorted, non-overlapping ``covered`` intervals from [start, end].
+
+    Examples
+    --------
+    >>> covered = [(pd.Timestamp("2000-01-01"), pd.Timestamp("2020-12-31"))]
+    >>> missing_intervals(covered, pd.Timestamp("2015-01-01"), pd.Timestamp("2022-12-31"))
+    [(Timestamp('2021-01-01 00:00:00'), Timestamp('2022-12-31 00:00:00'))]
+    """
+    one_day = pd.Timedelta(days=1)
+    gaps = []
+
+    for covered_start, covered_end in covered:
+        if covered_end < start:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > start:
+            gaps.append((start, covered_start - one_day))
+        if covered_end >= end:
+            return gaps
+        start = covered_end + one_day
+
+    gaps.append((start, end))
+    return gaps
+
+
+def add_interval(
+    covered: List[Interval], start: pd.Timestamp, end: pd.Timestamp
+) -> List[Interval]:
+    """Add [start, end] to ``covered``, merging overlapping and adjacent intervals."""
+    one_day = pd.Timedelta(days=1)
+    merged: List[Interval] = []
+
+    for interval in sorted(covered + [(start, end)]):
+        if merged and interval[0] <= merged[-1][1] + one_day:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], interval[1]))
+        else:
+            merged.append(interval)
+
+    return merged
+
+
+def merge(
+    cached: pd.DataFrame, delta: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp
+) -> pd.DataFrame:
+    """
+    Replace cached observations between ``start`` and ``end`` with the
+    downloaded ones, so a range downloaded twice concurrently is not
+    duplicated.
+    """
+    kept = cached[(cached.index < start) | (cached.index > end)]
+    merged = pd.concat([kept, delta])
+
+    for column, dtype in cached.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            merged[column] = merged[column].astype("category")
+
+    return merged.sort_index(kind="mergesort")
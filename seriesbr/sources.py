@@ -0,0 +1,16 @@
+from seriesbr import bcb, ipea, ibge
+from typing import Any, Callable, Collection, Dict
+
+SOURCES: Dict[str, Callable[..., Any]] = {
+    "bcb": bcb.series.get_series,
+    "ipea": ipea.series.get_series,
+    "ibge": ibge.series.get_series,
+}
+
+
+def check_source(source: str, sources: Collection[str] = SOURCES) -> None:
+    """Raise ValueError if ``source`` is not one of ``sources``."""
+    if source not in sources:
+        raise ValueError(
+            f"Fonte '{source}' desconhecida. Use uma entre: {', '.join(sources)}."
+        )
@@ -0,0 +1,519 @@
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+import threading
+
+from seriesbr import bcb, ipea, ibge
+from seriesbr.sources import SOURCES, check_source
+from seriesbr.utils import dates
+from seriesbr.utils.lazy import lazy_import
+from seriesbr.utils.paths import get_cache_dir
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from concurrent import futures
+else:
+    np = lazy_import("numpy")
+    pd = lazy_import("pandas")
+    futures = lazy_import("concurrent.futures")
+
+DATE_OPTIONS = ["start", "end", "last_n"]
+
+ManifestEntry = TypedDict(
+    "ManifestEntry",
+    {
+        "source": str,
+        "code": Any,
+        "options": Dict[str, Any],
+        "last_date": Optional[str],
+        "stamp": Optional[str],
+    },
+)
+
+StoreSpec = Union[Tuple[str, Any], Tuple[str, Any, Dict[str, Any]]]
+
+
+class SeriesStore:
+    """
+    Local store of series, one Parquet file per series.
+
+    Syncing a stored series only requests observations from its last stored
+    date onward, and replaces them in the stored data, so revisions of the
+    last observation are also picked up. Column names are stored as strings,
+    as Parquet requires.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Where to store the series. Defaults to the seriesbr cache directory.
+
+    Examples
+    --------
+    >>> store = SeriesStore()
+    >>> bcb.get_series(433, start="2019", store=store)
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or get_cache_dir("store")
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+        self.lock = threading.RLock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, source: str, code: Any, options: Dict[str, Any]) -> str:
+        key = f"{source}-{code}"
+
+        if options:
+            serialized_options = json.dumps(options, sort_keys=True, default=str)
+            key += "-" + hashlib.sha1(serialized_options.encode()).hexdigest()[:12]
+
+        return key
+
+    extension = "parquet"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.{self.extension}")
+
+    def load_manifest(self) -> Dict[str, ManifestEntry]:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_manifest(self, manifest: Dict[str, ManifestEntry]) -> None:
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp_path, self.manifest_path)
+
+    def read(self, source: str, code: Any, **options) -> Optional[pd.DataFrame]:
+        """Read a stored series, or None if it was never synced."""
+        path = self.path(self.key(source, code, options))
+
+        if not os.path.exists(path):
+            return None
+
+        return self.read_frame(path)
+
+    def read_frame(self, path: str) -> pd.DataFrame:
+        return pd.read_parquet(path)
+
+    def write_frame(self, path: str, df: pd.DataFrame) -> None:
+        df.to_parquet(path)
+
+    def write(self, source: str, code: Any, df: pd.DataFrame, **options) -> None:
+        key = self.key(source, code, options)
+        path = self.path(key)
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self.write_frame(tmp_path, df)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            manifest = self.load_manifest()
+            manifest[key] = {
+                "source": source,
+                "code": code,
+                "options": options,
+                "last_date": df.index.max().isoformat() if len(df) else None,
+                "stamp": manifest[key].get("stamp") if key in manifest else None,
+            }
+            self.save_manifest(manifest)
+
+    def save_stamp(self, source: str, code: Any, stamp: Optional[str], **options):
+        key = self.key(source, code, options)
+
+        with self.lock:
+            manifest = self.load_manifest()
+            if key in manifest:
+                manifest[key]["stamp"] = stamp
+                self.save_manifest(manifest)
+
+    def last_date(self, source: str, code: Any, **options) -> Optional[pd.Timestamp]:
+        entry = self.load_manifest().get(self.key(source, code, options))
+
+        if not entry or not entry["last_date"]:
+            return None
+
+        return pd.Timestamp(entry["last_date"])
+
+    def sync(
+        self, source: str, code: Any, full: bool = False, **options
+    ) -> pd.DataFrame:
+        """
+        Download a series if it is not stored, or only its new observations
+        otherwise, and store it.
+
+        Parameters
+        ----------
+        source : str
+            "bcb", "ipea" or "ibge".
+
+        code : int or str
+            Series code, or table code for IBGE.
+
+        full : bool, optional
+            Download the whole series even if it is stored, e.g. to get
+            revisions of old observations.
+
+        **options
+            Other arguments to the source's ``get_series``, except dates.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The whole stored series.
+        """
+        check_source(source)
+
+        for option in DATE_OPTIONS:
+            if option in options:
+                raise TypeError(f"sync() got an unexpected keyword argument '{option}'")
+
+        get_series = SOURCES[source]
+
+        existing = self.read(source, code, **options)
+        last_date = self.last_date(source, code, **options)
+
+        if full or existing is None or last_date is None:
+            df = get_series(code, **options).sort_index(kind="mergesort")
+        else:
+            delta = get_series(code, start=last_date.strftime("%Y-%m-%d"), **options)
+            df = merge(existing, delta, last_date)
+
+        df.columns = df.columns.astype(str)
+        self.write(source, code, df, **options)
+
+        return df
+
+    def refresh(
+        self, specs: List[StoreSpec], full: bool = False, max_workers: int = 4
+    ) -> List[StoreSpec]:
+        """
+        Sync only the series whose source reports a change since the last
+        refresh.
+
+        Changes are detected by comparing, for each series, a stamp fetched
+        in bulk from the source's metadata with the one recorded in the
+        manifest: ``SERATUALIZACAO`` for IPEA, ``metadata_modified`` for BCB
+        and the last period (``periodicidade.fim``) for IBGE. Series without
+        a stamp are always synced.
+
+        Parameters
+        ----------
+        specs : list of tuples
+            Tuples of ``(source, code)`` or ``(source, code, options)``.
+
+        full : bool, optional
+            Download changed series whole instead of only their new
+            observations.
+
+        max_workers : int, optional
+            Number of series synced concurrently.
+
+        Returns
+        -------
+        list of tuples
+            The specs which were synced.
+
+        Examples
+        --------
+        >>> store.refresh([("bcb", 433), ("ipea", "PIBE"), ("ibge", 1419)])
+        """
+        parsed_specs = [(spec[0], spec[1], dict(*spec[2:])) for spec in specs]
+
+        codes_by_source: Dict[str, List[Any]] = {}
+        for source, code, _ in parsed_specs:
+            codes_by_source.setdefault(source, []).append(code)
+
+        stamps = {
+            source: fetch_stamps(source, codes)
+            for source, codes in codes_by_source.items()
+        }
+
+        manifest = self.load_manifest()
+
+        def changed(source: str, code: Any, options: Dict[str, Any]) -> bool:
+            stamp = stamps[source].get(str(code))
+            entry = manifest.get(self.key(source, code, options))
+            return stamp is None or entry is None or entry.get("stamp") != stamp
+
+        outdated = [spec for spec in parsed_specs if changed(*spec)]
+
+        def sync(spec: Tuple[str, Any, Dict[str, Any]]) -> None:
+            source, code, options = spec
+            self.sync(source, code, full=full, **options)
+            self.save_stamp(source, code, stamps[source].get(str(code)), **options)
+
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(sync, outdated))
+
+        outdated_keys = {self.key(*spec) for spec in outdated}
+
+        return [
+            spec
+            for spec, parsed in zip(specs, parsed_specs)
+            if self.key(*parsed) in outdated_keys
+        ]
+
+    def get_series(
+        self,
+        source: str,
+        code: Any,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        last_n: Optional[int] = None,
+        **options,
+    ) -> pd.DataFrame:
+        """Sync a series and return the requested dates from the store."""
+        df = self.sync(source, code, **options)
+        return select_dates(df, start, end, last_n)
+
+
+def fetch_stamps(source: str, codes: List[Any]) -> Dict[str, Optional[str]]:
+    """
+    Get a value which changes whenever each series is updated, by code as a
+    string, fetching metadata in bulk.
+    """
+    check_source(source)
+
+    if source == "ipea":
+        updated_at = ipea.get_metadata_many(codes)["SERATUALIZACAO"]
+        return {
+            str(code): None if pd.isna(date) else date.isoformat()
+            for code, date in updated_at.items()
+        }
+
+    if source == "bcb":
+        metadata = bcb.get_metadata_many(codes)
+        return {
+            code: record.get("metadata_modified") for code, record in metadata.items()
+        }
+
+    metadata = ibge.get_metadata_many(codes)
+    last_periods = {
+        str(table): record["periodicidade"].get("fim")
+        for table, record in metadata.items()
+    }
+    return {
+        table: None if last_period is None else str(last_period)
+        for table, last_period in last_periods.items()
+    }
+
+
+MAGIC = b"SERIESBR"
+ALIGNMENT = 64
+
+
+class MappedStore(SeriesStore):
+    """
+    Series store whose files are memory-mapped instead of parsed.
+
+    Each file holds the dates as a ``datetime64[ns]`` array and the numeric
+    columns as one ``float64`` array per column, laid out contiguously, so
+    reading a series maps the file and builds a DataFrame on top of those
+    pages without parsing or copying them. Processes reading the same series
+    share one physical copy through the operating system page cache.
+
+    Pages are mapped copy-on-write: modifying a returned frame copies only
+    the touched pages into the modifying process. Non-numeric columns, such
+    as IBGE and IPEA territories, are stored as categorical codes, which are
+    validated when read.
+
+    Unlike :py:class:`SeriesStore`, ``get_series`` serves stored series as
+    they are, without requests, so that reads stay cheap. New observations
+    are downloaded by :py:meth:`sync` or :py:meth:`refresh`.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Where to store the series. Defaults to the seriesbr cache directory.
+
+    Examples
+    --------
+    >>> store = MappedStore()
+    >>> bcb.get_series(433, start="2019", store=store)
+    """
+
+    extension = "series"
+
+    def __init__(self, directory: Optional[str] = None):
+        super().__init__(directory or get_cache_dir("mapped"))
+
+    def read_frame(self, path: str) -> pd.DataFrame:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} não é um arquivo de séries do seriesbr.")
+            header_size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_size))
+
+        rows = header["rows"]
+
+        def mapped(dtype: str, offset: int, shape: tuple) -> np.ndarray:
+            if not rows:
+                return np.empty(shape, dtype=dtype)
+            return np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape)
+
+        index = pd.DatetimeIndex(
+            mapped("datetime64[ns]", header["index_offset"], (rows,)),
+            name=header["index_name"],
+            copy=False,
+        )
+
+        numeric_columns = header["numeric_columns"]
+        values = mapped(
+            "float64", header["values_offset"], (len(numeric_columns), rows)
+        )
+        df = pd.DataFrame(values.T, index=index, columns=numeric_columns, copy=False)
+
+        for column in header["categorical_columns"]:
+            codes = mapped("int32", column["offset"], (rows,))
+            df.insert(
+                column["position"],
+                column["name"],
+                pd.Categorical.from_codes(codes, column["categories"]),
+            )
+
+        return df
+
+    def get_series(
+        self,
+        source: str,
+        code: Any,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        last_n: Optional[int] = None,
+        **options,
+    ) -> pd.DataFrame:
+        """
+        Return the requested dates of a stored series, still memory-mapped,
+        downloading it only if it is not stored. Use :py:meth:`sync` or
+        :py:meth:`refresh` to download new observations.
+        """
+        path = self.path(self.key(source, code, options))
+
+        if not os.path.exists(path):
+            self.sync(source, code, **options)
+
+        return select_dates(self.read_frame(path), start, end, last_n)
+
+    def write_frame(self, path: str, df: pd.DataFrame) -> None:
+        numeric_columns = [
+            str(column)
+            for column, dtype in df.dtypes.items()
+            if pd.api.types.is_numeric_dtype(dtype)
+        ]
+
+        arrays = [
+            np.ascontiguousarray(df.index.values, dtype="datetime64[ns]"),
+            np.ascontiguousarray(
+                df[numeric_columns].to_numpy(dtype="float64").T.reshape(
+                    len(numeric_columns), len(df)
+                )
+            ),
+        ]
+
+        categorical_columns = []
+        for position, (column, dtype) in enumerate(df.dtypes.items()):
+            if str(column) in numeric_columns:
+                continue
+            categorical = pd.Categorical(df[column])
+            arrays.append(categorical.codes.astype("int32"))
+            categorical_columns.append(
+                {
+                    "name": str(column),
+                    "position": position,
+                    "categories": categorical.categories.tolist(),
+                }
+            )
+
+        header = {
+            "rows": len(df),
+            "index_name": df.index.name,
+            "numeric_columns": numeric_columns,
+            "categorical_columns": categorical_columns,
+        }
+
+        # Offsets depend on the header size, which depends on the offsets
+        offsets: List[int] = []
+        header_size = 0
+        while True:
+            start = align(len(MAGIC) + 8 + header_size)
+            offsets = []
+            for array in arrays:
+                offsets.append(start)
+                start = align(start + array.nbytes)
+
+            header["index_offset"], header["values_offset"] = offsets[:2]
+            for column, offset in zip(categorical_columns, offsets[2:]):
+                column["offset"] = offset
+
+            encoded_header = json.dumps(header, default=str).encode()
+            if len(encoded_header) <= header_size:
+                break
+            header_size = len(encoded_header)
+
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(header_size.to_bytes(8, "little"))
+            f.write(encoded_header.ljust(header_size))
+            for array, offset in zip(arrays, offsets):
+                f.seek(offset)
+                f.write(array.tobytes())
+
+
+def align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def merge(existing: pd.DataFrame, delta: pd.DataFrame, since: pd.Timestamp):
+    """Replace observations from ``since`` onward with the downloaded ones."""
+    kept = existing[existing.index < since]
+    delta = delta.set_axis(delta.columns.astype(str), axis=1)
+    merged = pd.concat([kept, delta])
+
+    for column, dtype in existing.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            merged[column] = merged[column].astype("category")
+
+    return merged.sort_index(kind="mergesort")
+
+
+def select_dates(
+    df: pd.DataFrame,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    last_n: Optional[int] = None,
+) -> pd.DataFrame:
+    """Slice the requested dates, so that memory-mapped frames stay mapped."""
+    index = df.index
+
+    if not index.is_monotonic_increasing:
+        return select_dates(df.sort_index(kind="mergesort"), start, end, last_n)
+
+    if last_n:
+        last_dates = index.unique()[-last_n:]
+        return df.iloc[index.searchsorted(last_dates[0]) if len(last_dates) else 0 :]
+
+    first, last = 0, len(df)
+
+    if start:
+        first = index.searchsorted(dates.parse_start_date(start), side="left")
+
+    if end:
+        last = index.searchsorted(dates.parse_end_date(end), side="right")
+
+    return df.iloc[first:last]
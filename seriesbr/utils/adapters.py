@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import random
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    from seriesbr.utils.session import SessionOptions
+
+
+class JitteredRetry(Retry):
+    """Retry policy which adds a random delay to the exponential backoff."""
+
+    def __init__(self, *args, backoff_jitter: float = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.backoff_jitter = backoff_jitter
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.backoff_jitter = self.backoff_jitter
+        return retry
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        if backoff and self.backoff_jitter:
+            backoff += random.uniform(0, self.backoff_jitter)
+        return backoff
+
+
+def build_adapter(options: SessionOptions) -> HTTPAdapter:
+    # NOTE: like the default of requests, read errors are not retried, so a
+    # read timeout still raises requests.exceptions.ReadTimeout
+    retry = JitteredRetry(
+        total=options["max_retries"],
+        read=False,
+        backoff_factor=options["backoff_factor"],
+        backoff_jitter=options["backoff_jitter"],
+        status_forcelist=options["status_forcelist"],
+        raise_on_status=False,
+    )
+
+    return HTTPAdapter(
+        pool_connections=options["pool_connections"],
+        pool_maxsize=options["pool_maxsize"],
+        pool_block=options["pool_block"],
+        max_retries=retry,
+    )
+
+
+def build_session(
+    options: SessionOptions, hosts_options: Dict[str, SessionOptions]
+) -> requests.Session:
+    session = requests.Session()
+
+    adapter = build_adapter(options)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    for host, host_options in hosts_options.items():
+        adapter = build_adapter(host_options)
+        session.mount(f"http://{host}", adapter)
+        session.mount(f"https://{host}", adapter)
+
+    return session
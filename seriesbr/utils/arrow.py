@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List, Optional
+
+if TYPE_CHECKING:
+    import pyarrow
+
+OUTPUTS = ["pandas", "arrow"]
+
+# Values such as "..." or "-" mean missing data in IBGE tables
+NUMBER = r"^-?\d+(\.\d+)?([eE][-+]?\d+)?$"
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError(
+            "A saída em Arrow e a exportação de séries dependem do pacote "
+            "'pyarrow'. Instale-o com 'pip install seriesbr[parquet]'."
+        ) from error
+
+    return pyarrow
+
+
+def check_output(output: str) -> None:
+    if output not in OUTPUTS:
+        raise ValueError(
+            f"Saída '{output}' desconhecida. Use uma entre: {', '.join(OUTPUTS)}."
+        )
+
+
+def column(rows: List[dict], key: str) -> List[Any]:
+    return [row.get(key) for row in rows]
+
+
+def parse_dates(strings: Any, format: str) -> pyarrow.Array:
+    """Parse an array of date strings into a ``date32`` array."""
+    pa = import_pyarrow()
+    strings = pa.array(strings, type=pa.string())
+    timestamps = pa.compute.strptime(strings, format=format, unit="s")
+    return timestamps.cast(pa.date32())
+
+
+def to_float(values: Any) -> pyarrow.Array:
+    """Convert strings to ``float64``, with non-numeric strings as nulls."""
+    pa = import_pyarrow()
+    values = pa.array(values, type=pa.string())
+    is_number = pa.compute.match_substring_regex(values, NUMBER)
+    missing = pa.scalar(None, type=pa.string())
+    return pa.compute.if_else(is_number, values, missing).cast(pa.float64())
+
+
+def to_categories(values: List[Optional[str]]) -> pyarrow.Array:
+    """Dictionary-encode strings, as pandas categoricals do."""
+    pa = import_pyarrow()
+    return pa.array(values, type=pa.string()).dictionary_encode()
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import time
+import weakref
+
+from datetime import timedelta
+from seriesbr.utils import session, json_decoder, instrumentation
+from seriesbr.utils.breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    FAILURE_STATUS_CODES,
+)
+from seriesbr.utils.http_cache import CachedResponse
+from seriesbr.utils.lazy import lazy_import
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING, Awaitable, Callable, MutableMapping, Optional, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+    import asyncio
+else:
+    asyncio = lazy_import("asyncio")
+
+# NOTE: requests go through the same response cache, host limiters, hedgers and
+# circuit breakers as the ones made by seriesbr.utils.session, and honor the
+# options given to session.configure, for every host or for specific ones,
+# except for two of them: max_retries only retries connection failures, as
+# httpx does, not the status_forcelist status codes, so there is no backoff;
+# and coalesce has no effect, identical requests made at once are all sent.
+
+# One client per event loop, since connections cannot be shared between loops
+clients: MutableMapping[asyncio.AbstractEventLoop, httpx.AsyncClient]
+clients = weakref.WeakKeyDictionary()
+
+
+def import_httpx():
+    try:
+        import httpx
+    except ImportError as error:
+        raise ImportError(
+            "As funções assíncronas dependem do pacote 'httpx'. "
+            "Instale-o com 'pip install seriesbr[async]'."
+        ) from error
+
+    return httpx
+
+
+def build_transport(options: session.SessionOptions) -> httpx.AsyncHTTPTransport:
+    httpx = import_httpx()
+
+    # NOTE: like requests, only cap the number of connections when asked to
+    # block for a free one
+    limits = httpx.Limits(
+        max_connections=options["pool_maxsize"] if options["pool_block"] else None,
+        max_keepalive_connections=options["pool_maxsize"]
+        if options["keep_alive"]
+        else 0,
+    )
+
+    return httpx.AsyncHTTPTransport(limits=limits, retries=options["max_retries"])
+
+
+def build_timeout(options: session.SessionOptions) -> httpx.Timeout:
+    httpx = import_httpx()
+
+    return httpx.Timeout(
+        options["read_timeout"],
+        connect=options["connect_timeout"] or options["read_timeout"],
+    )
+
+
+def build_client() -> httpx.AsyncClient:
+    httpx = import_httpx()
+
+    # Hosts configured on their own get a connection pool of their own
+    mounts = {
+        f"all://{host}": build_transport(host_options)
+        for host, host_options in session.hosts_options.items()
+    }
+
+    return httpx.AsyncClient(
+        timeout=build_timeout(session.options),
+        transport=build_transport(session.options),
+        mounts=mounts,
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Get the client shared by all requests made in the running event loop."""
+    loop = asyncio.get_running_loop()
+
+    client = clients.get(loop)
+    if client is None or client.is_closed:
+        client = clients[loop] = build_client()
+
+    return client
+
+
+def set_client(client: httpx.AsyncClient) -> None:
+    """Use ``client`` for all requests made in the running event loop."""
+    clients[asyncio.get_running_loop()] = client
+
+
+async def aclose() -> None:
+    """Close the client of the running event loop."""
+    client = clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def get(url: str, params: Optional[dict] = None, **kwargs) -> httpx.Response:
+    start = time.perf_counter()
+    response, cache_status = await get_from_cache_or_fetch(url, params, **kwargs)
+    seconds = time.perf_counter() - start
+
+    served_from_cache = cache_status in ("hit", "stale")
+    wait = 0.0 if served_from_cache else response.elapsed.total_seconds()
+
+    instrumentation.record(
+        {
+            "stage": "request",
+            "url": url,
+            "status": response.status_code,
+            "cache": cache_status,
+            "bytes": len(response.content),
+            "wait": wait,
+            "transfer": max(seconds - wait, 0.0),
+            "seconds": seconds,
+        }
+    )
+
+    return response
+
+
+async def get_json(url: str, params: Optional[dict] = None, **kwargs):
+    response = await get(url, params=params, **kwargs)
+
+    start = time.perf_counter()
+    json = json_decoder.loads(response.content)
+    instrumentation.record(
+        {"stage": "decode", "url": url, "seconds": time.perf_counter() - start}
+    )
+
+    return json
+
+
+async def get_from_cache_or_fetch(
+    url: str, params: Optional[dict] = None, **kwargs
+) -> Tuple[httpx.Response, Optional[str]]:
+    cache = session.cache
+
+    if cache is None:
+        return await fetch(url, params, **kwargs), None
+
+    key = cache.key(url, params)
+    cached = cache.load(key)
+
+    if cached and cached.is_fresh(cache.ttl):
+        return to_response(cached), "hit"
+
+    if cached:
+        headers = kwargs.get("headers", {})
+        kwargs["headers"] = {**cached.conditional_headers(), **headers}
+
+    try:
+        response = await fetch(url, params, **kwargs)
+    except CircuitOpenError:
+        if cached:
+            return to_response(cached), "stale"
+        raise
+
+    if cached and response.status_code == 304:
+        refreshed = to_response(cache.refresh(key, cached, response.headers))
+        refreshed.elapsed = response.elapsed
+        return refreshed, "revalidated"
+
+    cache.store(key, response)
+    return response, "miss"
+
+
+async def fetch(url: str, params: Optional[dict] = None, **kwargs) -> httpx.Response:
+    url_options = session.get_options(url)
+    kwargs.setdefault("timeout", build_timeout(url_options))
+
+    if not url_options["keep_alive"]:
+        kwargs["headers"] = {"Connection": "close", **kwargs.get("headers", {})}
+
+    client = get_client()
+    host = urlsplit(url).hostname or ""
+    limiter = session.limiters.get(host)
+    hedger = session.hedgers.get(host)
+    breaker = session.breakers.get(host)
+
+    if breaker:
+        breaker.before(host)
+
+    async def request(url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await client.send(
+            client.build_request("GET", url, **kwargs), stream=True
+        )
+        wait = time.perf_counter() - start
+
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+
+        # Time until the response headers arrived, as in requests
+        response.elapsed = timedelta(seconds=wait)
+        return response
+
+    async def get(url: str, **kwargs) -> httpx.Response:
+        # Hedged within the limiter slot, so waiting for the limiter is not
+        # mistaken for a slow request
+        if hedger:
+            return await hedger.acall(request, url, **kwargs)
+        return await request(url, **kwargs)
+
+    async def send(url: str, **kwargs) -> httpx.Response:
+        if limiter:
+            return await limiter.acall(get, url, **kwargs)
+        return await get(url, **kwargs)
+
+    if breaker:
+        send = protect(breaker, send)
+
+    response = await send(url, params=params, **kwargs)
+
+    # Unlike requests, httpx also raises for 304 Not Modified
+    if response.status_code != 304:
+        response.raise_for_status()
+
+    return response
+
+
+def protect(breaker: CircuitBreaker, send: Callable[..., Awaitable[httpx.Response]]):
+    """Report the outcome of each request sent with ``send`` to ``breaker``."""
+
+    async def protected_send(url: str, **kwargs) -> httpx.Response:
+        try:
+            response = await send(url, **kwargs)
+        except Exception:
+            breaker.failure()
+            raise
+        except BaseException:
+            # Cancelled, so the probe slot is given back
+            breaker.release()
+            raise
+
+        if response.status_code in FAILURE_STATUS_CODES:
+            breaker.failure()
+        else:
+            breaker.success()
+
+        return response
+
+    return protected_send
+
+
+def to_response(cached: CachedResponse) -> httpx.Response:
+    httpx = import_httpx()
+
+    return httpx.Response(
+        200,
+        headers=cached.headers,
+        content=cached.body,
+        request=httpx.Request("GET", cached.url),
+    )
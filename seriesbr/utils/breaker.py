@@ -0,0 +1,111 @@
+import time
+import threading
+
+from typing import Optional, TypedDict
+
+# Status codes which mean the server is down, as opposed to a bad query
+FAILURE_STATUS_CODES = {502, 503, 504}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+BreakerStats = TypedDict(
+    "BreakerStats",
+    {
+        "state": str,
+        "failures": int,
+        "rejected": int,
+        "opened": int,
+        "retry_in": Optional[float],
+    },
+)
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request to a host which is failing."""
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests to a host after ``failure_threshold`` consecutive
+    failures.
+
+    While open, requests fail immediately. After ``reset_timeout`` seconds,
+    up to ``half_open_requests`` requests are let through to probe the host:
+    the circuit closes if they succeed and opens again if they fail.
+    Connection errors, timeouts and 502, 503 and 504 responses are failures.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        half_open_requests: int = 1,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_requests = half_open_requests
+        self.state = CLOSED
+        self.failures = 0
+        self.probes = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def retry_in(self) -> Optional[float]:
+        if self.state != OPEN:
+            return None
+        return max(self.opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def before(self, host: str) -> None:
+        """Raise CircuitOpenError if a request to ``host`` should not be sent."""
+        with self.lock:
+            if self.state == OPEN and not self.retry_in():
+                self.state = HALF_OPEN
+                self.probes = 0
+
+            if self.state == CLOSED:
+                return
+
+            if self.state == HALF_OPEN and self.probes < self.half_open_requests:
+                self.probes += 1
+                return
+
+            self.rejected += 1
+            retry_in = self.retry_in() or 0
+
+        raise CircuitOpenError(
+            f"{host} está falhando. Novas requisições serão feitas em "
+            f"{retry_in:.0f} segundos."
+        )
+
+    def success(self) -> None:
+        with self.lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back the probe of a request which ended without an outcome."""
+        with self.lock:
+            if self.state == HALF_OPEN and self.probes:
+                self.probes -= 1
+
+    def stats(self) -> BreakerStats:
+        with self.lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "opened": self.opened,
+                "retry_in": self.retry_in(),
+            }
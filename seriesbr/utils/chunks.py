@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta
+from seriesbr.utils.lazy import lazy_import
+from typing import TYPE_CHECKING, Callable, Deque, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from concurrent import futures
+else:
+    futures = lazy_import("concurrent.futures")
+
+Window = Tuple[datetime, datetime]
+
+
+def date_windows(start: datetime, end: datetime, years: int) -> List[Window]:
+    """
+    Split the dates between ``start`` and ``end`` into windows of ``years``
+    calendar years, the first and last ones possibly shorter.
+
+    Examples
+    --------
+    >>> chunks.date_windows(datetime(2015, 6, 1), datetime(2021, 3, 31), 5)
+    [(datetime.datetime(2015, 6, 1, 0, 0), datetime.datetime(2019, 12, 31, 0, 0)), (datetime.datetime(2020, 1, 1, 0, 0), datetime.datetime(2021, 3, 31, 0, 0))]
+    """
+    windows = []
+
+    while start <= end:
+        window_end = min(datetime(start.year + years - 1, 12, 31), end)
+        windows.append((start, window_end))
+        start = window_end + timedelta(days=1)
+
+    return windows
+
+
+def format_window(window: Window) -> Tuple[str, str]:
+    start, end = window
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+def iter_windows(
+    fetch: Callable[[Window], Optional[pd.DataFrame]],
+    windows: List[Window],
+    prefetch: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the frames returned by ``fetch`` for each window, in order, while
+    downloading up to ``prefetch`` windows ahead. Windows without data,
+    for which ``fetch`` returns None, are skipped.
+    """
+    with futures.ThreadPoolExecutor(max_workers=max(prefetch, 1)) as executor:
+        pending: Deque[futures.Future] = deque()
+        remaining = iter(windows)
+
+        def submit_next() -> None:
+            window = next(remaining, None)
+            if window is not None:
+                pending.append(executor.submit(fetch, window))
+
+        for _ in range(max(prefetch, 1)):
+            submit_next()
+
+        try:
+            while pending:
+                df = pending.popleft().result()
+                submit_next()
+                if df is not None:
+                    yield df
+        finally:
+            # Stop downloading if the consumer stops early
+            for future in pending:
+                future.cancel()
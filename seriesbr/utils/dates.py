@@ -1,14 +1,87 @@
+import re
+import calendar
+
 from datetime import datetime
-from dateutil.parser import parse
+from functools import lru_cache
+from seriesbr.utils.lazy import lazy_import
+from typing import TYPE_CHECKING, Optional, Tuple
+
+if TYPE_CHECKING:
+    from dateutil import parser
+else:
+    parser = lazy_import("dateutil.parser")
 
 UNIX_EPOCH = datetime(1970, 1, 1)
 TODAY = datetime.today()
 LAST_DAY_OF_YEAR = datetime(year=datetime.today().year, month=12, day=31)
 
+# Formats documented by the library, tried before falling back to dateutil
+YEAR = re.compile(r"(\d{4})")
+YEAR_MONTH = re.compile(r"(\d{4})-(\d{1,2})")
+MONTH_YEAR = re.compile(r"(\d{1,2})[-/](\d{4})")
+YEAR_MONTH_DAY = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+MONTH_YEAR_COMPACT = re.compile(r"(\d{2})(\d{4})")
+
+
+def match_date(date: str) -> Optional[Tuple[int, Optional[int], Optional[int]]]:
+    """
+    Match a date in one of the documented formats.
+
+    Returns
+    -------
+    tuple or None
+        Year, month and day, where month and day are None if not given.
+
+    Examples
+    --------
+    >>> dates.match_date("2019-11")
+    (2019, 11, None)
+    >>> dates.match_date("072017")
+    (2017, 7, None)
+    """
+    match = YEAR.fullmatch(date)
+    if match:
+        return int(match[1]), None, None
+
+    match = YEAR_MONTH.fullmatch(date)
+    if match:
+        return int(match[1]), int(match[2]), None
+
+    match = MONTH_YEAR.fullmatch(date) or MONTH_YEAR_COMPACT.fullmatch(date)
+    if match:
+        return int(match[2]), int(match[1]), None
 
+    match = YEAR_MONTH_DAY.fullmatch(date)
+    if match:
+        return int(match[1]), int(match[2]), int(match[3])
+
+    return None
+
+
+@lru_cache(maxsize=1024)
 def parse_start_date(date: str) -> datetime:
-    return parse(date, default=UNIX_EPOCH)
+    matched = match_date(date.strip())
+
+    if matched:
+        year, month, day = matched
+        try:
+            return datetime(year, month or 1, day or 1)
+        except ValueError:
+            pass
 
+    return parser.parse(date, default=UNIX_EPOCH)
 
+
+@lru_cache(maxsize=1024)
 def parse_end_date(date: str) -> datetime:
-    return parse(date, default=LAST_DAY_OF_YEAR)
+    matched = match_date(date.strip())
+
+    if matched:
+        year, month, day = matched
+        try:
+            month = month or 12
+            return datetime(year, month, day or calendar.monthrange(year, month)[1])
+        except ValueError:
+            pass
+
+    return parser.parse(date, default=LAST_DAY_OF_YEAR)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import time
+import threading
+
+from collections import deque
+from seriesbr.utils.lazy import lazy_import
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Optional,
+    TypedDict,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent import futures
+else:
+    asyncio = lazy_import("asyncio")
+    futures = lazy_import("concurrent.futures")
+
+T = TypeVar("T")
+
+HedgeStats = TypedDict(
+    "HedgeStats",
+    {
+        "percentile": float,
+        "delay": Optional[float],
+        "requests": int,
+        "hedged": int,
+        "won": int,
+    },
+)
+
+
+class LatencyTracker:
+    """Keep the latencies of the last ``window`` requests to estimate percentiles."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def add(self, latency: float) -> None:
+        with self.lock:
+            self.latencies.append(latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Latency below which ``percentile`` of requests finished, if known."""
+        with self.lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            latencies = sorted(self.latencies)
+
+        index = min(int(percentile * len(latencies)), len(latencies) - 1)
+        return latencies[index]
+
+
+class Hedger:
+    """
+    Send a duplicate of a request that takes longer than most requests to the
+    same host, and keep whichever response arrives first.
+
+    A request is hedged once it takes longer than the ``percentile`` of the
+    latencies of recent requests. At most a fraction ``max_extra`` of
+    requests is hedged, bounding the extra load on the server.
+
+    Each request runs in a thread of its own, started right away, so the
+    time until a request is hedged only counts the request itself, however
+    many requests are made concurrently. ``acall`` does the same for
+    coroutines, in tasks of their own.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_extra: float = 0.05,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        self.percentile = percentile
+        self.max_extra = max_extra
+        self.tracker = LatencyTracker(window, min_samples)
+        self.requests = 0
+        self.hedged = 0
+        self.won = 0
+        self.lock = threading.Lock()
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is not possible."""
+        with self.lock:
+            self.requests += 1
+            if self.hedged + 1 > self.max_extra * self.requests:
+                return None
+
+        return self.tracker.percentile(self.percentile)
+
+    def timed(self, function: Callable[..., T], *args, **kwargs) -> T:
+        start = time.monotonic()
+        result = function(*args, **kwargs)
+        self.tracker.add(time.monotonic() - start)
+        return result
+
+    def call(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Call ``function``, calling it again concurrently if it takes longer
+        than usual, and return the first result.
+        """
+        delay = self.delay()
+
+        if delay is None:
+            return self.timed(function, *args, **kwargs)
+
+        primary = spawn(self.timed, function, *args, **kwargs)
+
+        try:
+            return primary.result(timeout=delay)
+        except futures.TimeoutError:
+            pass
+
+        with self.lock:
+            self.hedged += 1
+        hedge = spawn(self.timed, function, *args, **kwargs)
+
+        done, _ = futures.wait([primary, hedge], return_when=futures.FIRST_COMPLETED)
+        first = primary if primary in done else hedge
+        second = hedge if first is primary else primary
+
+        # If the first one failed, the other one may still succeed
+        if first.exception() is not None:
+            first, second = second, first
+            futures.wait([first])
+            if first.exception() is not None:
+                return primary.result()
+
+        if first is hedge:
+            with self.lock:
+                self.won += 1
+
+        second.add_done_callback(discard)
+        return first.result()
+
+    async def atimed(self, function: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        start = time.monotonic()
+        result = await function(*args, **kwargs)
+        self.tracker.add(time.monotonic() - start)
+        return result
+
+    async def acall(self, function: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """
+        Await ``function``, awaiting it again concurrently if it takes longer
+        than usual, and return the first result. The request which loses the
+        race is cancelled.
+        """
+        delay = self.delay()
+
+        if delay is None:
+            return await self.atimed(function, *args, **kwargs)
+
+        primary = asyncio.ensure_future(self.atimed(function, *args, **kwargs))
+        done, _ = await asyncio.wait([primary], timeout=delay)
+
+        if done:
+            return primary.result()
+
+        with self.lock:
+            self.hedged += 1
+        hedge = asyncio.ensure_future(self.atimed(function, *args, **kwargs))
+
+        try:
+            done, _ = await asyncio.wait(
+                [primary, hedge], return_when=asyncio.FIRST_COMPLETED
+            )
+            first = primary if primary in done else hedge
+            second = hedge if first is primary else primary
+
+            # If the first one failed, the other one may still succeed
+            if first.exception() is not None:
+                first, second = second, first
+                await asyncio.wait([first])
+                if first.exception() is not None:
+                    return primary.result()
+
+            if first is hedge:
+                with self.lock:
+                    self.won += 1
+
+            return first.result()
+        finally:
+            for task in (primary, hedge):
+                task.cancel()
+                task.add_done_callback(discard_task)
+
+    def stats(self) -> HedgeStats:
+        return {
+            "percentile": self.percentile,
+            "delay": self.tracker.percentile(self.percentile),
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "won": self.won,
+        }
+
+
+def spawn(function: Callable[..., T], *args, **kwargs) -> futures.Future:
+    """Call ``function`` in a new thread, returning a future of its result."""
+    future: futures.Future = futures.Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args, **kwargs))
+        except BaseException as error:
+            future.set_exception(error)
+
+    threading.Thread(target=run, name="seriesbr-hedge", daemon=True).start()
+    return future
+
+
+def discard(future: futures.Future) -> None:
+    """Release the connection of a response which lost the race."""
+    if not future.cancelled() and future.exception() is None:
+        close: Any = getattr(future.result(), "close", None)
+        if close is not None:
+            close()
+
+
+def discard_task(task: asyncio.Future) -> None:
+    """Retrieve the error of a task which lost the race, so it is not logged."""
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import os
+import gzip
+import json
+import time
+import threading
+
+from seriesbr.utils.lazy import lazy_import
+from seriesbr.utils.paths import get_cache_dir
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import hashlib
+    import requests
+else:
+    hashlib = lazy_import("hashlib")
+    requests = lazy_import("requests")
+
+validator_headers = ["ETag", "Last-Modified", "Cache-Control", "Content-Type"]
+
+
+def canonical_url(url: str, params: Optional[dict] = None) -> str:
+    """
+    Merge params into the url, sorting query parameters.
+
+    Examples
+    --------
+    >>> http_cache.canonical_url("https://a.com/b?z=1", {"format": "json"})
+    'https://a.com/b?format=json&z=1'
+    """
+    prepared_url = requests.Request("GET", url, params=params).prepare().url or url
+    scheme, netloc, path, query, _ = urlsplit(prepared_url)
+    query = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+    return urlunsplit((scheme.lower(), netloc.lower(), path, query, ""))
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header into a dictionary of directives.
+
+    Examples
+    --------
+    >>> http_cache.parse_cache_control("public, max-age=300")
+    {'public': None, 'max-age': '300'}
+    """
+    directives: Dict[str, Optional[str]] = {}
+
+    for directive in (value or "").split(","):
+        name, _, argument = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+
+    return directives
+
+
+class CachedResponse:
+    def __init__(self, url: str, headers: dict, body: bytes, stored_at: float):
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    def max_age(self, ttl: float) -> float:
+        directives = parse_cache_control(self.headers.get("Cache-Control"))
+
+        if "no-cache" in directives:
+            return 0
+
+        max_age = directives.get("max-age")
+        if max_age is not None and max_age.isdigit():
+            return float(max_age)
+
+        return ttl
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < self.max_age(ttl)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+
+        return headers
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response.headers = requests.structures.CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+
+class ResponseCache:
+    """
+    On-disk cache of response bodies, stored gzip-compressed.
+
+    Responses are fresh for the ``max-age`` given by the server or, without
+    it, for ``ttl`` seconds. Stale responses with an ``ETag`` or
+    ``Last-Modified`` header are revalidated with a conditional request. When
+    the cache grows beyond ``max_size`` bytes, the least recently used entries
+    are removed. The size is tracked as responses are stored, so the
+    directory is only scanned once and then whenever it is over the limit.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Where to store responses. Defaults to the seriesbr cache directory.
+
+    ttl : float, optional
+        Seconds a response without ``max-age`` is considered fresh.
+
+    max_size : int, optional
+        Maximum size of the cache in bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        ttl: float = 3600,
+        max_size: int = 256 * 1024 * 1024,
+    ):
+        self.directory = directory or get_cache_dir("http")
+        self.ttl = ttl
+        self.max_size = max_size
+        # Unknown until the directory is first scanned
+        self.size: Optional[int] = None
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, url: str, params: Optional[dict] = None) -> str:
+        return hashlib.sha256(canonical_url(url, params).encode()).hexdigest()
+
+    def paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return f"{base}.json", f"{base}.gz"
+
+    def load(self, key: str) -> Optional[CachedResponse]:
+        meta_path, body_path = self.paths(key)
+
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = gzip.decompress(f.read())
+        except (OSError, ValueError):
+            return None
+
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+
+        return CachedResponse(meta["url"], meta["headers"], body, meta["stored_at"])
+
+    def store(self, key: str, response: requests.Response) -> None:
+        headers = {
+            name: response.headers[name]
+            for name in validator_headers
+            if name in response.headers
+        }
+
+        if "no-store" in parse_cache_control(headers.get("Cache-Control")):
+            return
+
+        meta_path, body_path = self.paths(key)
+        previous_size = self.entry_size(key)
+
+        self._write(body_path, gzip.compress(response.content))
+        self._write_meta(meta_path, str(response.url), headers, time.time())
+
+        self.track(self.entry_size(key) - previous_size)
+
+    def refresh(self, key: str, cached: CachedResponse, headers) -> CachedResponse:
+        """Mark a cached response as fresh again after a 304 response."""
+        for name in validator_headers:
+            if name in headers:
+                cached.headers[name] = headers[name]
+
+        cached.stored_at = time.time()
+
+        meta_path, _ = self.paths(key)
+        self._write_meta(meta_path, cached.url, cached.headers, cached.stored_at)
+
+        return cached
+
+    def entry_size(self, key: str) -> int:
+        size = 0
+
+        for path in self.paths(key):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+
+        return size
+
+    def track(self, delta: int) -> None:
+        with self.lock:
+            if self.size is not None:
+                self.size += delta
+
+            if self.size is None or self.size > self.max_size:
+                self.size = self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used entries over max_size, returning the size left."""
+        entries: List[Tuple[float, int, str]] = []
+        total_size = 0
+
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+
+            key = entry.name[: -len(".json")]
+            meta_path, body_path = self.paths(key)
+
+            try:
+                size = entry.stat().st_size + os.path.getsize(body_path)
+            except OSError:
+                size = entry.stat().st_size
+
+            entries.append((entry.stat().st_mtime, size, key))
+            total_size += size
+
+        entries.sort()
+
+        for _, size, key in entries:
+            if total_size <= self.max_size:
+                break
+
+            for path in self.paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+            total_size -= size
+
+        return total_size
+
+    def clear(self) -> None:
+        with self.lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith((".json", ".gz")):
+                    os.remove(entry.path)
+            self.size = 0
+
+    def _write_meta(self, path: str, url: str, headers: dict, stored_at: float):
+        meta = {"url": url, "headers": headers, "stored_at": stored_at}
+        self._write(path, json.dumps(meta).encode())
+
+    def _write(self, path: str, content: bytes) -> None:
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
@@ -0,0 +1,143 @@
+import time
+import functools
+import contextvars
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+Event = Dict[str, Any]
+Hook = Callable[[Event], None]
+
+# Same as inspect.CO_COROUTINE, without importing inspect
+CO_COROUTINE = 0x80
+
+hooks: List[Hook] = []
+
+# Events recorded by the innermost instrumented call of the current context
+current_events: contextvars.ContextVar[Optional[List[Event]]]
+current_events = contextvars.ContextVar("current_events", default=None)
+
+
+def add_hook(hook: Hook) -> None:
+    """
+    Call ``hook`` with every recorded event.
+
+    Events are dictionaries with a ``stage`` key, which is one of:
+
+    - ``"request"``: ``url``, ``status``, ``cache`` (``"hit"``,
+      ``"revalidated"``, ``"miss"``, ``"stale"`` if served while the host's
+      circuit breaker is open, or ``None`` if the cache is disabled),
+      ``bytes``, ``wait`` (seconds until the response headers arrived,
+      including connection and server time), ``transfer`` (seconds reading the
+      body) and ``seconds`` (total).
+    - ``"decode"``: ``url`` and ``seconds`` spent decoding JSON.
+    - ``"build"``: ``function``, ``rows`` and ``seconds`` spent building the
+      DataFrame.
+    - ``"coalesced"``: ``url`` of a request shared with a concurrent
+      identical one instead of being sent.
+
+    Examples
+    --------
+    >>> instrumentation.add_hook(lambda event: statsd.timing(event["stage"], event["seconds"]))
+    """
+    hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    hooks.remove(hook)
+
+
+def record(event: Event) -> None:
+    events = current_events.get()
+    if events is not None:
+        events.append(event)
+
+    for hook in hooks:
+        hook(event)
+
+
+@contextmanager
+def collect() -> Iterator[List[Event]]:
+    """Collect events recorded inside the block, also passing them to outer blocks."""
+    parent = current_events.get()
+    events: List[Event] = []
+    token = current_events.set(events)
+
+    try:
+        yield events
+    finally:
+        current_events.reset(token)
+        if parent is not None:
+            parent.extend(events)
+
+
+def summarize(events: List[Event]) -> Dict[str, Any]:
+    requests = [event for event in events if event["stage"] == "request"]
+    builds = [event for event in events if event["stage"] == "build"]
+
+    def total(stage_events: List[Event], key: str) -> float:
+        return sum(event[key] for event in stage_events)
+
+    return {
+        "requests": len(requests),
+        "coalesced": sum(event["stage"] == "coalesced" for event in events),
+        "cache_hits": sum(event["cache"] == "hit" for event in requests),
+        "bytes": total(requests, "bytes"),
+        "wait": total(requests, "wait"),
+        "transfer": total(requests, "transfer"),
+        "decode": total([e for e in events if e["stage"] == "decode"], "seconds"),
+        "build": total(builds, "seconds"),
+        "rows": builds[-1]["rows"] if builds else None,
+    }
+
+
+def attach(result: Any, events: List[Event]) -> Any:
+    if hasattr(result, "attrs"):
+        result.attrs["seriesbr"] = summarize(events)
+    return result
+
+
+def instrument(function: F) -> F:
+    """
+    Collect events recorded while ``function`` runs and attach their summary
+    to ``DataFrame.attrs["seriesbr"]`` of the returned frame.
+    """
+    if function.__code__.co_flags & CO_COROUTINE:
+
+        @functools.wraps(function)
+        async def async_wrapper(*args, **kwargs):
+            with collect() as events:
+                result = await function(*args, **kwargs)
+            return attach(result, events)
+
+        return async_wrapper  # type: ignore
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with collect() as events:
+            result = function(*args, **kwargs)
+        return attach(result, events)
+
+    return wrapper  # type: ignore
+
+
+def instrument_build(function: F) -> F:
+    """Record the time spent by a ``build_df`` function and the rows built."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        df = function(*args, **kwargs)
+        record(
+            {
+                "stage": "build",
+                "function": function.__module__ + "." + function.__qualname__,
+                "rows": len(df),
+                "seconds": time.perf_counter() - start,
+            }
+        )
+        return df
+
+    return wrapper  # type: ignore
@@ -0,0 +1,59 @@
+import json
+import importlib
+
+from typing import Any, Callable, Optional, Tuple, Union
+
+Decoder = Callable[[Union[bytes, str]], Any]
+
+# Fastest first. All of them decode bytes directly, without an intermediate str.
+DECODERS = ["orjson", "simdjson", "ujson"]
+
+# Looked up on first use, see get_decoder
+decoder_name: Optional[str] = None
+decoder: Optional[Decoder] = None
+
+
+def find_decoder() -> Tuple[str, Decoder]:
+    for name in DECODERS:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+
+        return name, module.loads  # type: ignore
+
+    return "json", json.loads
+
+
+def get_decoder() -> Tuple[str, Decoder]:
+    """Get the name and the function of the decoder in use."""
+    global decoder_name, decoder
+
+    if decoder is None or decoder_name is None:
+        decoder_name, decoder = find_decoder()
+
+    return decoder_name, decoder
+
+
+def use_decoder(loads: Optional[Decoder] = None) -> None:
+    """
+    Choose the function used to decode JSON responses.
+
+    Parameters
+    ----------
+    loads : callable, optional
+        A function which takes bytes and returns the decoded object, like
+        ``orjson.loads``. If not given, the fastest installed decoder is used.
+    """
+    global decoder_name, decoder
+
+    if loads is None:
+        decoder_name, decoder = find_decoder()
+    else:
+        decoder_name = getattr(loads, "__module__", None) or repr(loads)
+        decoder = loads
+
+
+def loads(content: Union[bytes, str]) -> Any:
+    _, decode = get_decoder()
+    return decode(content)
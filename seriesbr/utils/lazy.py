@@ -0,0 +1,26 @@
+import types
+import importlib
+
+
+class LazyModule(types.ModuleType):
+    """A module which is only imported when one of its attributes is accessed."""
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Defer importing a module until it is first used.
+
+    Examples
+    --------
+    >>> pd = lazy_import("pandas")
+    >>> "pandas" in sys.modules
+    False
+    >>> pd.DataFrame
+    <class 'pandas.core.frame.DataFrame'>
+    """
+    return LazyModule(name)
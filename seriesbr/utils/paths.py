@@ -0,0 +1,30 @@
+import os
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    Get a directory to store seriesbr's local files, creating it if needed.
+
+    Honors the ``SERIESBR_CACHE_DIR`` environment variable, falling back to
+    ``$XDG_CACHE_HOME/seriesbr`` and then to ``~/.cache/seriesbr``.
+
+    Parameters
+    ----------
+    *parts : str
+        Subdirectories to append to the cache directory.
+
+    Returns
+    -------
+    str
+    """
+    base = os.environ.get("SERIESBR_CACHE_DIR")
+
+    if not base:
+        xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        base = os.path.join(xdg_cache_home, "seriesbr")
+
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
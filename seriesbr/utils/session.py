@@ -1,9 +1,528 @@
-import requests
+from __future__ import annotations
 
-s = requests.Session()
+import time
+import threading
+
+from seriesbr.utils import json_decoder, instrumentation
+from seriesbr.utils.lazy import lazy_import
+from seriesbr.utils.http_cache import ResponseCache, canonical_url
+from seriesbr.utils.single_flight import SingleFlight
+from seriesbr.utils.throttle import HostLimiter, LimiterStats
+from seriesbr.utils.hedge import Hedger, HedgeStats
+from seriesbr.utils.breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    BreakerStats,
+    FAILURE_STATUS_CODES,
+)
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple, TypedDict
+
+if TYPE_CHECKING:
+    import requests
+    from seriesbr.utils import adapters
+else:
+    adapters = lazy_import("seriesbr.utils.adapters")
+
+SessionOptions = TypedDict(
+    "SessionOptions",
+    {
+        "pool_connections": int,
+        "pool_maxsize": int,
+        "pool_block": bool,
+        "keep_alive": bool,
+        "coalesce": bool,
+        "connect_timeout": Optional[float],
+        "read_timeout": Optional[float],
+        "max_retries": int,
+        "backoff_factor": float,
+        "backoff_jitter": float,
+        "status_forcelist": Tuple[int, ...],
+    },
+    total=False,
+)
+
+# NOTE: 500 is not retried by default because IBGE answers with it when a
+# query would return more than 100.000 rows.
+DEFAULT_OPTIONS: SessionOptions = {
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "pool_block": False,
+    "keep_alive": True,
+    "coalesce": True,
+    "connect_timeout": None,
+    "read_timeout": 60,
+    "max_retries": 0,
+    "backoff_factor": 0,
+    "backoff_jitter": 0,
+    "status_forcelist": (429, 502, 503, 504),
+}
+
+
+options: SessionOptions = DEFAULT_OPTIONS.copy()
+hosts_options: Dict[str, SessionOptions] = {}
+
+# Created on first use, see get_session
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+cache: Optional[ResponseCache] = None
+
+limiters: Dict[str, HostLimiter] = {}
+
+hedgers: Dict[str, Hedger] = {}
+
+breakers: Dict[str, CircuitBreaker] = {}
+
+# Identical JSON requests in flight, shared by concurrent callers
+flights = SingleFlight()
+
+
+def configure(hosts: Dict[str, SessionOptions] = None, **kwargs) -> None:
+    """
+    Configure connection pooling, timeouts and retries of every request.
+
+    Calling it again resets any option not given to its default value.
+
+    Parameters
+    ----------
+    hosts : dict, optional
+        Options for specific hosts, e.g. ``{"api.bcb.gov.br": {"pool_maxsize":
+        50}}``. Options not given for a host fall back to the global ones.
+
+    pool_connections : int, optional
+        Number of hosts with cached connection pools.
+
+    pool_maxsize : int, optional
+        Number of connections kept alive per host.
+
+    pool_block : bool, optional
+        Wait for a free connection instead of opening an extra one when the
+        pool is exhausted.
+
+    keep_alive : bool, optional
+        Reuse connections between requests.
+
+    coalesce : bool, optional
+        Share one request, and its decoded JSON, between threads asking for
+        the same URL and parameters at the same time.
+
+    connect_timeout : float, optional
+        Seconds to wait for a connection. Defaults to the read timeout.
+
+    read_timeout : float, optional
+        Seconds to wait for the server to send data.
+
+    max_retries : int, optional
+        Number of retries on connection errors and on the
+        ``status_forcelist`` status codes. Read timeouts are not retried.
+
+    backoff_factor : float, optional
+        Retries wait ``backoff_factor * 2 ** (retry - 1)`` seconds.
+
+    backoff_jitter : float, optional
+        Maximum number of seconds randomly added to each backoff.
+
+    status_forcelist : tuple of int, optional
+        Status codes which should be retried.
+
+    Examples
+    --------
+    >>> session.configure(
+    ...     max_retries=3,
+    ...     backoff_factor=0.5,
+    ...     backoff_jitter=0.5,
+    ...     hosts={"servicodados.ibge.gov.br": {"read_timeout": 120}},
+    ... )
+    """
+    global _session, options, hosts_options
+
+    for name in [*kwargs, *(key for value in (hosts or {}).values() for key in value)]:
+        if name not in DEFAULT_OPTIONS:
+            raise TypeError(f"Unknown session option '{name}'")
+
+    options = {**DEFAULT_OPTIONS, **kwargs}  # type: ignore
+    hosts_options = {
+        host: {**options, **host_options}  # type: ignore
+        for host, host_options in (hosts or {}).items()
+    }
+
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+def get_session() -> requests.Session:
+    """Get the session shared by all requests, creating it on first use."""
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = adapters.build_session(options, hosts_options)
+
+        return _session
+
+
+def __getattr__(name: str):
+    # Backwards compatibility with the former module-level session
+    if name == "s":
+        return get_session()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_options(url: str) -> SessionOptions:
+    host = urlsplit(url).hostname
+    return hosts_options.get(host or "", options)
+
+
+def enable_cache(
+    directory: Optional[str] = None,
+    ttl: float = 3600,
+    max_size: int = 256 * 1024 * 1024,
+) -> ResponseCache:
+    """
+    Cache responses on disk, revalidating them with conditional requests.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Where to store responses. Defaults to the seriesbr cache directory.
+
+    ttl : float, optional
+        Seconds a response is considered fresh if the server does not say
+        otherwise with a ``Cache-Control: max-age`` header.
+
+    max_size : int, optional
+        Maximum size of the cache in bytes. Least recently used responses are
+        removed first.
+
+    Returns
+    -------
+    ResponseCache
+    """
+    global cache
+    cache = ResponseCache(directory, ttl=ttl, max_size=max_size)
+    return cache
+
+
+def disable_cache() -> None:
+    global cache
+    cache = None
+
+
+def limit(host: str, rate: Optional[float] = None, **kwargs) -> HostLimiter:
+    """
+    Limit the rate and concurrency of requests to a host.
+
+    Concurrency adapts to the server: it grows while responses are fast and
+    successful, and is cut by ``backoff`` whenever the server answers with
+    429, 502, 503 or 504, or the request fails.
+
+    Parameters
+    ----------
+    host : str
+        Host name, e.g. "api.bcb.gov.br".
+
+    rate : float, optional
+        Maximum number of requests per second.
+
+    burst : float, optional
+        Number of requests allowed at once before ``rate`` applies.
+
+    initial_concurrency : int, optional
+        Number of concurrent requests to start with.
+
+    min_concurrency : int, optional
+        Lower bound of concurrent requests.
+
+    max_concurrency : int, optional
+        Upper bound of concurrent requests.
+
+    backoff : float, optional
+        Factor applied to the concurrency limit when the server throttles.
+
+    latency_tolerance : float, optional
+        Latency, relative to the average, above which concurrency stops
+        growing.
+
+    Returns
+    -------
+    HostLimiter
+
+    Examples
+    --------
+    >>> limiter = session.limit("servicodados.ibge.gov.br", rate=5, max_concurrency=8)
+    >>> session.limiter_stats()
+    {'servicodados.ibge.gov.br': {'rate': 5, 'concurrency': 4, 'in_flight': 0, 'queue_depth': 0, 'latency': None, 'throttled': 0, 'errors': 0}}
+    """
+    limiter = limiters[host] = HostLimiter(rate, **kwargs)
+    return limiter
+
+
+def unlimit(host: Optional[str] = None) -> None:
+    """Remove the limits of a host, or of all hosts if none is given."""
+    if host is None:
+        limiters.clear()
+    else:
+        limiters.pop(host, None)
+
+
+def limiter_stats() -> Dict[str, LimiterStats]:
+    """Current concurrency limit, requests in flight and queue depth per host."""
+    return {host: limiter.stats() for host, limiter in limiters.items()}
+
+
+def hedge(
+    host: str, percentile: float = 0.95, max_extra: float = 0.05, **kwargs
+) -> Hedger:
+    """
+    Hedge slow requests to a host: once a request takes longer than the
+    ``percentile`` of recent latencies, send it again and use whichever
+    response arrives first.
+
+    Parameters
+    ----------
+    host : str
+        Host name, e.g. "servicodados.ibge.gov.br".
+
+    percentile : float, optional
+        Latency percentile after which a request is hedged.
+
+    max_extra : float, optional
+        Maximum fraction of requests hedged, which bounds the extra load.
+
+    window : int, optional
+        Number of recent requests whose latencies are tracked.
+
+    min_samples : int, optional
+        Number of requests to see before hedging.
+
+    Returns
+    -------
+    Hedger
+
+    Examples
+    --------
+    >>> session.hedge("ipeadata2-homologa.ipea.gov.br", percentile=0.9, max_extra=0.1)
+    >>> session.hedge_stats()
+    {'ipeadata2-homologa.ipea.gov.br': {'percentile': 0.9, 'delay': None, 'requests': 0, 'hedged': 0, 'won': 0}}
+    """
+    hedger = hedgers[host] = Hedger(percentile, max_extra, **kwargs)
+    return hedger
+
+
+def unhedge(host: Optional[str] = None) -> None:
+    """Stop hedging requests to a host, or to all hosts if none is given."""
+    if host is None:
+        hedgers.clear()
+    else:
+        hedgers.pop(host, None)
+
+
+def hedge_stats() -> Dict[str, HedgeStats]:
+    """Requests, hedges fired and hedges won per host."""
+    return {host: hedger.stats() for host, hedger in hedgers.items()}
+
+
+def circuit_breaker(host: str, **kwargs) -> CircuitBreaker:
+    """
+    Fail requests to a host immediately while it is down.
+
+    After ``failure_threshold`` consecutive connection errors, timeouts or
+    502, 503 and 504 responses, requests to the host raise
+    ``CircuitOpenError`` without being sent, or get the cached response, even
+    if stale, when the cache is enabled. After ``reset_timeout`` seconds, a
+    request is let through to check whether the host is back.
+
+    Parameters
+    ----------
+    host : str
+        Host name, e.g. "ipeadata2-homologa.ipea.gov.br".
+
+    failure_threshold : int, optional
+        Consecutive failures which open the circuit.
+
+    reset_timeout : float, optional
+        Seconds before probing the host again.
+
+    half_open_requests : int, optional
+        Number of requests let through to probe the host.
+
+    Returns
+    -------
+    CircuitBreaker
+
+    Examples
+    --------
+    >>> session.circuit_breaker("servicodados.ibge.gov.br", failure_threshold=3)
+    >>> session.breaker_stats()
+    {'servicodados.ibge.gov.br': {'state': 'closed', 'failures': 0, 'rejected': 0, 'opened': 0, 'retry_in': None}}
+    """
+    breaker = breakers[host] = CircuitBreaker(**kwargs)
+    return breaker
+
+
+def remove_circuit_breaker(host: Optional[str] = None) -> None:
+    """Remove the circuit breaker of a host, or of all hosts if none is given."""
+    if host is None:
+        breakers.clear()
+    else:
+        breakers.pop(host, None)
+
+
+def breaker_stats() -> Dict[str, BreakerStats]:
+    """State, consecutive failures and rejected requests per host."""
+    return {host: breaker.stats() for host, breaker in breakers.items()}
+
+
+def get_json(url: str, **kwargs):
+    """
+    Get a JSON response, decoded from its raw bytes with the fastest decoder
+    installed.
+
+    Concurrent calls for the same URL and parameters share a single request
+    and the same decoded object, unless disabled with the ``coalesce``
+    option, so callers should not modify it.
+    """
+    if not get_options(url)["coalesce"] or set(kwargs) - {"params"}:
+        return fetch_json(url, **kwargs)
+
+    key = canonical_url(url, kwargs.get("params"))
+    json, shared = flights.do(key, lambda: fetch_json(url, **kwargs))
+
+    if shared:
+        instrumentation.record({"stage": "coalesced", "url": url})
+
+    return json
+
+
+def fetch_json(url: str, **kwargs):
+    response = get(url, **kwargs)
+
+    start = time.perf_counter()
+    json = json_decoder.loads(response.content)
+    instrumentation.record(
+        {"stage": "decode", "url": url, "seconds": time.perf_counter() - start}
+    )
+
+    return json
 
 
 def get(url: str, **kwargs) -> requests.Response:
-    response = s.get(url, timeout=60, **kwargs)
+    start = time.perf_counter()
+    response, cache_status = get_from_cache_or_fetch(url, **kwargs)
+    seconds = time.perf_counter() - start
+
+    served_from_cache = cache_status in ("hit", "stale")
+    wait = 0.0 if served_from_cache else response.elapsed.total_seconds()
+
+    instrumentation.record(
+        {
+            "stage": "request",
+            "url": url,
+            "status": response.status_code,
+            "cache": cache_status,
+            "bytes": len(response.content),
+            "wait": wait,
+            "transfer": max(seconds - wait, 0.0),
+            "seconds": seconds,
+        }
+    )
+
+    return response
+
+
+def get_from_cache_or_fetch(
+    url: str, **kwargs
+) -> Tuple[requests.Response, Optional[str]]:
+    if cache is None:
+        return fetch(url, **kwargs), None
+
+    key = cache.key(url, kwargs.get("params"))
+    cached = cache.load(key)
+
+    if cached and cached.is_fresh(cache.ttl):
+        return cached.to_response(), "hit"
+
+    if cached:
+        kwargs["headers"] = {**cached.conditional_headers(), **kwargs.get("headers", {})}
+
+    try:
+        response = fetch(url, **kwargs)
+    except CircuitOpenError:
+        if cached:
+            return cached.to_response(), "stale"
+        raise
+
+    if cached and response.status_code == 304:
+        refreshed = cache.refresh(key, cached, response.headers).to_response()
+        refreshed.elapsed = response.elapsed
+        return refreshed, "revalidated"
+
+    cache.store(key, response)
+    return response, "miss"
+
+
+def fetch(url: str, **kwargs) -> requests.Response:
+    url_options = get_options(url)
+
+    read_timeout = url_options["read_timeout"]
+    connect_timeout = url_options["connect_timeout"] or read_timeout
+    kwargs.setdefault("timeout", (connect_timeout, read_timeout))
+
+    if not url_options["keep_alive"]:
+        kwargs["headers"] = {"Connection": "close", **kwargs.get("headers", {})}
+
+    session = get_session()
+    host = urlsplit(url).hostname or ""
+    limiter = limiters.get(host)
+    hedger = hedgers.get(host)
+    breaker = breakers.get(host)
+
+    if breaker:
+        breaker.before(host)
+
+    def get(url: str, **kwargs) -> requests.Response:
+        # Hedged within the limiter slot, so waiting for the limiter is not
+        # mistaken for a slow request
+        if hedger:
+            return hedger.call(session.get, url, **kwargs)
+        return session.get(url, **kwargs)
+
+    def send(url: str, **kwargs) -> requests.Response:
+        if limiter:
+            return limiter.call(get, url, **kwargs)
+        return get(url, **kwargs)
+
+    if breaker:
+        send = protect(breaker, send)
+
+    response = send(url, **kwargs)
+
     response.raise_for_status()
     return response
+
+
+def protect(breaker: CircuitBreaker, send: Callable[..., requests.Response]):
+    """Report the outcome of each request sent with ``send`` to ``breaker``."""
+
+    def protected_send(url: str, **kwargs) -> requests.Response:
+        try:
+            response = send(url, **kwargs)
+        except Exception:
+            # Not only connection errors and timeouts: any error leaves the
+            # host unanswered, and a probe must not be left hanging
+            breaker.failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        if response.status_code in FAILURE_STATUS_CODES:
+            breaker.failure()
+        else:
+            breaker.success()
+
+        return response
+
+    return protected_send
@@ -0,0 +1,62 @@
+import threading
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Run a function once for concurrent calls with the same key, sharing its
+    result, or its exception, with every caller.
+    """
+
+    def __init__(self):
+        self.calls: Dict[Any, Call] = {}
+        self.lock = threading.Lock()
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Call ``fn`` unless a call with ``key`` is already in flight, in which
+        case wait for it.
+
+        Returns
+        -------
+        tuple
+            The result and whether it was shared from another call.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self.calls[key] = Call()
+            else:
+                call.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self.lock:
+            return len(self.calls)
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import time
+import threading
+
+from seriesbr.utils.lazy import lazy_import
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    import asyncio
+else:
+    asyncio = lazy_import("asyncio")
+
+T = TypeVar("T")
+
+# Status codes which mean the server is overloaded and wants us to slow down
+THROTTLING_STATUS_CODES = {429, 502, 503, 504}
+
+LimiterStats = TypedDict(
+    "LimiterStats",
+    {
+        "rate": Optional[float],
+        "concurrency": int,
+        "in_flight": int,
+        "queue_depth": int,
+        "latency": Optional[float],
+        "throttled": int,
+        "errors": int,
+    },
+)
+
+
+class TokenBucket:
+    """
+    Allow ``rate`` requests per second on average, with bursts of up to
+    ``burst`` requests.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.updated_at
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+            # Reserve a token even if it is not available yet, so waiting
+            # threads are served in order
+            self.tokens -= 1
+            return max(-self.tokens / self.rate, self.paused_until - now, 0)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for ``seconds``, e.g. as told by Retry-After."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrency:
+    """
+    Limit the number of concurrent requests, adjusting the limit with additive
+    increase and multiplicative decrease (AIMD).
+
+    Each successful response whose latency stays within ``latency_tolerance``
+    times the average latency grows the limit by roughly one per window of
+    ``limit`` requests. Throttling responses and errors multiply the limit by
+    ``backoff``.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 32,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.latency: Optional[float] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.throttled = 0
+        self.errors = 0
+        self.condition = threading.Condition()
+        # Coroutines waiting for a slot, woken up on their own event loop
+        self.async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def concurrency(self) -> int:
+        return max(self.minimum, int(self.limit))
+
+    def acquire(self) -> None:
+        with self.condition:
+            self.waiting += 1
+            while self.in_flight >= self.concurrency:
+                self.condition.wait()
+            self.waiting -= 1
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        """Like acquire, but waits without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        waiting = False
+
+        try:
+            while True:
+                with self.condition:
+                    if self.in_flight < self.concurrency:
+                        self.in_flight += 1
+                        return
+
+                    if not waiting:
+                        waiting = True
+                        self.waiting += 1
+
+                    future = loop.create_future()
+                    self.async_waiters.append((loop, future))
+
+                await future
+        finally:
+            if waiting:
+                with self.condition:
+                    self.waiting -= 1
+
+    def release(self, latency: Optional[float], throttled: bool = False) -> None:
+        with self.condition:
+            self.in_flight -= 1
+
+            if latency is None or throttled:
+                if throttled:
+                    self.throttled += 1
+                else:
+                    self.errors += 1
+                self.limit = max(self.minimum, self.limit * self.backoff)
+            else:
+                healthy = (
+                    self.latency is None
+                    or latency <= self.latency * self.latency_tolerance
+                )
+                if healthy:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                self.latency = (
+                    latency
+                    if self.latency is None
+                    else 0.9 * self.latency + 0.1 * latency
+                )
+
+            self.condition.notify_all()
+            async_waiters, self.async_waiters = self.async_waiters, []
+
+        for loop, future in async_waiters:
+            loop.call_soon_threadsafe(wake_up, future)
+
+
+class HostLimiter:
+    """Rate and concurrency limits for requests to a single host."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = AdaptiveConcurrency(
+            initial_concurrency,
+            min_concurrency,
+            max_concurrency,
+            backoff,
+            latency_tolerance,
+        )
+
+    def call(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Call ``function``, which must return a ``requests.Response``, once
+        the host limits allow it.
+        """
+        self.concurrency.acquire()
+
+        latency = None
+        throttled = False
+
+        try:
+            if self.bucket:
+                self.bucket.acquire()
+
+            start = time.monotonic()
+            response = function(*args, **kwargs)
+            latency = time.monotonic() - start
+
+            throttled = self.is_throttled(response)
+            return response
+        finally:
+            self.concurrency.release(latency, throttled)
+
+    async def acall(
+        self, function: Callable[..., Awaitable[T]], *args, **kwargs
+    ) -> T:
+        """
+        Await ``function``, which must return an ``httpx.Response``, once the
+        host limits allow it. Limits are shared with requests made by ``call``.
+        """
+        await self.concurrency.acquire_async()
+
+        latency = None
+        throttled = False
+
+        try:
+            if self.bucket:
+                await asyncio.sleep(self.bucket.reserve())
+
+            start = time.monotonic()
+            response = await function(*args, **kwargs)
+            latency = time.monotonic() - start
+
+            throttled = self.is_throttled(response)
+            return response
+        finally:
+            self.concurrency.release(latency, throttled)
+
+    def is_throttled(self, response) -> bool:
+        """Whether the server asked to slow down, honoring its Retry-After."""
+        status_code = getattr(response, "status_code", None)
+        throttled = status_code in THROTTLING_STATUS_CODES
+
+        if throttled and self.bucket:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                self.bucket.pause(float(retry_after))
+
+        return throttled
+
+    def stats(self) -> LimiterStats:
+        concurrency = self.concurrency
+        return {
+            "rate": self.bucket.rate if self.bucket else None,
+            "concurrency": concurrency.concurrency,
+            "in_flight": concurrency.in_flight,
+            "queue_depth": concurrency.waiting,
+            "latency": concurrency.latency,
+            "throttled": concurrency.throttled,
+            "errors": concurrency.errors,
+        }
+
+
+def wake_up(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
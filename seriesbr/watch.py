@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import time
+import heapq
+import logging
+import threading
+
+from seriesbr import bcb, ipea, ibge
+from seriesbr.sources import check_source
+from seriesbr.utils import session
+from seriesbr.utils.lazy import lazy_import
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = lazy_import("pandas")
+
+WatchSpec = Union[Tuple[str, Any], Tuple[str, Any, Dict[str, Any]]]
+Callback = Callable[[WatchSpec, pd.DataFrame], None]
+ErrorCallback = Callable[[WatchSpec, Exception], None]
+Poller = Callable[["Watched", Optional[pd.Timestamp]], pd.DataFrame]
+
+logger = logging.getLogger(__name__)
+
+
+class Watched:
+    """Polling state of a watched series."""
+
+    def __init__(self, spec: WatchSpec, interval: float):
+        self.spec = spec
+        self.source, self.code = spec[0], spec[1]
+        self.options: Dict[str, Any] = dict(*spec[2:])  # type: ignore
+        self.interval = interval
+        self.latest: Optional[pd.DataFrame] = None
+        self.metadata: Optional[dict] = None
+        self.polls = 0
+        self.changes = 0
+        self.errors = 0
+
+
+class Watcher:
+    """
+    Poll series for new or revised observations.
+
+    The first poll only requests the last observation of a series:
+    ``/ultimos/1`` for BCB, the top row ordered by date for IPEA and
+    ``/periodos/-1`` for IBGE. Later polls request the observations since
+    the last date seen, so every observation released between two polls is
+    passed to ``callback``, together with the ones at the last date seen if
+    they were revised. Revisions of earlier dates are not detected.
+
+    Series are polled every ``interval`` seconds after a change, and the
+    interval grows by ``backoff`` after each poll without changes, up to
+    ``max_interval``, so polling is frequent around releases and cheap
+    between them.
+
+    Parameters
+    ----------
+    specs : list of tuples
+        Tuples of ``(source, code)`` or ``(source, code, options)``, where
+        options are keyword arguments to the source's ``get_series``.
+
+    callback : callable
+        Called with the spec and a DataFrame of the new observations.
+
+    interval : float, optional
+        Minimum seconds between polls of a series.
+
+    max_interval : float, optional
+        Maximum seconds between polls of a series.
+
+    backoff : float, optional
+        Factor applied to the interval after a poll without changes.
+
+    on_error : callable, optional
+        Called with the spec and the exception when a poll or ``callback``
+        fails. A failed poll is tried again after backing off. Errors are
+        logged instead when it is not given or fails itself, so that one
+        failure never stops the other series from being watched.
+
+    emit_initial : bool, optional
+        Pass the observations found by the first poll to ``callback`` too.
+
+    Examples
+    --------
+    >>> watcher = Watcher([("bcb", 433), ("ibge", 1737, {"variables": 63})], print)
+    >>> watcher.start()
+    >>> watcher.stop()
+    """
+
+    def __init__(
+        self,
+        specs: List[WatchSpec],
+        callback: Callback,
+        interval: float = 60,
+        max_interval: float = 3600,
+        backoff: float = 2.0,
+        on_error: Optional[ErrorCallback] = None,
+        emit_initial: bool = False,
+    ):
+        for spec in specs:
+            check_source(spec[0], POLLERS)
+
+        self.watched = [Watched(spec, interval) for spec in specs]
+        self.callback = callback
+        self.min_interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.on_error = on_error
+        self.emit_initial = emit_initial
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def poll(self, watched: Watched) -> None:
+        """Poll a series once, calling back with its changes, if any."""
+        watched.polls += 1
+
+        previous = watched.latest
+        since = previous.index.max() if previous is not None and len(previous) else None
+
+        try:
+            df = POLLERS[watched.source](watched, since)
+        except Exception as error:
+            watched.errors += 1
+            watched.interval = self.next_interval(watched.interval)
+            self.report(watched, error)
+            return
+
+        # Only the observations of the last date are needed to find changes
+        watched.latest = df[df.index == df.index.max()] if len(df) else df
+
+        if previous is None:
+            changes = df if self.emit_initial else df.iloc[:0]
+        else:
+            changes = find_changes(previous, df)
+
+        if len(changes):
+            if previous is not None:
+                watched.changes += 1
+            watched.interval = self.min_interval
+            try:
+                self.callback(watched.spec, changes)
+            except Exception as error:
+                self.report(watched, error)
+        else:
+            watched.interval = self.next_interval(watched.interval)
+
+    def report(self, watched: Watched, error: Exception) -> None:
+        """Pass an error to ``on_error``, logging it if that is not possible."""
+        if self.on_error is not None:
+            try:
+                self.on_error(watched.spec, error)
+                return
+            except Exception:
+                logger.exception("Erro em on_error da série %s", watched.spec)
+
+        logger.error("Erro ao observar a série %s", watched.spec, exc_info=error)
+
+    def next_interval(self, interval: float) -> float:
+        return min(interval * self.backoff, self.max_interval)
+
+    def run(self) -> None:
+        """Poll series until :py:meth:`stop` is called, blocking."""
+        self.stopped.clear()
+
+        # Earliest scheduled poll first
+        queue = [(time.monotonic(), i) for i in range(len(self.watched))]
+        heapq.heapify(queue)
+
+        while queue and not self.stopped.is_set():
+            due, i = heapq.heappop(queue)
+
+            if self.stopped.wait(max(due - time.monotonic(), 0)):
+                break
+
+            watched = self.watched[i]
+            self.poll(watched)
+            heapq.heappush(queue, (time.monotonic() + watched.interval, i))
+
+    def start(self) -> threading.Thread:
+        """Poll series in a background thread."""
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Polls, changes, errors and current interval of each series."""
+        return [
+            {
+                "spec": watched.spec,
+                "polls": watched.polls,
+                "changes": watched.changes,
+                "errors": watched.errors,
+                "interval": watched.interval,
+            }
+            for watched in self.watched
+        ]
+
+
+def find_changes(previous: pd.DataFrame, polled: pd.DataFrame) -> pd.DataFrame:
+    """
+    Observations of ``polled`` later than the ones of ``previous``, and the
+    ones at the last date of ``previous`` if their values changed.
+    """
+    if not len(previous):
+        return polled
+
+    last_date = previous.index.max()
+    at_last_date = polled[polled.index == last_date]
+    later = polled[polled.index > last_date]
+
+    # Compared as objects, since categories may differ between polls
+    if at_last_date.astype(object).equals(previous.astype(object)):
+        return later
+
+    return pd.concat([at_last_date, later])
+
+
+def format_date(date: pd.Timestamp) -> str:
+    return date.strftime("%Y-%m-%d")
+
+
+def poll_bcb(watched: Watched, since: Optional[pd.Timestamp]) -> pd.DataFrame:
+    if since is None:
+        url, params = bcb.series.build_url(watched.code, last_n=1)
+    else:
+        url, params = bcb.series.build_url(watched.code, start=format_date(since))
+
+    json = session.get_json(url, params=params)
+    return bcb.series.build_df(json, watched.code)
+
+
+def poll_ipea(watched: Watched, since: Optional[pd.Timestamp]) -> pd.DataFrame:
+    if since is None and not watched.options:
+        url, params = ipea.series.build_latest_url(watched.code)
+        json = session.get_json(url, params=params)
+        return ipea.series.build_df(json, watched.code)
+
+    # Metadata only tells the time zone of dates and, for the last
+    # observation of each territory, the last date, so it is fetched once
+    if watched.metadata is None:
+        watched.metadata = ipea.get_metadata(watched.code)
+
+    options = dict(watched.options)
+    wide = options.pop("wide", False)
+
+    start = None if since is None else format_date(since)
+    last_n = 1 if since is None else None
+    url, params = ipea.series.build_url(
+        watched.code, start, None, last_n, watched.metadata, **options
+    )
+    json = session.get_json(url, params=params)
+    return ipea.series.build_df(json, watched.code, wide=wide)
+
+
+def poll_ibge(watched: Watched, since: Optional[pd.Timestamp]) -> pd.DataFrame:
+    # Metadata only tells how to format periods, so it is fetched once
+    if watched.metadata is None:
+        watched.metadata = ibge.get_metadata(watched.code)
+
+    frequency = watched.metadata["periodicidade"]["frequencia"]
+    period = {"last_n": 1} if since is None else {"start": format_date(since)}
+    url, params = ibge.series.build_url(
+        watched.code, watched.metadata, frequency, **period, **watched.options
+    )
+    json = session.get_json(url, params=params)
+    return ibge.series.build_df(json, frequency)
+
+
+POLLERS: Dict[str, Poller] = {
+    "bcb": poll_bcb,
+    "ipea": poll_ipea,
+    "ibge": poll_ibge,
+}
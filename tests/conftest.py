@@ -0,0 +1,29 @@
+import pytest
+import responses
+
+from responses import matchers
+
+
+def bcb_url(code):
+    return f"https://api.bcb.gov.br/dados/serie/bcdata.sgs.{code}/dados"
+
+
+@pytest.fixture
+def add_bcb_response():
+    """Mock the BCB API answering ``observations``, pairs of date and value.
+
+    With ``start`` and ``end``, the response only matches requests for
+    those dates, like "01/01/2020".
+    """
+
+    def add(observations, code=11, start=None, end=None, status=200):
+        params = {"format": "json", "dataInicial": start, "dataFinal": end}
+        responses.add(
+            responses.GET,
+            bcb_url(code),
+            json=[{"data": date, "valor": value} for date, value in observations],
+            status=status,
+            match=[matchers.query_param_matcher(params)] if start and end else [],
+        )
+
+    return add
@@ -0,0 +1,250 @@
+import time
+import asyncio
+import pytest
+import pandas as pd
+
+from seriesbr import bcb, ibge, ipea
+from seriesbr.utils import async_session, breaker, session
+
+httpx = pytest.importorskip("httpx")
+
+
+BCB_URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados"
+
+
+@pytest.fixture(autouse=True)
+def reset_session():
+    yield
+    session.configure()
+    session.disable_cache()
+    session.unlimit()
+    session.unhedge()
+    session.remove_circuit_breaker()
+
+
+def run_with_mock(routes, coroutine_function):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        url = str(request.url).split("?")[0]
+        return httpx.Response(200, json=routes[url])
+
+    return run_with_handler(handler, coroutine_function), requests
+
+
+def run_with_handler(handler, coroutine_function):
+    async def main():
+        async_session.set_client(
+            httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        try:
+            return await coroutine_function()
+        finally:
+            await async_session.aclose()
+
+    return asyncio.run(main())
+
+
+def test_bcb_aget_series_concurrently():
+    routes = {
+        f"https://api.bcb.gov.br/dados/serie/bcdata.sgs.{code}/dados": [
+            {"data": "01/01/2019", "valor": str(code)}
+        ]
+        for code in [11, 433]
+    }
+
+    async def main():
+        return await asyncio.gather(bcb.aget_series(11), bcb.aget_series(433))
+
+    (df_11, df_433), requests = run_with_mock(routes, main)
+
+    expected_df = pd.DataFrame(
+        data={"11": [11.0]}, index=pd.DatetimeIndex(["01/01/2019"], name="Date")
+    )
+    pd.testing.assert_frame_equal(df_11, expected_df)
+    assert df_433["433"].tolist() == [433.0]
+    assert len(requests) == 2
+
+
+def test_ipea_aget_series():
+    routes = {
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados('BM12_TJOVER12')": {
+            "value": [
+                {
+                    "SERCODIGO": "BM12_TJOVER12",
+                    "SERMAXDATA": "2021-12-31T00:00:00-03:00",
+                    "SERMINDATA": "2019-01-01T00:00:00-03:00",
+                }
+            ]
+        },
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/ValoresSerie(SERCODIGO='BM12_TJOVER12')": {
+            "value": [{"VALDATA": "2019-01-01T00:00:00-03:00", "VALVALOR": 4.41}]
+        },
+    }
+
+    df, requests = run_with_mock(routes, lambda: ipea.aget_series("BM12_TJOVER12"))
+
+    assert df["BM12_TJOVER12"].tolist() == [4.41]
+    assert requests[1].url.params["$select"] == "VALDATA,VALVALOR"
+
+
+def test_ibge_aget_metadata():
+    routes = {
+        "https://servicodados.ibge.gov.br/api/v3/agregados/1419/metadados": {
+            "id": 1419
+        }
+    }
+
+    metadata, _ = run_with_mock(routes, lambda: ibge.aget_metadata(1419))
+
+    assert metadata == {"id": 1419}
+
+
+def test_async_client_uses_options_of_each_host():
+    session.configure(
+        max_retries=1,
+        hosts={
+            "servicodados.ibge.gov.br": {
+                "read_timeout": 120,
+                "pool_maxsize": 3,
+                "pool_block": True,
+                "max_retries": 2,
+            }
+        },
+    )
+
+    async def main():
+        client = async_session.build_client()
+        async with client:
+            return [
+                client._transport_for_url(httpx.URL(url))
+                for url in [BCB_URL, "https://servicodados.ibge.gov.br/api/v3"]
+            ]
+
+    bcb_transport, ibge_transport = asyncio.run(main())
+
+    assert bcb_transport._pool._retries == 1
+    assert bcb_transport._pool._max_keepalive_connections == 10
+    assert ibge_transport._pool._retries == 2
+    assert ibge_transport._pool._max_connections == 3
+
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={})
+
+    run_with_handler(handler, lambda: async_session.get_json(BCB_URL))
+    run_with_handler(
+        handler,
+        lambda: async_session.get_json("https://servicodados.ibge.gov.br/api/v3"),
+    )
+
+    assert timeouts == [60, 120]
+
+
+def test_async_requests_use_response_cache(tmp_path):
+    session.enable_cache(str(tmp_path), ttl=60)
+
+    routes = {BCB_URL: [{"data": "01/01/2019", "valor": "1"}]}
+    first, requests = run_with_mock(routes, lambda: bcb.aget_series(11))
+    second, more_requests = run_with_mock(routes, lambda: bcb.aget_series(11))
+
+    assert len(requests) == 1
+    assert more_requests == []
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_async_requests_respect_host_limiter():
+    session.limit("api.bcb.gov.br", initial_concurrency=1, max_concurrency=1)
+    in_flight = []
+    most_in_flight = []
+
+    async def handler(request):
+        in_flight.append(request)
+        most_in_flight.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(request)
+        return httpx.Response(200, json=[])
+
+    async def main():
+        return await asyncio.gather(*(async_session.get(BCB_URL) for _ in range(3)))
+
+    run_with_handler(handler, main)
+
+    assert most_in_flight == [1, 1, 1]
+    assert session.limiter_stats()["api.bcb.gov.br"]["in_flight"] == 0
+
+
+def test_async_requests_are_hedged():
+    session.hedge("api.bcb.gov.br", max_extra=1, min_samples=1)
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        # The first request after warming up hangs, its hedge does not
+        if len(calls) == 2:
+            await asyncio.sleep(10)
+        return httpx.Response(200, json=[len(calls)])
+
+    async def main():
+        await async_session.get_json(BCB_URL)
+        return await async_session.get_json(BCB_URL)
+
+    start = time.monotonic()
+    json = run_with_handler(handler, main)
+
+    assert json == [3]
+    assert time.monotonic() - start < 5
+    assert session.hedge_stats()["api.bcb.gov.br"]["won"] == 1
+
+
+def test_async_requests_trip_circuit_breaker():
+    session.circuit_breaker("api.bcb.gov.br", failure_threshold=1)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run_with_handler(handler, lambda: async_session.get(BCB_URL))
+
+    with pytest.raises(breaker.CircuitOpenError):
+        run_with_handler(handler, lambda: async_session.get(BCB_URL))
+
+    assert len(calls) == 1
+
+
+def test_async_requests_do_not_retry_status_codes():
+    # Unlike the sync session, max_retries only applies to connection errors
+    session.configure(max_retries=2)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run_with_handler(handler, lambda: async_session.get(BCB_URL))
+
+    assert len(calls) == 1
+
+
+def test_async_cancelled_probe_releases_circuit_breaker():
+    host_breaker = session.circuit_breaker(
+        "api.bcb.gov.br", failure_threshold=1, reset_timeout=0
+    )
+    host_breaker.failure()
+
+    async def handler(request):
+        await asyncio.sleep(10)
+
+    with pytest.raises(asyncio.TimeoutError):
+        run_with_handler(
+            handler, lambda: asyncio.wait_for(async_session.get(BCB_URL), 0.05)
+        )
+
+    host_breaker.before("api.bcb.gov.br")
+    assert host_breaker.stats()["rejected"] == 0
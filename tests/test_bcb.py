@@ -5,6 +5,7 @@ import pandas as pd
 from freezegun import freeze_time
 from responses import matchers
 from seriesbr import bcb
+from seriesbr.utils import instrumentation
 
 
 BASE_URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados"
@@ -128,3 +129,76 @@ def test_bcb_get_metadata():
     )
 
     assert bcb.get_metadata(11) == {"code": "11"}
+
+
+@responses.activate
+def test_bcb_get_series_instrumentation():
+    responses.add(
+        responses.GET,
+        "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados",
+        json=[{"data": "01/01/2019", "valor": "100"}],
+        status=200,
+    )
+
+    events = []
+    instrumentation.add_hook(events.append)
+    try:
+        df = bcb.get_series(11)
+    finally:
+        instrumentation.remove_hook(events.append)
+
+    assert [event["stage"] for event in events] == ["request", "decode", "build"]
+
+    summary = df.attrs["seriesbr"]
+    assert summary["requests"] == 1
+    assert summary["cache_hits"] == 0
+    assert summary["bytes"] == len(b'[{"data": "01/01/2019", "valor": "100"}]')
+    assert summary["rows"] == 1
+
+
+@responses.activate
+def test_bcb_iter_series_in_chunks():
+    def add_chunk(start, end, **kwargs):
+        responses.add(
+            responses.GET,
+            BASE_URL,
+            match=[
+                matchers.query_param_matcher(
+                    {"format": "json", "dataInicial": start, "dataFinal": end}
+                )
+            ],
+            **kwargs,
+        )
+
+    add_chunk("01/06/2000", "31/12/2009", json=[{"data": "01/06/2000", "valor": "1"}])
+    add_chunk("01/01/2010", "31/12/2019", status=404)
+    add_chunk("01/01/2020", "31/03/2021", json=[{"data": "01/01/2021", "valor": "2"}])
+
+    chunks = list(bcb.iter_series(11, start="2000-06", end="2021-03", prefetch=2))
+
+    assert len(responses.calls) == 3
+    assert [list(chunk.index) for chunk in chunks] == [
+        [pd.Timestamp("2000-06-01")],
+        [pd.Timestamp("2021-01-01")],
+    ]
+    assert [list(chunk["11"]) for chunk in chunks] == [[1.0], [2.0]]
+
+
+@responses.activate
+def test_bcb_get_series_arrow_output():
+    pa = pytest.importorskip("pyarrow")
+
+    responses.add(
+        responses.GET,
+        BASE_URL,
+        json=[
+            {"data": "01/12/2021", "valor": "1.5"},
+            {"data": "02/12/2021", "valor": "2"},
+        ],
+        status=200,
+    )
+
+    table = bcb.get_series(11, output="arrow")
+
+    assert table.schema == pa.schema([("Date", pa.date32()), ("11", pa.float64())])
+    assert table.column("11").to_pylist() == [1.5, 2.0]
@@ -0,0 +1,79 @@
+import pytest
+import responses
+import numpy as np
+import pandas as pd
+
+import seriesbr
+
+
+@responses.activate
+def test_get_many_aligns_series_from_different_sources():
+    responses.add(
+        responses.GET,
+        "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados",
+        json=[
+            {"data": "01/01/2019", "valor": "1"},
+            {"data": "01/03/2019", "valor": "3"},
+        ],
+        status=200,
+    )
+
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados('BM12_TJOVER12')",
+        json={
+            "value": [
+                {
+                    "SERCODIGO": "BM12_TJOVER12",
+                    "SERMAXDATA": "2021-12-31T00:00:00-03:00",
+                    "SERMINDATA": "2019-01-01T00:00:00-03:00",
+                }
+            ]
+        },
+        status=200,
+    )
+
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/ValoresSerie(SERCODIGO='BM12_TJOVER12')",
+        json={
+            "value": [
+                {"VALDATA": "2019-02-01T00:00:00-03:00", "VALVALOR": 2.0},
+                {"VALDATA": "2019-03-01T00:00:00-03:00", "VALVALOR": 3.0},
+            ],
+        },
+        status=200,
+    )
+
+    df = seriesbr.get_many([("bcb", 11, {"name": "selic"}), ("ipea", "BM12_TJOVER12")])
+
+    expected_df = pd.DataFrame(
+        {"selic": [1.0, np.nan, 3.0], "BM12_TJOVER12": [np.nan, 2.0, 3.0]},
+        index=pd.DatetimeIndex(["2019-01-01", "2019-02-01", "2019-03-01"], name="Date"),
+    )
+
+    pd.testing.assert_frame_equal(df, expected_df)
+
+
+def test_get_many_unknown_source():
+    with pytest.raises(ValueError):
+        seriesbr.get_many([("fred", "GDP")])
+
+
+@responses.activate
+def test_get_many_duplicate_names():
+    responses.add(
+        responses.GET,
+        "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados",
+        json=[{"data": "01/01/2019", "valor": "1"}],
+        status=200,
+    )
+
+    with pytest.raises(ValueError, match="mais de uma coluna chamada 11"):
+        seriesbr.get_many([("bcb", 11), ("bcb", 11, {"start": "2019"})])
+
+    # Clashing names are found before any series is downloaded
+    assert len(responses.calls) == 0
+
+    df = seriesbr.get_many([("bcb", 11), ("bcb", 11, {"name": "selic"})])
+    assert list(df.columns) == ["11", "selic"]
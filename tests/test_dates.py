@@ -0,0 +1,29 @@
+import pytest
+
+from datetime import datetime
+from dateutil.parser import parse
+from seriesbr.utils import dates
+
+
+@pytest.mark.parametrize(
+    "date",
+    ["2019", "2019-11", "2019-2", "11-2019", "02-2019", "11/2019", "2019-11-07", "2020-02"],
+)
+def test_fast_path_matches_dateutil(date):
+    assert dates.match_date(date) is not None
+    assert dates.parse_start_date(date) == parse(date, default=dates.UNIX_EPOCH)
+    assert dates.parse_end_date(date) == parse(date, default=dates.LAST_DAY_OF_YEAR)
+
+
+def test_month_year_without_separator():
+    assert dates.parse_start_date("072017") == datetime(2017, 7, 1)
+    assert dates.parse_end_date("072017") == datetime(2017, 7, 31)
+
+
+def test_fallback_to_dateutil():
+    assert dates.match_date("07/11/2019") is None
+    assert dates.parse_start_date("07/11/2019") == datetime(2019, 7, 11)
+    assert dates.parse_start_date("Nov 7 2019") == datetime(2019, 11, 7)
+
+    with pytest.raises(ValueError):
+        dates.parse_start_date("2019-13")
@@ -0,0 +1,46 @@
+import pytest
+import responses
+import pandas as pd
+
+from responses import matchers
+from seriesbr.export import export
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+BASE_URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados"
+
+
+@responses.activate
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_export_writes_one_row_group_per_chunk(tmp_path, format):
+    for start, end, date in [
+        ("01/01/2000", "31/12/2009", "01/06/2000"),
+        ("01/01/2010", "31/12/2010", "01/06/2010"),
+    ]:
+        responses.add(
+            responses.GET,
+            BASE_URL,
+            json=[{"data": date, "valor": "1.5"}],
+            match=[
+                matchers.query_param_matcher(
+                    {"format": "json", "dataInicial": start, "dataFinal": end}
+                )
+            ],
+        )
+
+    path = str(tmp_path / f"series.{format}")
+    rows = export("bcb", 11, path, format=format, start="2000", end="2010")
+
+    if format == "parquet":
+        assert pq.ParquetFile(path).num_row_groups == 2
+        df = pd.read_parquet(path)
+    else:
+        reader = pa.ipc.open_file(path)
+        assert reader.num_record_batches == 2
+        df = reader.read_pandas()
+
+    assert rows == 2
+    assert list(df.index) == [pd.Timestamp("2000-06-01"), pd.Timestamp("2010-06-01")]
+    assert list(df["11"]) == [1.5, 1.5]
+    assert list(tmp_path.iterdir()) == [tmp_path / f"series.{format}"]
@@ -0,0 +1,151 @@
+import pytest
+import responses
+
+from seriesbr import bcb
+from seriesbr.frame_cache import FrameCache
+
+
+BASE_URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados"
+
+
+def age_entries(cache, seconds):
+    for key, (df, fetched_at) in cache.entries.items():
+        cache.entries[key] = (df, fetched_at - seconds)
+
+
+def wait_refreshes(cache):
+    if cache.executor is not None:
+        cache.executor.shutdown(wait=True)
+        cache.executor = None
+
+
+@responses.activate
+def test_frame_cache_returns_fresh_frames_without_requests(add_bcb_response):
+    cache = FrameCache(ttl=300)
+    add_bcb_response([("01/06/2020", "1")])
+
+    first = bcb.get_series(11, start="2020", store=cache)
+    second = bcb.get_series(11, start="2020", store=cache)
+
+    assert len(responses.calls) == 1
+    assert second is first
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+@responses.activate
+def test_frame_cache_keys_by_arguments(add_bcb_response):
+    cache = FrameCache()
+    add_bcb_response([("01/06/2020", "1")])
+
+    bcb.get_series(11, start="2020", store=cache)
+    bcb.get_series(11, start="2021", store=cache)
+
+    assert len(responses.calls) == 2
+    assert cache.stats()["entries"] == 2
+
+
+@responses.activate
+def test_frame_cache_serves_stale_frames_while_refreshing(add_bcb_response):
+    cache = FrameCache(ttl=60, max_stale=3600)
+    add_bcb_response([("01/06/2020", "1")])
+    bcb.get_series(11, start="2020", store=cache)
+    age_entries(cache, 90)
+
+    responses.replace(
+        responses.GET,
+        BASE_URL,
+        json=[{"data": "01/06/2020", "valor": "2"}],
+    )
+    df = bcb.get_series(11, start="2020", store=cache)
+    assert list(df["11"]) == [1.0]
+
+    wait_refreshes(cache)
+    assert len(responses.calls) == 2
+    assert cache.stats()["stale_hits"] == 1
+    assert cache.stats()["refreshes"] == 1
+
+    df = bcb.get_series(11, start="2020", store=cache)
+    assert list(df["11"]) == [2.0]
+
+
+@responses.activate
+def test_frame_cache_keeps_stale_frame_when_refresh_fails(add_bcb_response):
+    cache = FrameCache(ttl=60, max_stale=3600)
+    add_bcb_response([("01/06/2020", "1")])
+    bcb.get_series(11, start="2020", store=cache)
+    age_entries(cache, 90)
+
+    responses.replace(responses.GET, BASE_URL, status=400)
+    df = bcb.get_series(11, start="2020", store=cache)
+    wait_refreshes(cache)
+
+    assert list(df["11"]) == [1.0]
+    assert cache.stats()["refresh_errors"] == 1
+
+    # Backing off, so the stale frame is served without refreshing it
+    calls = len(responses.calls)
+    df = bcb.get_series(11, start="2020", store=cache)
+    wait_refreshes(cache)
+
+    assert list(df["11"]) == [1.0]
+    assert len(responses.calls) == calls
+    assert cache.stats()["refresh_errors"] == 1
+
+    key = next(iter(cache.backoff))
+    cache.backoff[key] = (1, 0.0)
+    bcb.get_series(11, start="2020", store=cache)
+    wait_refreshes(cache)
+
+    assert len(responses.calls) == calls + 1
+    assert cache.stats()["refresh_errors"] == 2
+    assert cache.backoff[key][0] == 2
+
+
+@responses.activate
+def test_frame_cache_refreshes_a_frame_once_at_a_time(add_bcb_response):
+    cache = FrameCache(ttl=60, max_stale=3600)
+    add_bcb_response([("01/06/2020", "1")])
+    bcb.get_series(11, start="2020", store=cache)
+    age_entries(cache, 90)
+
+    cache.refreshing.update(cache.entries)
+    bcb.get_series(11, start="2020", store=cache)
+
+    assert cache.executor is None
+    assert len(responses.calls) == 1
+    assert cache.stats()["stale_hits"] == 1
+
+
+@responses.activate
+def test_frame_cache_fetches_frames_older_than_max_stale(add_bcb_response):
+    cache = FrameCache(ttl=60, max_stale=120)
+    add_bcb_response([("01/06/2020", "1")])
+
+    bcb.get_series(11, start="2020", store=cache)
+    age_entries(cache, 180)
+    bcb.get_series(11, start="2020", store=cache)
+
+    assert len(responses.calls) == 2
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["stale_hits"] == 0
+
+
+@responses.activate
+def test_frame_cache_drops_least_recently_used_frames(add_bcb_response):
+    cache = FrameCache(max_entries=2)
+    add_bcb_response([("01/06/2020", "1")])
+
+    bcb.get_series(11, start="2018", store=cache)
+    bcb.get_series(11, start="2019", store=cache)
+    bcb.get_series(11, start="2018", store=cache)
+    bcb.get_series(11, start="2020", store=cache)
+    bcb.get_series(11, start="2018", store=cache)
+
+    assert len(responses.calls) == 3
+    assert cache.stats()["entries"] == 2
+
+
+def test_frame_cache_rejects_unknown_sources():
+    with pytest.raises(ValueError, match="desconhecida"):
+        FrameCache().get_series("sidra", 1)
@@ -1,3 +1,6 @@
+import json
+import time
+import datetime
 import requests
 import responses
 import pandas as pd
@@ -670,3 +673,138 @@ def test_ibge_get_metadata():
     )
 
     assert ibge.get_metadata(1419) == json
+
+
+@responses.activate
+def test_ibge_iter_series_in_chunks():
+    responses.add(
+        responses.GET,
+        BASE_URL + "/metadados",
+        json={"periodicidade": {"frequencia": "mensal", "inicio": 199601}},
+        status=200,
+    )
+
+    labels = {
+        "V": "Valor",
+        "D1C": "Brasil (Código)",
+        "D2C": "Mês (Código)",
+        "D3C": "Variável (Código)",
+        "D3N": "Variável",
+        "D4N": "Geral, grupo, subgrupo, item e subitem",
+    }
+
+    def add_chunk(periods, observations):
+        def callback(request):
+            # The first chunk arrives last, but is still yielded first
+            if periods.startswith("2000"):
+                time.sleep(0.1)
+            rows = [
+                {
+                    "V": value,
+                    "D1C": "1",
+                    "D2C": period,
+                    "D3C": "63",
+                    "D3N": "IPCA - Variação mensal",
+                    "D4N": "Índice geral",
+                }
+                for period, value in observations
+            ]
+            return 200, {}, json.dumps([labels, *rows])
+
+        responses.add_callback(
+            responses.GET,
+            BASE_URL + f"/periodos/{periods}/variaveis",
+            callback=callback,
+        )
+
+    add_chunk("200006-200912", [("200006", "0.23")])
+    add_chunk("201001-201912", [])
+    add_chunk("202001-202103", [("202101", "0.25")])
+
+    chunks = list(ibge.iter_series(1419, start="2000-06", end="2021-03", prefetch=3))
+
+    assert len(responses.calls) == 4
+    assert [list(chunk.index) for chunk in chunks] == [
+        [pd.Timestamp("2000-06-01")],
+        [pd.Timestamp("2021-01-01")],
+    ]
+    assert [list(chunk["Valor"]) for chunk in chunks] == [[0.23], [0.25]]
+
+
+@responses.activate
+@freeze_time("2021-12-31")
+def test_ibge_get_series_arrow_output():
+    pa = pytest.importorskip("pyarrow")
+
+    responses.add(
+        responses.GET,
+        BASE_URL + "/metadados",
+        json={"periodicidade": {"frequencia": "trimestral"}},
+        status=200,
+    )
+
+    responses.add(
+        responses.GET,
+        BASE_URL + "/periodos/197001-202104/variaveis",
+        match=[matchers.query_param_matcher({"localidades": "BR", "view": "flat"})],
+        json=[
+            {
+                "V": "Valor",
+                "D1C": "Brasil (Código)",
+                "D2C": "Mês (Código)",
+                "D3C": "Variável (Código)",
+                "D3N": "Variável",
+                "D4N": "Geral, grupo, subgrupo, item e subitem",
+            },
+            *[
+                {
+                    "V": value,
+                    "D1C": "1",
+                    "D2C": period,
+                    "D3C": "63",
+                    "D3N": "IPCA - Variação mensal",
+                    "D4N": "Índice geral",
+                }
+                for value, period in [("0.56", "201201"), ("...", "201202")]
+            ],
+        ],
+        status=200,
+    )
+
+    table = ibge.get_series(1419, output="arrow")
+
+    assert table.column_names == [
+        "Date",
+        "Valor",
+        "Brasil (Código)",
+        "Variável (Código)",
+        "Variável",
+        "Geral, grupo, subgrupo, item e subitem",
+    ]
+    assert table.schema.field("Date").type == pa.date32()
+    assert pa.types.is_dictionary(table.schema.field("Variável").type)
+    assert table.column("Date").to_pylist() == [
+        datetime.date(2012, 1, 1),
+        datetime.date(2012, 4, 1),
+    ]
+    assert table.column("Valor").to_pylist() == [0.56, None]
+
+
+@pytest.mark.parametrize("output", ["pandas", "arrow"])
+def test_ibge_build_fails_without_classification_column(output):
+    if output == "arrow":
+        pytest.importorskip("pyarrow")
+
+    json = [
+        {"V": "Valor", "D1C": "Brasil (Código)", "D2C": "Mês (Código)"},
+        {"V": "0.56", "D1C": "1", "D2C": "201201", "D3C": "63", "D3N": "IPCA"},
+    ]
+    build = ibge.series.build_table if output == "arrow" else ibge.series.build_df
+
+    with pytest.raises(KeyError, match="D4N"):
+        build(json, "mensal")
+
+
+def test_ibge_get_series_unknown_output():
+    with pytest.raises(ValueError):
+        ibge.get_series(1419, output="polars")
@@ -1,3 +1,6 @@
+import json
+import time
+import datetime
 import responses
 import pandas as pd
 import pytest
@@ -350,3 +353,334 @@ def test_ipea_get_metadata():
     assert ipea.get_metadata("BM12_TJOVER12") == {
         "SERCODIGO": "BM12_TJOVER12",
     }
+
+
+@responses.activate
+def test_ipea_catalog_search_and_lookup(tmp_path):
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados",
+        json={
+            "value": [
+                {
+                    "SERCODIGO": "BM12_TJOVER12",
+                    "SERNOME": "Taxa de juros - Over / Selic",
+                    "SERCOMENTARIO": "Quadro: Taxas de <b>juros</b> efetivas.",
+                    "SERATUALIZACAO": "2019-12-17T05:06:00.793-02:00",
+                    "BASNOME": "Macroeconômico",
+                    "SERMAXDATA": "2019-11-01T00:00:00-03:00",
+                    "SERMINDATA": "1974-01-01T00:00:00-03:00",
+                    "PERNOME": "Mensal",
+                },
+                {
+                    "SERCODIGO": "PRECOS12_IPCA12",
+                    "SERNOME": "Índice nacional de preços ao consumidor amplo (IPCA)",
+                    "SERCOMENTARIO": None,
+                    "SERATUALIZACAO": "2019-12-10T05:06:00.793-02:00",
+                    "BASNOME": "Macroeconômico",
+                    "SERMAXDATA": "2019-11-01T00:00:00-03:00",
+                    "SERMINDATA": "1979-12-01T00:00:00-03:00",
+                    "PERNOME": "Mensal",
+                },
+            ]
+        },
+        status=200,
+    )
+
+    path = ipea.update_catalog(str(tmp_path / "catalog.json.gz"))
+
+    assert list(ipea.search("JUROS sel", path).index) == ["BM12_TJOVER12"]
+    assert list(ipea.search("indice", path).index) == ["PRECOS12_IPCA12"]
+    assert ipea.search("inexistente", path).empty
+
+    df = ipea.lookup(["PRECOS12_IPCA12", "UNKNOWN", "BM12_TJOVER12"], path)
+    assert list(df.index) == ["PRECOS12_IPCA12", "BM12_TJOVER12"]
+    assert df["SERMAXDATA"].dtype == "datetime64[ns, UTC]"
+    assert df["PERNOME"].dtype == "category"
+
+    assert len(responses.calls) == 1
+
+
+@freeze_time("2021-12-31")
+@responses.activate
+def test_ipea_get_series_by_territory():
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados('PIBE')",
+        json={
+            "value": [
+                {
+                    "SERCODIGO": "PIBE",
+                    "SERMAXDATA": "2019-01-01T00:00:00-02:00",
+                    "SERMINDATA": "1985-01-01T00:00:00-02:00",
+                }
+            ]
+        },
+        status=200,
+    )
+
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/ValoresSerie(SERCODIGO='PIBE')",
+        json={
+            "value": [
+                {
+                    "VALDATA": "2018-01-01T00:00:00-02:00",
+                    "VALVALOR": 1.0,
+                    "NIVNOME": "Estados",
+                    "TERCODIGO": "33",
+                },
+                {
+                    "VALDATA": "2018-01-01T00:00:00-02:00",
+                    "VALVALOR": 2.0,
+                    "NIVNOME": "Estados",
+                    "TERCODIGO": "35",
+                },
+            ],
+        },
+        match=[
+            matchers.query_param_matcher(
+                {
+                    "$select": "VALDATA,VALVALOR,NIVNOME,TERCODIGO",
+                    "$filter": (
+                        "VALDATA ge 2018-01-01T00:00:00-02:00"
+                        " and NIVNOME eq 'Estados'"
+                        " and (TERCODIGO eq '33' or TERCODIGO eq '35')"
+                    ),
+                }
+            )
+        ],
+        match_querystring=False,
+        status=200,
+    )
+
+    df = ipea.get_series(
+        "PIBE", start="2018", levels="Estados", territories=[33, 35]
+    )
+    assert df["TERCODIGO"].dtype == "category"
+    assert df["NIVNOME"].dtype == "category"
+
+    df = ipea.get_series(
+        "PIBE", start="2018", levels="Estados", territories=[33, 35], wide=True
+    )
+    assert list(df.columns) == ["33", "35"]
+    assert df.loc["2018-01-01"].tolist() == [1.0, 2.0]
+
+
+@responses.activate
+def test_ipea_get_series_wide_with_many_levels():
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados('PIBE')",
+        json={
+            "value": [
+                {
+                    "SERCODIGO": "PIBE",
+                    "SERMAXDATA": "2019-01-01T00:00:00-02:00",
+                    "SERMINDATA": "1985-01-01T00:00:00-02:00",
+                }
+            ]
+        },
+        status=200,
+    )
+
+    # Code 3 is both the Southeast region and the state of Amapá
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/ValoresSerie(SERCODIGO='PIBE')",
+        json={
+            "value": [
+                {
+                    "VALDATA": "2018-01-01T00:00:00-02:00",
+                    "VALVALOR": value,
+                    "NIVNOME": level,
+                    "TERCODIGO": territory,
+                }
+                for value, level, territory in [
+                    (1.0, "Regiões", "3"),
+                    (2.0, "Estados", "3"),
+                    (3.0, "Estados", "33"),
+                ]
+            ],
+        },
+        status=200,
+    )
+
+    df = ipea.get_series("PIBE", levels=["Estados", "Regiões"], wide=True)
+
+    assert list(df.columns) == [("Estados", "3"), ("Estados", "33"), ("Regiões", "3")]
+    assert df.loc["2018-01-01"].tolist() == [2.0, 3.0, 1.0]
+
+
+def test_ipea_get_series_wide_without_territories():
+    with pytest.raises(ValueError):
+        ipea.get_series("PIBE", wide=True)
+
+
+@responses.activate
+def test_ipea_iter_series_in_chunks():
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados('BM12_TJOVER12')",
+        json={
+            "value": [
+                {
+                    "SERCODIGO": "BM12_TJOVER12",
+                    "SERMAXDATA": "2021-03-01T00:00:00-03:00",
+                    "SERMINDATA": "2000-06-01T00:00:00-03:00",
+                }
+            ]
+        },
+        status=200,
+    )
+
+    def add_chunk(start, end, observations):
+        def callback(request):
+            # The first chunk arrives last, but is still yielded first
+            if start.startswith("2000"):
+                time.sleep(0.1)
+            values = [{"VALDATA": d, "VALVALOR": v} for d, v in observations]
+            return 200, {}, json.dumps({"value": values})
+
+        responses.add_callback(
+            responses.GET,
+            BASE_URL,
+            callback=callback,
+            match=[
+                matchers.query_param_matcher(
+                    {
+                        "$select": "VALDATA,VALVALOR",
+                        "$filter": f"VALDATA ge {start} and VALDATA le {end}",
+                    }
+                )
+            ],
+        )
+
+    add_chunk(
+        "2000-06-01T00:00:00-03:00",
+        "2009-12-31T00:00:00-03:00",
+        [("2000-06-01T00:00:00-03:00", 1.0)],
+    )
+    add_chunk("2010-01-01T00:00:00-03:00", "2019-12-31T00:00:00-03:00", [])
+    add_chunk(
+        "2020-01-01T00:00:00-03:00",
+        "2021-03-01T00:00:00-03:00",
+        [("2021-01-01T00:00:00-03:00", 2.0)],
+    )
+
+    chunks = list(ipea.iter_series("BM12_TJOVER12", prefetch=3))
+
+    assert len(responses.calls) == 4
+    assert [list(chunk.index) for chunk in chunks] == [
+        [pd.Timestamp("2000-06-01")],
+        [pd.Timestamp("2021-01-01")],
+    ]
+    assert [list(chunk["BM12_TJOVER12"]) for chunk in chunks] == [[1.0], [2.0]]
+
+
+@responses.activate
+def test_ipea_get_series_arrow_output():
+    pa = pytest.importorskip("pyarrow")
+
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados('PIBE')",
+        json={
+            "value": [
+                {
+                    "SERCODIGO": "PIBE",
+                    "SERMAXDATA": "2019-01-01T00:00:00-02:00",
+                    "SERMINDATA": "1985-01-01T00:00:00-02:00",
+                }
+            ]
+        },
+        status=200,
+    )
+
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/ValoresSerie(SERCODIGO='PIBE')",
+        json={
+            "value": [
+                {
+                    "VALDATA": "2018-01-01T00:00:00-02:00",
+                    "VALVALOR": 1.5,
+                    "NIVNOME": "Estados",
+                    "TERCODIGO": 33,
+                },
+                {
+                    "VALDATA": "2019-01-01T00:00:00-02:00",
+                    "VALVALOR": None,
+                    "NIVNOME": "Estados",
+                    "TERCODIGO": 35,
+                },
+            ],
+        },
+        status=200,
+    )
+
+    table = ipea.get_series("PIBE", output="arrow")
+
+    assert table.column_names == ["Date", "PIBE", "NIVNOME", "TERCODIGO"]
+    assert table.schema.field("Date").type == pa.date32()
+    assert table.schema.field("PIBE").type == pa.float64()
+    assert pa.types.is_dictionary(table.schema.field("TERCODIGO").type)
+    assert table.column("Date").to_pylist() == [
+        datetime.date(2018, 1, 1),
+        datetime.date(2019, 1, 1),
+    ]
+    assert table.column("PIBE").to_pylist() == [1.5, None]
+    assert table.column("TERCODIGO").to_pylist() == ["33", "35"]
+
+
+@responses.activate
+def test_ipea_get_metadata_many():
+    def add_batch_response(codes):
+        responses.add(
+            responses.GET,
+            "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados",
+            json={
+                "value": [
+                    {
+                        "SERCODIGO": code,
+                        "SERATUALIZACAO": "2019-12-17T05:06:00.793-02:00",
+                        "PERNOME": "Mensal",
+                    }
+                    for code in codes
+                    if code != "UNKNOWN"
+                ]
+            },
+            match=[
+                matchers.query_param_matcher(
+                    {
+                        "$select": "SERCODIGO,SERNOME,SERCOMENTARIO,SERATUALIZACAO,"
+                        "BASNOME,SERMAXDATA,SERMINDATA,PERNOME",
+                        "$filter": " or ".join(
+                            f"SERCODIGO eq '{code}'" for code in codes
+                        ),
+                    }
+                )
+            ],
+            match_querystring=False,
+            status=200,
+        )
+
+    add_batch_response(["C", "UNKNOWN"])
+    add_batch_response(["A"])
+
+    df = ipea.get_metadata_many(["C", "UNKNOWN", "A", "C"], batch_size=2)
+
+    assert list(df.index) == ["C", "A"]
+    assert df["SERATUALIZACAO"].dtype == "datetime64[ns, UTC]"
+    assert len(responses.calls) == 2
+
+
+def test_ipea_filters_escape_single_quotes():
+    _, params = ipea.metadata.build_batch_url(["A' or SERCODIGO ne 'B", "C"])
+
+    assert params["$filter"] == (
+        "SERCODIGO eq 'A'' or SERCODIGO ne ''B' or SERCODIGO eq 'C'"
+    )
+    assert ipea.series.ipea_filter_by_territory("Estados'", ["3'3", 35]) == (
+        "NIVNOME eq 'Estados''' and (TERCODIGO eq '3''3' or TERCODIGO eq '35')"
+    )
@@ -0,0 +1,146 @@
+import pytest
+import responses
+import pandas as pd
+
+from freezegun import freeze_time
+from seriesbr.jobs import Job
+
+
+@responses.activate
+def test_job_resumes_only_failed_requests(tmp_path, add_bcb_response):
+    add_bcb_response([("01/06/2020", "1")])
+    add_bcb_response([], code=433, status=400)
+
+    job = Job([("bcb", 11), ("bcb", 433)], directory=str(tmp_path))
+    stats = job.run()
+
+    assert stats == {"tasks": 2, "done": 1, "failed": 1, "pending": 0}
+    assert len(job.errors()) == 1
+    with pytest.raises(ValueError, match="433"):
+        job.results()
+
+    # Only the failed request may be made again
+    responses.reset()
+    add_bcb_response([("01/06/2020", "2")], code=433)
+
+    resumed = Job(directory=str(tmp_path))
+    stats = resumed.run()
+
+    assert len(responses.calls) == 1
+    assert stats == {"tasks": 2, "done": 2, "failed": 0, "pending": 0}
+    assert resumed.errors() == {}
+
+    selic, ipca = resumed.results()
+    assert list(selic["11"]) == [1.0]
+    assert list(ipca["433"]) == [2.0]
+
+
+@responses.activate
+def test_job_saves_manifest_once_per_run(tmp_path, monkeypatch, add_bcb_response):
+    for code in (11, 433, 1):
+        add_bcb_response([("01/06/2020", "1")], code=code)
+
+    job = Job([("bcb", 11), ("bcb", 433), ("bcb", 1)], directory=str(tmp_path))
+
+    saves = []
+    save_manifest = job.save_manifest
+    monkeypatch.setattr(job, "save_manifest", lambda: saves.append(save_manifest()))
+
+    assert job.run() == {"tasks": 3, "done": 3, "failed": 0, "pending": 0}
+    assert len(saves) == 1
+    assert not (tmp_path / "journal.jsonl").exists()
+
+
+@responses.activate
+def test_job_replays_journal_after_crash(tmp_path, add_bcb_response):
+    add_bcb_response([("01/06/2020", "1")])
+    add_bcb_response([("01/06/2020", "2")], code=433)
+
+    job = Job([("bcb", 11), ("bcb", 433)], directory=str(tmp_path))
+    first = next(iter(job.tasks))
+    job.run_task(first)
+
+    with open(tmp_path / "journal.jsonl", "a") as f:
+        f.write('{"key": "cut sh')
+
+    resumed = Job(directory=str(tmp_path))
+
+    assert resumed.tasks[first]["status"] == "done"
+    assert resumed.stats() == {"tasks": 2, "done": 1, "failed": 0, "pending": 1}
+
+    resumed.run()
+
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_job_splits_series_into_chunks(tmp_path, add_bcb_response):
+    add_bcb_response(
+        [("01/06/2018", "1"), ("01/06/2019", "2")],
+        start="01/01/2018",
+        end="31/12/2019",
+    )
+    add_bcb_response([], start="01/01/2020", end="31/12/2021", status=404)
+    add_bcb_response([("01/06/2022", "3")], start="01/01/2022", end="30/06/2022")
+
+    job = Job(
+        [("bcb", 11, {"start": "2018", "end": "2022-06"})],
+        directory=str(tmp_path),
+        chunk_years=2,
+    )
+
+    assert job.run() == {"tasks": 3, "done": 3, "failed": 0, "pending": 0}
+
+    (df,) = job.results()
+    expected_dates = pd.to_datetime(["2018-06-01", "2019-06-01", "2022-06-01"])
+    assert list(df.index) == list(expected_dates)
+    assert list(df["11"]) == [1.0, 2.0, 3.0]
+
+    # Nothing is downloaded again
+    calls = len(responses.calls)
+    Job(directory=str(tmp_path)).run()
+    assert len(responses.calls) == calls
+
+
+@responses.activate
+def test_job_resolves_end_date_when_planning(tmp_path, add_bcb_response):
+    with freeze_time("2022-06-30"):
+        Job([("bcb", 11)], directory=str(tmp_path))
+
+    add_bcb_response([("01/06/2022", "1")], start="01/01/1970", end="30/06/2022")
+
+    with freeze_time("2022-08-31"):
+        assert Job(directory=str(tmp_path)).run()["done"] == 1
+
+
+def test_job_rejects_other_specs_in_same_directory(tmp_path):
+    Job([("bcb", 11)], directory=str(tmp_path))
+
+    with pytest.raises(ValueError, match="outras séries"):
+        Job([("bcb", 433)], directory=str(tmp_path))
+
+
+def test_job_rejects_other_chunk_years_in_same_directory(tmp_path):
+    specs = [("bcb", 11, {"start": "2018"})]
+    Job(specs, directory=str(tmp_path), chunk_years=2)
+
+    with pytest.raises(ValueError, match="outro número de anos"):
+        Job(specs, directory=str(tmp_path), chunk_years=5)
+
+    assert Job(directory=str(tmp_path)).chunk_years == 2
+
+
+def test_job_default_directory_depends_on_chunk_years(tmp_path, monkeypatch):
+    monkeypatch.setenv("SERIESBR_CACHE_DIR", str(tmp_path))
+    specs = [("bcb", 11, {"start": "2018"})]
+
+    assert Job(specs).directory == Job(specs).directory
+    assert Job(specs).directory != Job(specs, chunk_years=2).directory
+
+
+def test_job_requires_specs_or_existing_directory(tmp_path):
+    with pytest.raises(ValueError, match="Nenhum job"):
+        Job(directory=str(tmp_path))
+
+    with pytest.raises(ValueError, match="desconhecida"):
+        Job([("fred", "GDP")], directory=str(tmp_path))
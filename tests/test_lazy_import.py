@@ -0,0 +1,21 @@
+import sys
+import subprocess
+
+SCRIPT = """
+import sys
+from seriesbr import bcb, ipea, ibge
+
+bcb.series.build_url(11, last_n=5)
+ibge.series.ibge_filter_by_variable([1, 2])
+ipea.series.ipea_filter_by_date("2019-01-01T00:00:00-00:00")
+
+print(",".join(name for name in ["pandas", "requests", "dateutil"] if name in sys.modules))
+"""
+
+
+def test_import_does_not_load_heavy_dependencies():
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+    assert output == ""
@@ -0,0 +1,137 @@
+import pytest
+import responses
+import pandas as pd
+
+from freezegun import freeze_time
+from seriesbr import bcb
+from seriesbr.range_cache import RangeCache, missing_intervals, add_interval, merge
+
+
+def ts(date):
+    return pd.Timestamp(date)
+
+
+@freeze_time("2022-06-30")
+@responses.activate
+def test_range_cache_fetches_only_gaps(add_bcb_response):
+    cache = RangeCache()
+
+    add_bcb_response([("01/06/2020", "1")], start="01/01/2020", end="31/12/2020")
+    add_bcb_response([("01/06/2021", "2")], start="01/01/2021", end="31/12/2021")
+
+    bcb.get_series(11, start="2020", end="2020", store=cache)
+    df = bcb.get_series(11, start="2020-03", end="2021", store=cache)
+
+    assert len(responses.calls) == 2
+    assert list(df.index) == [ts("2020-06-01"), ts("2021-06-01")]
+    assert list(df["11"]) == [1.0, 2.0]
+    assert cache.intervals("bcb", 11) == [(ts("2020-01-01"), ts("2021-12-31"))]
+
+    df = bcb.get_series(11, start="2021", end="2021", store=cache)
+
+    assert len(responses.calls) == 2
+    assert list(df.index) == [ts("2021-06-01")]
+
+
+@freeze_time("2022-06-30")
+@responses.activate
+def test_range_cache_covers_ranges_reaching_today_up_to_last_observation(
+    add_bcb_response,
+):
+    cache = RangeCache()
+
+    add_bcb_response([("01/05/2022", "1")], start="01/01/2022", end="30/06/2022")
+    bcb.get_series(11, start="2022", store=cache)
+
+    assert cache.intervals("bcb", 11) == [(ts("2022-01-01"), ts("2022-05-01"))]
+
+
+@freeze_time("2022-06-30")
+@responses.activate
+def test_range_cache_records_start_date_requested_from_source(add_bcb_response):
+    cache = RangeCache()
+
+    add_bcb_response([("01/06/2020", "1")], start="01/01/1970", end="31/12/2020")
+    bcb.get_series(11, end="2020", store=cache)
+
+    assert cache.intervals("bcb", 11) == [(ts("1970-01-01"), ts("2020-12-31"))]
+
+    add_bcb_response([("01/06/1960", "0")], start="01/01/1960", end="31/12/1965")
+    df = bcb.get_series(11, start="1960", end="1965", store=cache)
+
+    assert len(responses.calls) == 2
+    assert list(df["11"]) == [0.0]
+
+
+@responses.activate
+def test_range_cache_expires_after_ttl(add_bcb_response):
+    with freeze_time("2022-06-30") as frozen:
+        cache = RangeCache(ttl=60)
+
+        add_bcb_response([("01/06/2020", "1")], start="01/01/2020", end="31/12/2020")
+        bcb.get_series(11, start="2020", end="2020", store=cache)
+        bcb.get_series(11, start="2020", end="2020", store=cache)
+        assert len(responses.calls) == 1
+
+        frozen.tick(61)
+        bcb.get_series(11, start="2020", end="2020", store=cache)
+        assert len(responses.calls) == 2
+
+
+def test_merge_replaces_range_downloaded_twice():
+    cached = pd.DataFrame(
+        {"11": [1.0, 2.0]}, index=[ts("2019-06-01"), ts("2020-06-01")]
+    )
+    delta = pd.DataFrame({"11": [2.5]}, index=[ts("2020-06-01")])
+
+    merged = merge(cached, delta, ts("2020-01-01"), ts("2020-12-31"))
+
+    assert list(merged.index) == [ts("2019-06-01"), ts("2020-06-01")]
+    assert list(merged["11"]) == [1.0, 2.5]
+
+
+@pytest.mark.parametrize(
+    "covered,start,end,expected",
+    [
+        pytest.param([], "2000", "2001", [("2000", "2001")], id="nothing covered"),
+        pytest.param(
+            [("2000-01-01", "2020-12-31")],
+            "2015-01-01",
+            "2022-12-31",
+            [("2021-01-01", "2022-12-31")],
+            id="overlaps end",
+        ),
+        pytest.param(
+            [("2005-01-01", "2005-12-31"), ("2010-01-01", "2010-12-31")],
+            "2000-01-01",
+            "2020-12-31",
+            [
+                ("2000-01-01", "2004-12-31"),
+                ("2006-01-01", "2009-12-31"),
+                ("2011-01-01", "2020-12-31"),
+            ],
+            id="holes",
+        ),
+        pytest.param(
+            [("2000-01-01", "2020-12-31")],
+            "2005-01-01",
+            "2006-12-31",
+            [],
+            id="fully covered",
+        ),
+    ],
+)
+def test_missing_intervals(covered, start, end, expected):
+    covered = [(ts(a), ts(b)) for a, b in covered]
+    expected = [(ts(a), ts(b)) for a, b in expected]
+    assert missing_intervals(covered, ts(start), ts(end)) == expected
+
+
+def test_add_interval_merges_adjacent_intervals():
+    covered = [
+        (ts("2000-01-01"), ts("2000-12-31")),
+        (ts("2002-01-01"), ts("2002-12-31")),
+    ]
+    assert add_interval(covered, ts("2001-01-01"), ts("2001-12-31")) == [
+        (ts("2000-01-01"), ts("2002-12-31"))
+    ]
@@ -0,0 +1,432 @@
+import time
+import socket
+import pytest
+import requests
+import responses
+
+from concurrent import futures
+from freezegun import freeze_time
+from responses import matchers
+from urllib3.exceptions import LocationParseError
+from seriesbr.utils import (
+    session,
+    adapters,
+    throttle,
+    json_decoder,
+    http_cache,
+    hedge,
+    breaker,
+    instrumentation,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_session():
+    yield
+    session.configure()
+    session.disable_cache()
+    session.unlimit()
+    session.unhedge()
+    session.remove_circuit_breaker()
+
+
+def test_session_configure_per_host_adapters():
+    session.configure(
+        pool_maxsize=20,
+        max_retries=3,
+        backoff_factor=0.5,
+        hosts={"api.bcb.gov.br": {"pool_maxsize": 50, "read_timeout": 120}},
+    )
+
+    default_adapter = session.get_session().get_adapter("https://servicodados.ibge.gov.br/")
+    bcb_adapter = session.get_session().get_adapter("https://api.bcb.gov.br/dados")
+
+    assert default_adapter._pool_maxsize == 20
+    assert bcb_adapter._pool_maxsize == 50
+    assert bcb_adapter.max_retries.total == 3
+    assert bcb_adapter.max_retries.backoff_factor == 0.5
+
+    assert session.get_options("https://api.bcb.gov.br/dados")["read_timeout"] == 120
+    assert session.get_options("https://api.bcb.gov.br/dados")["max_retries"] == 3
+    assert session.get_options("https://servicodados.ibge.gov.br")["read_timeout"] == 60
+
+
+@pytest.mark.parametrize("max_retries", [0, 2])
+def test_session_read_timeout_raises_read_timeout(max_retries):
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    url = f"http://127.0.0.1:{server.getsockname()[1]}/"
+
+    session.configure(read_timeout=0.1, max_retries=max_retries)
+
+    try:
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            session.get(url)
+    finally:
+        server.close()
+
+
+def test_session_configure_unknown_option():
+    with pytest.raises(TypeError):
+        session.configure(pool_size=10)
+
+
+def test_session_backoff_jitter():
+    retry = adapters.JitteredRetry(total=3, backoff_factor=1, backoff_jitter=0.5)
+    retry = retry.increment("GET", "/").increment("GET", "/")
+
+    assert retry.backoff_jitter == 0.5
+    assert 2 <= retry.get_backoff_time() <= 2.5
+
+
+@responses.activate
+def test_session_get_timeout_and_keep_alive():
+    session.configure(connect_timeout=5, read_timeout=30, keep_alive=False)
+
+    responses.add(responses.GET, "https://api.bcb.gov.br/", json={}, status=200)
+
+    session.get("https://api.bcb.gov.br/")
+
+    request = responses.calls[0].request
+    assert request.headers["Connection"] == "close"
+    assert request.req_kwargs["timeout"] == (5, 30)
+
+
+@responses.activate
+def test_session_cache_revalidation(tmp_path):
+    cache = session.enable_cache(str(tmp_path), ttl=60)
+
+    url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados"
+
+    responses.add(
+        responses.GET,
+        url,
+        json=[{"data": "01/01/2019", "valor": "100"}],
+        headers={"ETag": '"v1"'},
+        status=200,
+    )
+
+    with freeze_time("2021-12-31 00:00:00"):
+        first = session.get(url, params={"format": "json"})
+        second = session.get(url, params={"format": "json"})
+
+    assert len(responses.calls) == 1
+    assert second.json() == first.json()
+
+    responses.replace(
+        responses.GET,
+        url,
+        match=[matchers.header_matcher({"If-None-Match": '"v1"'})],
+        status=304,
+    )
+
+    with freeze_time("2021-12-31 00:02:00"):
+        third = session.get(url, params={"format": "json"})
+
+    assert len(responses.calls) == 2
+    assert third.json() == [{"data": "01/01/2019", "valor": "100"}]
+
+    with freeze_time("2021-12-31 00:02:30"):
+        session.get(url, params={"format": "json"})
+
+    assert len(responses.calls) == 2
+
+    key = cache.key(url + "?format=json")
+    assert key == cache.key(url, {"format": "json"})
+    assert cache.load(key) is not None
+
+
+@responses.activate
+def test_session_cache_eviction(tmp_path):
+    session.enable_cache(str(tmp_path), max_size=1)
+
+    responses.add(responses.GET, "https://api.bcb.gov.br/1", json=[1], status=200)
+    responses.add(responses.GET, "https://api.bcb.gov.br/2", json=[2], status=200)
+
+    session.get("https://api.bcb.gov.br/1")
+    session.get("https://api.bcb.gov.br/2")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@responses.activate
+def test_session_cache_scans_directory_only_when_over_size(tmp_path, monkeypatch):
+    cache = http_cache.ResponseCache(str(tmp_path), max_size=10_000)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or evict())
+    session.cache = cache
+
+    for i in range(5):
+        responses.add(responses.GET, f"https://api.bcb.gov.br/{i}", json=[i])
+        session.get(f"https://api.bcb.gov.br/{i}")
+
+    assert len(scans) == 1
+    keys = [cache.key(call.request.url) for call in responses.calls]
+    assert cache.size == sum(cache.entry_size(key) for key in keys)
+
+    cache.max_size = 1
+    responses.add(responses.GET, "https://api.bcb.gov.br/5", json=[5])
+    session.get("https://api.bcb.gov.br/5")
+
+    assert len(scans) == 2
+    assert cache.size == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_adaptive_concurrency_aimd():
+    concurrency = throttle.AdaptiveConcurrency(initial=4, minimum=1, maximum=5)
+
+    for _ in range(8):
+        concurrency.acquire()
+        concurrency.release(latency=0.1)
+
+    assert concurrency.concurrency == 5
+
+    concurrency.acquire()
+    concurrency.release(latency=0.1, throttled=True)
+
+    assert concurrency.concurrency == 2
+    assert concurrency.throttled == 1
+
+    concurrency.acquire()
+    concurrency.release(latency=None)
+
+    assert concurrency.concurrency == 1
+    assert concurrency.errors == 1
+
+
+@responses.activate
+def test_session_limit_backs_off_when_throttled():
+    session.limit("api.bcb.gov.br", rate=1000, initial_concurrency=8)
+
+    responses.add(responses.GET, "https://api.bcb.gov.br/", status=429)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        session.get("https://api.bcb.gov.br/")
+
+    stats = session.limiter_stats()["api.bcb.gov.br"]
+    assert stats["concurrency"] == 4
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["throttled"] == 1
+
+
+@responses.activate
+def test_session_get_json_decodes_bytes():
+    decoded = []
+
+    def loads(content):
+        decoded.append(content)
+        return json_decoder.json.loads(content)
+
+    responses.add(responses.GET, "https://api.bcb.gov.br/", json={"a": "ç"}, status=200)
+
+    json_decoder.use_decoder(loads)
+    try:
+        assert session.get_json("https://api.bcb.gov.br/") == {"a": "ç"}
+    finally:
+        json_decoder.use_decoder()
+
+    assert decoded == ['{"a": "\\u00e7"}'.encode()]
+
+
+@responses.activate
+def test_session_get_json_coalesces_concurrent_requests():
+    url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados"
+    params = {"format": "json"}
+    key = http_cache.canonical_url(url, params)
+
+    def callback(request):
+        # Hold the response until every other thread is waiting for it
+        call = session.flights.calls.get(key)
+        deadline = time.monotonic() + 5
+        while call and call.followers < 3:
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+        return 200, {}, "[1]"
+
+    responses.add_callback(responses.GET, url, callback=callback)
+
+    with futures.ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(lambda _: session.get_json(url, params=params), range(4))
+        )
+
+    assert len(responses.calls) == 1
+    assert all(result is results[0] for result in results)
+    assert session.flights.in_flight() == 0
+
+    session.configure(coalesce=False)
+    session.get_json(url, params=params)
+    assert len(responses.calls) == 2
+
+
+def test_hedger_sends_duplicate_of_slow_requests():
+    hedger = hedge.Hedger(percentile=0.9, max_extra=1, min_samples=5)
+    for _ in range(10):
+        hedger.tracker.add(0.05)
+
+    calls = []
+
+    def slow_first_call():
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(1)
+            return "slow"
+        return "hedge"
+
+    assert hedger.call(slow_first_call) == "hedge"
+    assert len(calls) == 2
+
+    stats = hedger.stats()
+    assert stats["requests"] == 1
+    assert stats["hedged"] == 1
+    assert stats["won"] == 1
+
+
+def test_hedger_caps_extra_load():
+    hedger = hedge.Hedger(max_extra=0.1, min_samples=1)
+    hedger.tracker.add(0.0)
+
+    for _ in range(20):
+        hedger.call(time.sleep, 0.001)
+
+    assert hedger.stats()["hedged"] <= 2
+
+
+@responses.activate
+def test_session_hedge():
+    hedger = session.hedge("api.bcb.gov.br")
+
+    responses.add(responses.GET, "https://api.bcb.gov.br/", json={}, status=200)
+    session.get("https://api.bcb.gov.br/")
+
+    assert session.hedge_stats() == {"api.bcb.gov.br": hedger.stats()}
+    assert hedger.stats()["requests"] == 1
+
+
+@responses.activate
+def test_session_fetch_hedges_slow_requests():
+    hedger = session.hedge("api.bcb.gov.br", max_extra=1, min_samples=5)
+    for _ in range(10):
+        hedger.tracker.add(0.05)
+
+    calls = []
+
+    def slow_first_call(request):
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(1)
+            return (200, {}, "slow")
+        return (200, {}, "hedge")
+
+    responses.add_callback(responses.GET, "https://api.bcb.gov.br/", slow_first_call)
+
+    start = time.monotonic()
+    response = session.fetch("https://api.bcb.gov.br/")
+
+    assert response.text == "hedge"
+    assert time.monotonic() - start < 1
+    assert hedger.stats()["hedged"] == 1
+    assert hedger.stats()["won"] == 1
+
+
+@responses.activate
+def test_session_does_not_hedge_requests_waiting_for_the_limiter():
+    session.limit(
+        "api.bcb.gov.br", initial_concurrency=1, min_concurrency=1, max_concurrency=1
+    )
+    hedger = session.hedge("api.bcb.gov.br", max_extra=1, min_samples=5)
+    for _ in range(10):
+        hedger.tracker.add(0.25)
+
+    def respond(request):
+        time.sleep(0.1)
+        return (200, {}, "[]")
+
+    responses.add_callback(responses.GET, "https://api.bcb.gov.br/", respond)
+
+    with futures.ThreadPoolExecutor(max_workers=4) as executor:
+        for _ in range(4):
+            executor.submit(session.fetch, "https://api.bcb.gov.br/")
+
+    assert len(responses.calls) == 4
+    assert hedger.stats()["hedged"] == 0
+
+
+@responses.activate
+def test_session_circuit_breaker_fails_fast_and_probes():
+    host_breaker = session.circuit_breaker("api.bcb.gov.br", failure_threshold=2)
+
+    responses.add(responses.GET, "https://api.bcb.gov.br/", status=503)
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.HTTPError):
+            session.get("https://api.bcb.gov.br/")
+
+    with pytest.raises(breaker.CircuitOpenError):
+        session.get("https://api.bcb.gov.br/")
+
+    assert len(responses.calls) == 2
+    assert session.breaker_stats()["api.bcb.gov.br"]["state"] == "open"
+
+    host_breaker.reset_timeout = 0
+    responses.replace(responses.GET, "https://api.bcb.gov.br/", json={}, status=200)
+    session.get("https://api.bcb.gov.br/")
+
+    assert len(responses.calls) == 3
+    assert host_breaker.stats()["state"] == "closed"
+
+
+@responses.activate
+@pytest.mark.parametrize(
+    "error", [LocationParseError("api.bcb.gov.br:x"), RuntimeError("no threads")]
+)
+def test_session_circuit_breaker_counts_any_error_of_a_probe(error):
+    host_breaker = session.circuit_breaker(
+        "api.bcb.gov.br", failure_threshold=1, reset_timeout=0
+    )
+    host_breaker.failure()
+
+    responses.add(responses.GET, "https://api.bcb.gov.br/", body=error)
+
+    with pytest.raises(type(error)):
+        session.get("https://api.bcb.gov.br/")
+
+    assert host_breaker.stats()["opened"] == 2
+
+    # The probe was answered, so the host is probed again
+    responses.replace(responses.GET, "https://api.bcb.gov.br/", json={}, status=200)
+    session.get("https://api.bcb.gov.br/")
+
+    assert host_breaker.stats()["state"] == "closed"
+
+
+def test_circuit_breaker_releases_probes_without_outcome():
+    host_breaker = breaker.CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    host_breaker.failure()
+
+    host_breaker.before("api.bcb.gov.br")
+    host_breaker.release()
+    host_breaker.before("api.bcb.gov.br")
+
+    assert host_breaker.stats()["rejected"] == 0
+
+
+@responses.activate
+def test_session_circuit_breaker_serves_stale_cache(tmp_path):
+    session.enable_cache(str(tmp_path), ttl=0)
+    host_breaker = session.circuit_breaker("api.bcb.gov.br", failure_threshold=1)
+
+    responses.add(responses.GET, "https://api.bcb.gov.br/", json=[1], status=200)
+    session.get("https://api.bcb.gov.br/")
+
+    host_breaker.failure()
+
+    with instrumentation.collect() as events:
+        assert session.get("https://api.bcb.gov.br/").json() == [1]
+
+    assert len(responses.calls) == 1
+    assert events[0]["cache"] == "stale"
@@ -0,0 +1,207 @@
+import mmap
+import pytest
+import responses
+import numpy as np
+import pandas as pd
+
+from freezegun import freeze_time
+from responses import matchers
+from seriesbr import bcb
+from seriesbr.store import SeriesStore, MappedStore, fetch_stamps, select_dates
+
+BASE_URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados"
+
+
+@pytest.fixture(params=["parquet", "mapped"])
+def store(request, tmp_path):
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+        return SeriesStore(str(tmp_path))
+    return MappedStore(str(tmp_path))
+
+
+@responses.activate
+def test_store_downloads_only_new_observations(store):
+    with freeze_time("2021-12-31"):
+        responses.add(
+            responses.GET,
+            BASE_URL,
+            json=[
+                {"data": "01/12/2021", "valor": "1"},
+                {"data": "02/12/2021", "valor": "2"},
+            ],
+            match=[matchers.query_param_matcher({"format": "json"})],
+        )
+        bcb.get_series(11, store=store)
+
+    with freeze_time("2022-01-31"):
+        responses.add(
+            responses.GET,
+            BASE_URL,
+            json=[
+                {"data": "02/12/2021", "valor": "2.5"},
+                {"data": "03/12/2021", "valor": "3"},
+            ],
+            match=[
+                matchers.query_param_matcher(
+                    {
+                        "format": "json",
+                        "dataInicial": "02/12/2021",
+                        "dataFinal": "31/01/2022",
+                    }
+                )
+            ],
+        )
+        df = store.sync("bcb", 11)
+
+    expected = pd.DataFrame(
+        {"11": [1.0, 2.5, 3.0]},
+        index=pd.DatetimeIndex(["2021-12-01", "2021-12-02", "2021-12-03"], name="Date"),
+    )
+
+    pd.testing.assert_frame_equal(df, expected, check_names=False, check_freq=False)
+    pd.testing.assert_frame_equal(
+        store.read("bcb", 11), expected, check_names=False, check_freq=False
+    )
+    assert store.last_date("bcb", 11) == pd.Timestamp("2021-12-03")
+
+
+def is_memory_mapped(array):
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def test_mapped_store_reads_without_copying(tmp_path):
+    store = MappedStore(str(tmp_path))
+
+    df = pd.DataFrame(
+        {
+            "NIVNOME": pd.Categorical(["Estados", "Estados"]),
+            "TERCODIGO": pd.Categorical(["33", "35"]),
+            "PIBE": [1.0, 2.0],
+        },
+        index=pd.DatetimeIndex(["2020-01-01", "2020-01-01"], name="Date"),
+    )
+    store.write("ipea", "PIBE", df, levels="Estados")
+
+    stored = store.read("ipea", "PIBE", levels="Estados")
+
+    pd.testing.assert_frame_equal(stored, df)
+    assert is_memory_mapped(stored.index.values)
+    assert is_memory_mapped(stored["PIBE"].values)
+
+    stored.iloc[0, 2] = 10.0
+    assert store.read("ipea", "PIBE", levels="Estados").iloc[0, 2] == 1.0
+
+
+@responses.activate
+def test_mapped_store_serves_stored_series_without_requests(tmp_path):
+    store = MappedStore(str(tmp_path))
+
+    responses.add(
+        responses.GET,
+        BASE_URL,
+        json=[
+            {"data": "01/12/2021", "valor": "1"},
+            {"data": "02/12/2021", "valor": "2"},
+            {"data": "03/12/2021", "valor": "3"},
+        ],
+    )
+
+    first = bcb.get_series(11, store=store)
+    second = bcb.get_series(11, start="2021-12-02", store=store)
+
+    assert len(responses.calls) == 1
+    assert list(first["11"]) == [1.0, 2.0, 3.0]
+    assert list(second["11"]) == [2.0, 3.0]
+
+    for df in [first, second]:
+        assert is_memory_mapped(df.index.values)
+        assert is_memory_mapped(df["11"].values)
+
+
+def test_store_rejects_dates_in_sync(store):
+    with pytest.raises(TypeError):
+        store.sync("bcb", 11, start="2021")
+
+
+@pytest.mark.parametrize(
+    "kwargs,expected",
+    [
+        pytest.param({"start": "2021-02"}, ["2021-02-01", "2021-03-01"], id="start"),
+        pytest.param({"end": "2021-01"}, ["2021-01-01"], id="end"),
+        pytest.param({"last_n": 2}, ["2021-02-01", "2021-03-01"], id="last_n"),
+    ],
+)
+def test_select_dates(kwargs, expected):
+    df = pd.DataFrame(
+        {"value": [1, 2, 3]},
+        index=pd.DatetimeIndex(["2021-01-01", "2021-02-01", "2021-03-01"]),
+    )
+
+    assert list(select_dates(df, **kwargs).index) == list(pd.DatetimeIndex(expected))
+
+
+CKAN_URL = "https://dadosabertos.bcb.gov.br/api/3/action/package_search"
+
+
+def ckan_metadata(stamp):
+    return {"result": {"results": [{"codigo_sgs": "11", "metadata_modified": stamp}]}}
+
+
+@responses.activate
+def test_store_refresh_skips_unchanged_series(store):
+    responses.add(
+        responses.GET,
+        CKAN_URL,
+        json=ckan_metadata("2021-12-01T10:00:00"),
+        match=[matchers.query_param_matcher({"fq": "codigo_sgs:(11)", "rows": "1"})],
+    )
+    responses.add(responses.GET, BASE_URL, json=[{"data": "01/12/2021", "valor": "1"}])
+
+    def series_requests():
+        return [call for call in responses.calls if BASE_URL in call.request.url]
+
+    assert store.refresh([("bcb", 11)]) == [("bcb", 11)]
+    assert len(series_requests()) == 1
+
+    assert store.refresh([("bcb", 11)]) == []
+    assert len(series_requests()) == 1
+
+    responses.replace(responses.GET, CKAN_URL, json=ckan_metadata("2021-12-02"))
+
+    assert store.refresh([("bcb", 11)]) == [("bcb", 11)]
+    assert len(series_requests()) == 2
+
+
+@responses.activate
+def test_fetch_stamps_of_ibge_tables_without_last_period():
+    for table, periodicity in [
+        (1419, {"frequencia": "mensal", "inicio": 201201, "fim": 202112}),
+        (5938, {"frequencia": "anual", "inicio": 2002}),
+    ]:
+        responses.add(
+            responses.GET,
+            f"https://servicodados.ibge.gov.br/api/v3/agregados/{table}/metadados",
+            json={"id": table, "periodicidade": periodicity},
+        )
+
+    assert fetch_stamps("ibge", [1419, 5938]) == {"1419": "202112", "5938": None}
+
+
+@responses.activate
+def test_store_refresh_reads_manifests_without_stamps(store):
+    responses.add(responses.GET, CKAN_URL, json=ckan_metadata("2021-12-01"))
+    responses.add(responses.GET, BASE_URL, json=[{"data": "01/12/2021", "valor": "1"}])
+
+    store.sync("bcb", 11)
+    manifest = store.load_manifest()
+    for entry in manifest.values():
+        del entry["stamp"]
+    store.save_manifest(manifest)
+
+    assert store.refresh([("bcb", 11)]) == [("bcb", 11)]
+    assert store.refresh([("bcb", 11)]) == []
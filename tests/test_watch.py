@@ -0,0 +1,167 @@
+import time
+import pytest
+import responses
+
+from seriesbr.watch import Watcher
+
+BASE_URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.11/dados"
+LATEST_URL = BASE_URL + "/ultimos/1"
+
+
+@responses.activate
+def test_watcher_emits_only_new_or_revised_observations():
+    def respond(url, *observations):
+        responses.upsert(
+            responses.GET,
+            url,
+            json=[{"data": date, "valor": value} for date, value in observations],
+        )
+
+    emitted = []
+
+    def callback(spec, df):
+        emitted.append((spec, list(df.index.strftime("%Y-%m-%d")), list(df["11"])))
+
+    watcher = Watcher([("bcb", 11)], callback, interval=10, max_interval=30)
+    watched = watcher.watched[0]
+
+    respond(LATEST_URL, ("01/12/2021", "1"))
+    watcher.poll(watched)
+    assert emitted == []
+
+    respond(BASE_URL, ("01/12/2021", "1"))
+    watcher.poll(watched)
+    watcher.poll(watched)
+    assert emitted == []
+    assert watched.interval == 30
+    assert responses.calls[-1].request.params["dataInicial"] == "01/12/2021"
+
+    # Two releases between polls are both emitted
+    respond(BASE_URL, ("01/12/2021", "1"), ("02/12/2021", "2"), ("03/12/2021", "3"))
+    watcher.poll(watched)
+    assert emitted == [(("bcb", 11), ["2021-12-02", "2021-12-03"], [2.0, 3.0])]
+    assert watched.interval == 10
+
+    respond(BASE_URL, ("03/12/2021", "3.5"))
+    watcher.poll(watched)
+    assert responses.calls[-1].request.params["dataInicial"] == "03/12/2021"
+    assert emitted[-1] == (("bcb", 11), ["2021-12-03"], [3.5])
+
+    respond(BASE_URL, ("03/12/2021", "3.5"), ("06/12/2021", "4"))
+    watcher.poll(watched)
+    assert emitted[-1] == (("bcb", 11), ["2021-12-06"], [4.0])
+
+    assert watcher.stats()[0]["polls"] == 6
+    assert watcher.stats()[0]["changes"] == 3
+
+
+@responses.activate
+def test_watcher_polls_ipea_territories_without_refetching_metadata():
+    responses.add(
+        responses.GET,
+        "http://ipeadata2-homologa.ipea.gov.br/api/v1/Metadados('PIBE')",
+        json={
+            "value": [
+                {
+                    "SERCODIGO": "PIBE",
+                    "SERMAXDATA": "2018-01-01T00:00:00-02:00",
+                    "SERMINDATA": "1985-01-01T00:00:00-02:00",
+                    "PERNOME": "Anual",
+                }
+            ]
+        },
+    )
+
+    def respond(*observations):
+        responses.upsert(
+            responses.GET,
+            "http://ipeadata2-homologa.ipea.gov.br/api/v1/ValoresSerie(SERCODIGO='PIBE')",
+            json={
+                "value": [
+                    {
+                        "VALDATA": f"{year}-01-01T00:00:00-02:00",
+                        "VALVALOR": value,
+                        "NIVNOME": "Estados",
+                        "TERCODIGO": territory,
+                    }
+                    for year, territory, value in observations
+                ]
+            },
+        )
+
+    emitted = []
+    watcher = Watcher(
+        [("ipea", "PIBE", {"levels": "Estados", "territories": [33, 35]})],
+        lambda spec, df: emitted.append(df),
+    )
+    watched = watcher.watched[0]
+
+    respond((2018, "33", 1.0), (2018, "35", 2.0))
+    watcher.poll(watched)
+    respond((2018, "33", 1.0), (2018, "35", 2.0), (2019, "33", 3.0))
+    watcher.poll(watched)
+
+    metadata_requests = [
+        call for call in responses.calls if "Metadados" in call.request.url
+    ]
+    assert len(metadata_requests) == 1
+    assert "VALDATA ge 2018-01-01" in responses.calls[-1].request.params["$filter"]
+    assert len(emitted) == 1
+    assert list(emitted[0]["TERCODIGO"]) == ["33"]
+    assert list(emitted[0]["PIBE"]) == [3.0]
+
+
+@responses.activate
+def test_watcher_backs_off_on_errors():
+    responses.add(responses.GET, LATEST_URL, status=503)
+
+    errors = []
+    watcher = Watcher(
+        [("bcb", 11)],
+        lambda spec, df: None,
+        interval=1,
+        on_error=lambda spec, error: errors.append(spec),
+    )
+    watcher.poll(watcher.watched[0])
+
+    assert errors == [("bcb", 11)]
+    assert watcher.watched[0].interval == 2
+
+
+def test_watcher_unknown_source():
+    with pytest.raises(ValueError):
+        Watcher([("fred", 11)], print)
+
+
+@responses.activate
+def test_watcher_keeps_running_when_callback_fails(caplog):
+    for url in [LATEST_URL, BASE_URL]:
+        responses.add(responses.GET, url, json=[{"data": "01/12/2021", "valor": "1"}])
+
+    def callback(spec, df):
+        raise RuntimeError("callback")
+
+    errors = []
+    watcher = Watcher(
+        [("bcb", 11)],
+        callback,
+        interval=0.01,
+        max_interval=0.01,
+        on_error=lambda spec, error: errors.append(str(error)),
+        emit_initial=True,
+    )
+    thread = watcher.start()
+    deadline = time.monotonic() + 5
+    while len(responses.calls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert thread.is_alive()
+    watcher.stop()
+    assert errors == ["callback"]
+
+    # Without on_error, or when it fails too, errors are logged
+    for on_error in [None, lambda spec, error: 1 / 0]:
+        watcher = Watcher([("bcb", 11)], callback, on_error=on_error, emit_initial=True)
+        caplog.clear()
+        watcher.poll(watcher.watched[0])
+        assert "Erro ao observar a série ('bcb', 11)" in caplog.text